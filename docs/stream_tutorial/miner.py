@@ -11,6 +11,7 @@ from starlette.types import Send
 import bittensor as bt
 from transformers import GPT2Tokenizer
 from typing import List, Dict, Tuple, Union, Callable, Awaitable
+from template.utils.block_clock import BlockClock
 
 from protocol import StreamPrompting
 from config import get_config, check_config
@@ -171,7 +172,8 @@ class StreamMiner(ABC):
         self.axon.start()
 
         # --- Run until should_exit = True.
-        self.last_epoch_block = self.subtensor.get_current_block()
+        self.block_clock = BlockClock(self.subtensor)
+        self.last_epoch_block = self.block_clock.block
         bt.logging.info(f"Miner starting at block: {self.last_epoch_block}")
 
         # This loop maintains the miner's operations until intentionally stopped.
@@ -182,21 +184,21 @@ class StreamMiner(ABC):
                 start_epoch = time.time()
 
                 # --- Wait until next epoch.
-                current_block = self.subtensor.get_current_block()
+                next_epoch_block = (
+                    self.last_epoch_block + self.config.miner.blocks_per_epoch
+                )
                 while (
-                    current_block - self.last_epoch_block
-                    < self.config.miner.blocks_per_epoch
+                    self.block_clock.wait_for_block(
+                        next_epoch_block, timeout=1
+                    )
+                    < next_epoch_block
                 ):
-                    # --- Wait for next bloc.
-                    time.sleep(1)
-                    current_block = self.subtensor.get_current_block()
-
                     # --- Check if we should exit.
                     if self.should_exit:
                         break
 
                 # --- Update the metagraph with the latest network state.
-                self.last_epoch_block = self.subtensor.get_current_block()
+                self.last_epoch_block = self.block_clock.block
 
                 metagraph = self.subtensor.metagraph(
                     netuid=self.config.netuid,
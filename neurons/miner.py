@@ -19,16 +19,20 @@
 
 import time
 import typing
+import asyncio
 import bittensor as bt
-import requests
-import hashlib
 import logging
 
+from concurrent.futures.process import BrokenProcessPool
+
 # Bittensor Miner Template:
 import template
 
 # import base miner class which takes care of most of the boilerplate
 from template.base.miner import BaseMinerNeuron
+from template.miner import JobScheduler, MinerMetrics, QueueFullError, RateLimiter, create_engine
+from template.utils.metrics import MetricsExporter, MetricsRegistry
+from template.utils.pow import HEADER_FORMATS, STRING_FORMAT
 
 
 class Miner(BaseMinerNeuron):
@@ -44,18 +48,63 @@ class Miner(BaseMinerNeuron):
         super(Miner, self).__init__(config=config)
         logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
         self.logger = logging.getLogger(__name__)
-        self.submit_url = 'http://71.158.89.73:4437/submit_work'
+        self.engine = create_engine(
+            self.config.neuron.hash_engine,
+            num_workers=self.config.neuron.hash_workers,
+            chunk_size=self.config.neuron.nonce_chunk_size,
+        )
+        self.logger.info(f"Using {self.engine.name} hash engine")
+        self.engine.start()
+        self.scheduler = JobScheduler(
+            max_concurrent_jobs=self.config.neuron.max_concurrent_jobs,
+            max_queue_size=self.config.neuron.max_queue_size,
+        )
+        self.rate_limiter = RateLimiter(
+            rate=self.config.blacklist.rate_limit,
+            burst=self.config.blacklist.burst,
+            max_stake_multiplier=self.config.blacklist.max_stake_multiplier,
+        )
+        self.metrics = MinerMetrics(MetricsRegistry())
+        self.metrics.bind_scheduler(self.scheduler)
+        self.metrics.bind_rate_limiter(self.rate_limiter)
+        self.metrics_exporter = None
+        if self.config.neuron.metrics_port is not None:
+            self.metrics_exporter = MetricsExporter(
+                self.metrics.registry,
+                port=self.config.neuron.metrics_port,
+                host=self.config.neuron.metrics_host,
+            )
+            self.metrics_exporter.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        super().__exit__(exc_type, exc_value, traceback)
+        self.engine.shutdown()
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.stop()
 
     @staticmethod
     def double_sha256(block_header):
-        return hashlib.sha256(hashlib.sha256(block_header.encode('utf-8')).digest()).hexdigest()
+        return template.utils.pow.double_sha256(block_header)
 
     @staticmethod
     def bits_to_target(bits):
-        exponent = (bits >> 24) & 0xff
-        mantissa = bits & 0xffffff
-        target = mantissa * (1 << (8 * (exponent - 3)))
-        return target
+        return template.utils.pow.bits_to_target(bits)
+
+    def get_deadline(self, synapse: template.protocol.WorkData) -> typing.Optional[float]:
+        """
+        Returns the wall clock time by which the response has to be sent, or None if the request has no timeout.
+
+        The dendrite stamps each request with its send time (`dendrite.nonce`, in nanoseconds) and the timeout
+        it will wait for. Hashing stops `neuron.deadline_margin` seconds before that point so the response
+        still makes it back before the validator gives up.
+        """
+        if not synapse.timeout:
+            return None
+        sent_at = time.time()
+        if synapse.dendrite is not None and synapse.dendrite.nonce:
+            # Guard against the validator's clock running ahead of ours.
+            sent_at = min(sent_at, synapse.dendrite.nonce / 1e9)
+        return sent_at + synapse.timeout - self.config.neuron.deadline_margin
 
     async def forward(self, synapse: template.protocol.WorkData) -> template.protocol.WorkData:
         self.logger.info(f"Received synapse object: {synapse}")
@@ -79,48 +128,70 @@ class Miner(BaseMinerNeuron):
                 self.logger.error(f"Invalid work data received. Missing fields: {', '.join(missing_fields)}")
                 return synapse
 
+        # Validators that predate binary headers don't send a format, they expect the string one.
+        header_format = synapse.work_data.get('header_format', STRING_FORMAT)
+        if header_format not in HEADER_FORMATS:
+            self.logger.error(f"Invalid work data received. Unknown header format: {header_format}")
+            return synapse
+
         self.logger.info(f"Starting mining process for block: {block[:10]}...")
         self.logger.info(f"Target: {target}")
         self.logger.info(f"Assigned nonce range: {nonce_range_start} to {nonce_range_end}")
+        self.logger.info(f"Header format: {header_format}")
 
-        # Convert target from compact form to full target
-        bits = int(target, 16)
-        target_full = self.bits_to_target(bits)
-
-        # Simulate lower difficulty by increasing the target value
-        test_difficulty_factor = 1e20  # Significantly lowered factor for testing
-        target_full = int(target_full * test_difficulty_factor)
+        # Convert target from compact form to full target, raised to simulate a lower difficulty
+        target_full = template.utils.pow.expand_target(target)
 
         self.logger.info(f"Adjusted target (full): {target_full}")
 
-        hashes_computed = 0
-        start_time = time.time()
-
-        for nonce in range(nonce_range_start, nonce_range_end):
-            block_header = block + str(nonce)
-            block_hash = self.double_sha256(block_header)
-            hashes_computed += 1
-
-            if int(block_hash, 16) < target_full:
-                end_time = time.time()
-                duration = end_time - start_time
-                hash_rate = hashes_computed / duration if duration > 0 else 0
-                self.logger.info(f"Found valid hash: {block_hash} with nonce: {nonce}")
-                self.logger.info(f"Hashing took {duration:.2f} seconds")
-                self.logger.info(f"Hash rate: {hash_rate:.2f} hashes/second")
-                synapse.miner_response = {'block_hash': block_hash, 'nonce': nonce}
-                break
-
-            if hashes_computed % 1000 == 0:
-                self.logger.info(f"Computed {hashes_computed} hashes...")
-
-        if not synapse.miner_response:
-            end_time = time.time()
-            duration = end_time - start_time
-            hash_rate = hashes_computed / duration if duration > 0 else 0
+        deadline = self.get_deadline(synapse)
+        if deadline is not None:
+            self.logger.info(f"Mining deadline in {deadline - time.time():.2f} seconds")
+
+        priority = await self.priority(synapse)
+        wait_timeout = max(0.0, deadline - time.time()) if deadline is not None else None
+        try:
+            async with self.scheduler.slot(priority, timeout=wait_timeout) as wait_time:
+                self.logger.info(f"Waited {wait_time:.3f} seconds for a hashing slot")
+                self.metrics.queue_wait.observe(wait_time)
+                result = await self.engine.search(
+                    block, target_full, nonce_range_start, nonce_range_end, header_format, deadline
+                )
+        except QueueFullError as e:
+            self.logger.warning(f"Dropping request: {e}")
+            self.metrics.dropped.inc(reason="queue_full")
+            synapse.hashes = 0
+            return synapse
+        except asyncio.TimeoutError:
+            self.logger.warning("Deadline passed while waiting for a hashing slot")
+            self.metrics.dropped.inc(reason="deadline")
+            synapse.hashes = 0
+            return synapse
+        except ValueError as e:
+            self.logger.error(f"Invalid work data received: {e}")
+            return synapse
+        except BrokenProcessPool as e:
+            self.logger.error(f"Hashing pool failed, dropping request: {e}")
+            self.metrics.dropped.inc(reason="engine_failure")
+            synapse.hashes = 0
+            return synapse
+        finally:
+            self.logger.info(f"Job queue metrics: {self.scheduler.metrics()}")
+            self.logger.info(f"Rate limiter metrics: {self.rate_limiter.metrics()}")
+
+        synapse.hashes = result.hashes
+        if result.found:
+            self.logger.info(f"Found valid hash: {result.block_hash} with nonce: {result.nonce}")
+            synapse.miner_response = {'block_hash': result.block_hash, 'nonce': result.nonce}
+        elif result.expired and result.nonce is not None:
+            # Out of time, hand back the lowest hash seen so the work isn't wasted.
+            self.logger.info(f"Deadline reached, returning best partial hash: {result.block_hash} with nonce: {result.nonce}")
+            synapse.miner_response = {'block_hash': result.block_hash, 'nonce': result.nonce, 'partial': True}
+        else:
             self.logger.info("No valid hash found in given range")
-            self.logger.info(f"Hashing took {duration:.2f} seconds")
-            self.logger.info(f"Hash rate: {hash_rate:.2f} hashes/second")
+        self.logger.info(f"Hashing took {result.duration:.2f} seconds")
+        self.logger.info(f"Hash rate: {result.hash_rate:.2f} hashes/second")
+        self.metrics.observe_search(result, nonce_range_end - nonce_range_start, self.engine.num_workers)
 
         self.logger.info(f"Sending response: {synapse.miner_response}")
         return synapse
@@ -152,8 +223,8 @@ class Miner(BaseMinerNeuron):
         - Consider blacklisting entities that are not validators or have insufficient stake.
 
         In practice it would be wise to blacklist requests from entities that are not validators, or do not have
-        enough stake. This can be checked via metagraph.S and metagraph.validator_permit. You can always attain
-        the uid of the sender via a metagraph.hotkeys.index( synapse.dendrite.hotkey ) call.
+        enough stake. This can be checked via metagraph_index.stake and metagraph_index.validator_permit. You can
+        always attain the uid of the sender via a metagraph_index.uid( synapse.dendrite.hotkey ) call.
 
         Otherwise, allow the request to be processed further.
         """
@@ -162,33 +233,56 @@ class Miner(BaseMinerNeuron):
             bt.logging.warning(
                 "Received a request without a dendrite or hotkey."
             )
-            return True, "Missing dendrite or hotkey"
+            return self.reject("missing_hotkey", "Missing dendrite or hotkey")
+
+        # Turn away overflow before the body is deserialized and queued.
+        if self.scheduler.is_full():
+            bt.logging.trace(
+                f"Blacklisting {synapse.dendrite.hotkey}, job queue is full"
+            )
+            return self.reject("queue_full", "Job queue full")
 
         # TODO(developer): Define how miners should blacklist requests.
-        uid = self.metagraph.hotkeys.index(synapse.dendrite.hotkey)
+        # Read the index once, a metagraph sync swaps in a new one.
+        index = self.metagraph_index
+        uid = index.uid(synapse.dendrite.hotkey)
         if (
             not self.config.blacklist.allow_non_registered
-            and synapse.dendrite.hotkey not in self.metagraph.hotkeys
+            and uid is None
         ):
             # Ignore requests from un-registered entities.
             bt.logging.trace(
                 f"Blacklisting un-registered hotkey {synapse.dendrite.hotkey}"
             )
-            return True, "Unrecognized hotkey"
+            return self.reject("unregistered", "Unrecognized hotkey")
 
         if self.config.blacklist.force_validator_permit:
             # If the config is set to force validator permit, then we should only allow requests from validators.
-            if not self.metagraph.validator_permit[uid]:
+            if uid is None or not index.validator_permit[uid]:
                 bt.logging.warning(
                     f"Blacklisting a request from non-validator hotkey {synapse.dendrite.hotkey}"
                 )
-                return True, "Non-validator hotkey"
+                return self.reject("non_validator", "Non-validator hotkey")
+
+        # Keep a single caller from starving the others, high stake callers get more room.
+        stake = float(index.stake[uid]) if uid is not None else 0.0
+        admitted, retry_after = self.rate_limiter.acquire(synapse.dendrite.hotkey, stake, index.max_stake)
+        if not admitted:
+            bt.logging.trace(
+                f"Rate limiting {synapse.dendrite.hotkey}, retry after {retry_after:.2f}s"
+            )
+            return self.reject("rate_limited", f"Rate limited, retry after {retry_after:.2f}s")
 
         bt.logging.trace(
             f"Not Blacklisting recognized hotkey {synapse.dendrite.hotkey}"
         )
         return False, "Hotkey recognized!"
 
+    def reject(self, reason: str, message: str) -> typing.Tuple[bool, str]:
+        """Counts a blacklisted request under `reason` and returns the blacklist verdict with `message`."""
+        self.metrics.rejects.inc(reason=reason)
+        return True, message
+
     async def priority(self, synapse: template.protocol.WorkData) -> float:
         """
         The priority function determines the order in which requests are handled. More valuable or higher-priority
@@ -216,11 +310,12 @@ class Miner(BaseMinerNeuron):
             return 0.0
 
         # TODO(developer): Define how miners should prioritize requests.
-        caller_uid = self.metagraph.hotkeys.index(
-            synapse.dendrite.hotkey
-        )  # Get the caller index.
+        index = self.metagraph_index
+        caller_uid = index.uid(synapse.dendrite.hotkey)  # Get the caller index.
+        if caller_uid is None:
+            return 0.0  # Only reachable when non-registered callers are allowed.
         priority = float(
-            self.metagraph.S[caller_uid]
+            index.stake[caller_uid]
         )  # Return the stake as the priority.
         bt.logging.trace(
             f"Prioritizing {synapse.dendrite.hotkey} with value: {priority}"
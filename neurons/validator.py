@@ -17,10 +17,10 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
+import os
 import time
 import aiohttp
 import asyncio
-import requests
 import argparse
 
 # Bittensor
@@ -35,6 +35,13 @@ from template.base.validator import BaseValidatorNeuron
 # Bittensor Validator Template:
 from template.validator import forward
 from template.protocol import WorkData
+from template.utils.http import HttpClient
+from template.utils.metrics import MetricsExporter, MetricsRegistry
+from template.utils.pow import expand_target
+from template.validator.partition import HashrateTracker, partition_nonce_range
+from template.validator.reward import pow_reward
+from template.validator.tracing import MinerCall, RoundTracer
+from template.validator.verify import ProofVerifier
 
 # Helper function to convert numpy data types to native types
 def convert_to_serializable(obj):
@@ -68,7 +75,22 @@ class Validator(BaseValidatorNeuron):
         bt.logging.info(f"Axon config: {self.axon.config}")
         bt.logging.info(f"Axon external IP: {self.axon.external_ip}")
         bt.logging.info(f"Axon external port: {self.axon.external_port}")
-        self.check_endpoint_connection()
+        self.verifier = ProofVerifier(max_workers=self.config.neuron.verify_workers or None)
+        self.hashrates = HashrateTracker(alpha=self.config.neuron.hashrate_alpha)
+        self.http = HttpClient(
+            pool_size=self.config.neuron.http_pool_size,
+            timeout=self.config.neuron.http_timeout,
+            keepalive_timeout=self.config.neuron.http_keepalive,
+        )
+        self.tracer = RoundTracer(sample_rate=self.config.neuron.trace_sample_rate)
+        self.metrics_exporter = None
+        if self.config.neuron.metrics_port is not None:
+            registry = MetricsRegistry()
+            self.tracer.register(registry)
+            self.metrics_exporter = MetricsExporter(
+                registry, port=self.config.neuron.metrics_port, host=self.config.neuron.metrics_host
+            )
+            self.metrics_exporter.start()
         self.check_network_config()
 
     async def __aenter__(self):
@@ -79,25 +101,57 @@ class Validator(BaseValidatorNeuron):
         await self.async_teardown()
 
     async def async_setup(self):
-        # Perform any asynchronous setup here
-        pass
+        # The pooled HTTP session is created here, on the loop that uses it.
+        await self.check_endpoint_connection()
+        if self.sync_service is not None:
+            self.sync_service.start()
 
     async def async_teardown(self):
-        # Perform any asynchronous cleanup here
-        pass
-
-    def check_endpoint_connection(self):
-        bt.logging.info("Checking endpoint connections")
-        try:
-            response = requests.get(self.get_work_url, timeout=5)
-            bt.logging.info(f"Get work endpoint status: {response.status_code}")
-        except requests.RequestException as e:
-            bt.logging.error(f"Failed to connect to get work endpoint: {e}")
+        if self.sync_service is not None:
+            self.sync_service.stop()
+        self.block_clock.stop()
+        if self.checkpoint_writer is not None:
+            self.checkpoint_writer.stop()
+        await self.http.close()
+        self.verifier.shutdown()
+        self.dump_traces()
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.stop()
+
+    def dump_traces(self):
+        """Writes the round timing histograms to `traces.json` in the neuron's directory."""
         try:
-            response = requests.get(self.submit_work_url, timeout=5)
-            bt.logging.info(f"Submit work endpoint status: {response.status_code}")
-        except requests.RequestException as e:
-            bt.logging.error(f"Failed to connect to submit work endpoint: {e}")
+            self.tracer.dump(os.path.join(self.config.neuron.full_path, "traces.json"))
+        except OSError as e:
+            bt.logging.error(f"Failed to dump round traces: {e}")
+
+    def finish_trace(self, trace):
+        self.tracer.finish_round(trace)
+        interval = self.config.neuron.trace_dump_interval
+        if interval and self.tracer.rounds % interval == 0:
+            self.dump_traces()
+
+    @staticmethod
+    def log_miner(trace, uid, message, level="info"):
+        """Logs a per-miner event at `level` if the miner is sampled this round, at debug level otherwise."""
+        if trace is None or trace.is_sampled(uid):
+            getattr(bt.logging, level)(message)
+        else:
+            bt.logging.debug(message)
+
+    def apply_background_sync(self):
+        """Swaps in the metagraph fetched by the background sync, if there is a new one."""
+        if self.sync_service is not None and self.sync_service.poll():
+            bt.logging.info(f"Applied background metagraph sync: {self.metagraph}")
+
+    async def check_endpoint_connection(self):
+        bt.logging.info("Checking endpoint connections")
+        for name, url in (("Get work", self.get_work_url), ("Submit work", self.submit_work_url)):
+            try:
+                async with self.http.get(url, timeout=5) as response:
+                    bt.logging.info(f"{name} endpoint status: {response.status}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                bt.logging.error(f"Failed to connect to {name.lower()} endpoint: {e}")
 
     def check_network_config(self):
         bt.logging.info("Checking network configuration")
@@ -111,97 +165,185 @@ class Validator(BaseValidatorNeuron):
     async def query_endpoint(self):
         bt.logging.info(f"Querying endpoint: {self.get_work_url}")
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self.get_work_url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        # Use default values if 'request_id' or 'timestamp' are missing
-                        data['request_id'] = data.get('request_id', 'default_request_id')
-                        data['timestamp'] = data.get('timestamp', str(int(time.time())))
-                        return data
-                    else:
-                        bt.logging.error(f"Failed to query endpoint: {response.status}")
-                        return None
-        except aiohttp.ClientError as e:
+            async with self.http.get(self.get_work_url) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    # Use default values if 'request_id' or 'timestamp' are missing
+                    data['request_id'] = data.get('request_id', 'default_request_id')
+                    data['timestamp'] = data.get('timestamp', str(int(time.time())))
+                    return data
+                else:
+                    bt.logging.error(f"Failed to query endpoint: {response.status}")
+                    return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             bt.logging.error(f"Error querying endpoint: {str(e)}")
             return None
 
-    async def send_work_to_miners(self, work_data):
-        bt.logging.info(f"Sending work to miners: Request ID: {work_data.get('request_id', 'N/A')}")
+    def get_serving_miner_uids(self):
+        """Returns the uids worth sending work to: serving axons that haven't been failing repeatedly."""
+        return [
+            int(uid)
+            for uid in np.flatnonzero(self.metagraph_index.serving)
+            if not self.hashrates.is_dead(int(uid))
+        ]
 
-        miner_responses = []
+    def build_miner_synapses(self, work_data, trace=None):
         total_nonce_range_start = work_data.get('nonce_range_start', 0)
         total_nonce_range_end = work_data.get('nonce_range_end', 1000000)
-        total_nonce_range_size = total_nonce_range_end - total_nonce_range_start + 1
-        num_miners = len(self.metagraph.uids)
-        nonce_range_per_miner = total_nonce_range_size // num_miners if num_miners > 0 else total_nonce_range_size
-
-        for idx, uid in enumerate(self.metagraph.uids):
-            bt.logging.info(f"Sending work to miner {uid}")
-            bt.logging.info(f"Miner {uid} axon details: {self.metagraph.axons[uid]}")
-
-            # Calculate unique nonce ranges for each miner
-            miner_nonce_start = total_nonce_range_start + idx * nonce_range_per_miner
-            miner_nonce_end = miner_nonce_start + nonce_range_per_miner - 1
-
-            # Ensure the last miner covers any remaining nonces
-            if idx == num_miners - 1:
-                miner_nonce_end = total_nonce_range_end
-
-            bt.logging.info(f"Assigned nonce range {miner_nonce_start} to {miner_nonce_end} for miner {uid}")
 
+        # Split the range in proportion to each miner's measured hashrate, so fast miners don't sit idle
+        # while slow ones become the round's critical path.
+        uids = self.get_serving_miner_uids()
+        if not uids:
+            bt.logging.warning("No serving miners to send work to")
+        assignments = partition_nonce_range(
+            total_nonce_range_start,
+            total_nonce_range_end,
+            uids,
+            hashrates=self.hashrates.estimates(uids),
+            min_share=self.config.neuron.min_nonce_share,
+        )
+
+        synapses = []
+        for uid, miner_nonce_start, miner_nonce_end in assignments:
+            self.log_miner(trace, uid, f"Assigned nonce range {miner_nonce_start} to {miner_nonce_end} for miner {uid}")
+
+            synapse = WorkData(
+                work_data={
+                    'block': work_data.get('block', ''),
+                    'target': work_data.get('target', ''),
+                    'nonce_range_start': miner_nonce_start,
+                    'nonce_range_end': miner_nonce_end,
+                    'transactions': work_data.get('transactions', []),
+                    'header_format': work_data.get('header_format', self.config.neuron.header_format)
+                },
+                request_id=work_data.get('request_id', 'default_request_id'),
+                timestamp=work_data.get('timestamp', str(int(time.time()))),
+                validator_hotkey=self.wallet.hotkey.ss58_address
+            )
+            synapses.append((uid, synapse))
+        return synapses
+
+    async def query_miner(self, uid, synapse, semaphore, trace=None):
+        bytes_sent = len(synapse.model_dump_json())
+        async with semaphore:
+            start_time = time.perf_counter()
             try:
-                synapse = WorkData(
-                    work_data={
-                        'block': work_data.get('block', ''),
-                        'target': work_data.get('target', ''),
-                        'nonce_range_start': miner_nonce_start,
-                        'nonce_range_end': miner_nonce_end,
-                        'transactions': work_data.get('transactions', [])
-                    },
-                    request_id=work_data.get('request_id', 'default_request_id'),
-                    timestamp=work_data.get('timestamp', str(int(time.time()))),
-                    validator_hotkey=self.wallet.hotkey.ss58_address
-                )
-                bt.logging.info(f"Created synapse")
                 response = await self.dendrite(
                     axons=[self.metagraph.axons[uid]],
                     synapse=synapse,
-                    deserialize=True,
+                    deserialize=False,
                     timeout=60  # Adjust timeout as needed
                 )
-                bt.logging.info(f"Raw response from dendrite: {response}")
-                if response and response[0] is not None:
-                    # Access the correct keys from the response
-                    miner_response = {
-                        'uid': int(uid),  # Convert uid to int
-                        'block_hash': response[0]['block_hash'],
-                        'nonce': int(response[0]['nonce'])  # Convert nonce to int
-                    }
-                    bt.logging.info(f"Received response from miner {uid}: {miner_response}")
-                    miner_responses.append(miner_response)
-                else:
-                    bt.logging.warning(f"No valid response received from miner {uid}")
             except Exception as e:
-                bt.logging.error(f"Error communicating with miner {uid}: {str(e)}")
-                bt.logging.error(f"Exception details: {type(e).__name__}, {str(e)}")
+                self.tracer.record_call(trace, MinerCall(uid, time.perf_counter() - start_time, "error", bytes_sent))
+                self.log_miner(trace, uid, f"Error communicating with miner {uid}: {type(e).__name__}, {str(e)}", "error")
+                self.hashrates.observe_failure(uid)
+                return None
+            latency = time.perf_counter() - start_time
+
+        result = response[0] if response else None
+        status = "none"
+        if result is not None and result.dendrite is not None and result.dendrite.status_code is not None:
+            status = str(result.dendrite.status_code)
+        self.tracer.record_call(
+            trace,
+            MinerCall(uid, latency, status, bytes_sent, len(result.model_dump_json()) if result is not None else 0),
+        )
+
+        # Only transport errors and timeouts count against a miner, they are what take its slice away.
+        if result is None or not result.is_success:
+            self.log_miner(trace, uid, f"Failed to reach miner {uid}: status {status}", "warning")
+            self.hashrates.observe_failure(uid)
+            return None
+        nonce_range_start = synapse.work_data['nonce_range_start']
+        nonce_range_end = synapse.work_data['nonce_range_end']
+        output = result.deserialize()
+
+        if output is None:
+            # A completed search without a winner, miners that don't report their hashes covered the whole range.
+            hashes = result.hashes if result.hashes is not None else nonce_range_end - nonce_range_start + 1
+            self.log_miner(trace, uid, f"Empty response from miner {uid} after {hashes} hashes")
+            self.hashrates.observe(uid, hashes, latency)
+            return None
+        try:
+            # Access the correct keys from the response
+            miner_response = {
+                'uid': uid,
+                'block_hash': output['block_hash'],
+                'nonce': int(output['nonce'])  # Convert nonce to int
+            }
+            int(miner_response['block_hash'], 16)  # Must be a hex digest to be comparable
+            if output.get('partial'):
+                # The best hash seen before the deadline, not a solution.
+                miner_response['partial'] = True
+        except (KeyError, TypeError, ValueError) as e:
+            self.log_miner(trace, uid, f"Malformed response from miner {uid}: {output} ({e})", "warning")
+            return None
+
+        hashes = result.hashes
+        if hashes is None:
+            # Miners that don't report their hashes stopped at a winner, otherwise they covered their whole range.
+            hashes = nonce_range_end - nonce_range_start + 1
+            if not miner_response.get('partial') and nonce_range_start <= miner_response['nonce'] <= nonce_range_end:
+                hashes = miner_response['nonce'] - nonce_range_start + 1
+        self.hashrates.observe(uid, hashes, latency)
+        return miner_response
+
+    async def iter_miner_responses(self, work_data, assignments=None, trace=None):
+        """
+        Sends the work to every miner concurrently and yields the valid responses as they arrive.
+
+        The per-miner synapses are built up front, at most `neuron.max_concurrent_queries` dendrite calls are
+        in flight at once, so a round takes about as long as the slowest miner instead of the sum of all of them.
+        If `assignments` is given it is filled with the nonce range sent to each uid. Calls are recorded in
+        `trace`, which also decides which miners are logged individually.
+        """
+        bt.logging.info(f"Sending work to miners: Request ID: {work_data.get('request_id', 'N/A')}")
+
+        synapses = self.build_miner_synapses(work_data, trace)
+        if assignments is not None:
+            for uid, synapse in synapses:
+                assignments[uid] = (synapse.work_data['nonce_range_start'], synapse.work_data['nonce_range_end'])
+        semaphore = asyncio.Semaphore(self.config.neuron.max_concurrent_queries)
+        queries = [
+            asyncio.ensure_future(self.query_miner(uid, synapse, semaphore, trace))
+            for uid, synapse in synapses
+        ]
+        received = 0
+        try:
+            for query in asyncio.as_completed(queries):
+                miner_response = await query
+                if miner_response is not None:
+                    received += 1
+                    self.log_miner(trace, miner_response['uid'], f"Received response from miner {miner_response['uid']}: {miner_response}")
+                    yield miner_response
+        finally:
+            # The consumer may stop early, don't leave queries running in the background.
+            for query in queries:
+                query.cancel()
+
+        bt.logging.info(f"Finished sending work to {len(synapses)} miners. Received {received} valid responses.")
 
-        bt.logging.info(f"Finished sending work to all miners. Received {len(miner_responses)} valid responses.")
-        return miner_responses
+    async def send_work_to_miners(self, work_data):
+        return [miner_response async for miner_response in self.iter_miner_responses(work_data)]
 
-    async def submit_work(self, best_response):
+    async def submit_work(self, best_response, trace=None):
         bt.logging.info(f"Submitting work to: {self.submit_work_url}")
+        with self.tracer.span("submit", trace):
+            return await self._submit_work(best_response)
+
+    async def _submit_work(self, best_response):
         try:
             # Convert best_response to serializable types
             best_response_serializable = convert_to_serializable(best_response)
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.submit_work_url, json=best_response_serializable) as response:
-                    if response.status == 200:
-                        bt.logging.info("Work submitted successfully")
-                        return True
-                    else:
-                        bt.logging.error(f"Failed to submit work. Status: {response.status}")
-                        return False
+            async with self.http.post(self.submit_work_url, json=best_response_serializable) as response:
+                if response.status == 200:
+                    bt.logging.info("Work submitted successfully")
+                    return True
+                else:
+                    bt.logging.error(f"Failed to submit work. Status: {response.status}")
+                    return False
         except Exception as e:
             bt.logging.error(f"Error submitting work: {e}")
             return False
@@ -210,25 +352,194 @@ class Validator(BaseValidatorNeuron):
         bt.logging.info("Starting forward pass")
         try:
             bt.logging.info("Attempting to query endpoint")
-            work_data = await self.query_endpoint()
+            trace = self.tracer.start_round()
+            with self.tracer.span("query_endpoint", trace):
+                work_data = await self.query_endpoint()
             if work_data:
                 bt.logging.info("Successfully received work data. Attempting to send work to miners")
-                miner_responses = await self.send_work_to_miners(work_data)
-                bt.logging.info(f"Received miner responses: {miner_responses}")
-                if miner_responses:
-                    # Select the best response based on the lowest block hash value
-                    best_response = min(miner_responses, key=lambda x: int(x['block_hash'], 16))
-                    bt.logging.info(f"Best response: {best_response}")
-                    submit_result = await self.submit_work(best_response)
-                    bt.logging.info(f"Work submission result: {submit_result}")
-                else:
-                    bt.logging.warning("No valid responses from miners")
+                await self.run_round(work_data, trace=trace)
             else:
                 bt.logging.error("Failed to get work from endpoint")
         except Exception as e:
             bt.logging.error(f"Error in forward pass: {str(e)}")
             bt.logging.error(f"Exception details: {type(e).__name__}, {str(e)}")
 
+    async def run_round(self, work_data, wait_for_submission=True, trace=None):
+        """
+        Dispatches one work item to the miners, scores every response and submits the best one.
+
+        Every response is verified locally before it counts: the hash is recomputed from the nonce, which has
+        to lie in the range assigned to the miner, and has to meet the target. Forged or above target responses
+        earn nothing and are never submitted. Partial responses, the best hash a miner found before its deadline,
+        only feed the hashrate estimate. In
+        early win mode (`neuron.early_win`) the first verified hash below the target is submitted straight
+        away; later responses are still collected for scoring but no longer affect the submission.
+
+        With `wait_for_submission=False` the submission is left running and its task is returned, so the
+        caller can start the next round while it completes.
+
+        The stages of the round and every dendrite call are recorded in `trace`, a new one by default, which is
+        summarized in a single line when the round ends.
+        """
+        if trace is None:
+            trace = self.tracer.start_round()
+        trace.request_id = work_data.get('request_id', 'N/A')
+        # The verifier has to hash with the same header format the miners were sent.
+        work_data = dict(work_data, header_format=self.config.neuron.header_format)
+        try:
+            return await self._run_round(work_data, wait_for_submission, trace)
+        finally:
+            self.finish_trace(trace)
+
+    async def _run_round(self, work_data, wait_for_submission, trace):
+        try:
+            target = expand_target(work_data.get('target', ''))
+        except ValueError:
+            bt.logging.warning(f"Work item has no usable target: {work_data.get('target')}")
+            target = None
+        early_win = self.config.neuron.early_win and target is not None
+
+        best_response = None
+        submission = None
+        assignments = {}
+        responses = []
+        checked = {}
+        with self.tracer.span("dispatch", trace):
+            async for miner_response in self.iter_miner_responses(work_data, assignments, trace):
+                responses.append(miner_response)
+                if not early_win or submission is not None or miner_response.get('partial') or pow_reward(miner_response, target) == 0:
+                    continue
+                # Claimed winners are checked on their own so a genuine one is submitted without waiting for the round.
+                verified = await self.verifier.verify(work_data, target, [miner_response], assignments)
+                checked[len(responses) - 1] = verified[0]
+                if verified[0]:
+                    bt.logging.info(f"Early win from miner {miner_response['uid']}: {miner_response}")
+                    best_response = miner_response
+                    submission = asyncio.ensure_future(self.submit_work(best_response, trace))
+
+        # Without a target nothing can be verified, so nothing is trusted.
+        valid = np.zeros(len(responses), dtype=bool)
+        if target is not None:
+            with self.tracer.span("verify", trace):
+                unchecked = [i for i in range(len(responses)) if i not in checked]
+                valid[unchecked] = await self.verifier.verify(
+                    work_data, target, [responses[i] for i in unchecked], assignments
+                )
+            for i, ok in checked.items():
+                valid[i] = ok
+
+        with self.tracer.span("score", trace):
+            if responses:
+                # Partial responses are genuine but not solutions, they earn nothing.
+                rewards = np.array(
+                    [
+                        pow_reward(miner_response, target) if ok and not miner_response.get('partial') else 0.0
+                        for miner_response, ok in zip(responses, valid)
+                    ],
+                    dtype=np.float32,
+                )
+                self.update_scores(rewards, [miner_response['uid'] for miner_response in responses])
+
+            if submission is None:
+                # Select the best response based on the lowest block hash value, every verified solution meets the target
+                for miner_response, ok in zip(responses, valid):
+                    if ok and not miner_response.get('partial') and (best_response is None or int(miner_response['block_hash'], 16) < int(best_response['block_hash'], 16)):
+                        best_response = miner_response
+
+        if best_response is None:
+            bt.logging.warning("No valid responses from miners")
+            return None
+        bt.logging.info(f"Best response: {best_response}")
+        if submission is None:
+            submission = asyncio.ensure_future(self.submit_work(best_response, trace))
+        if not wait_for_submission:
+            return submission
+        submit_result = await submission
+        bt.logging.info(f"Work submission result: {submit_result}")
+        return submission
+
+    @staticmethod
+    def work_key(work_data):
+        """Identifies a work item, the endpoint may hand out the same item more than once."""
+        return tuple(
+            str(work_data.get(field))
+            for field in ('request_id', 'block', 'target', 'nonce_range_start', 'nonce_range_end')
+        )
+
+    async def prefetch_work(self, queue):
+        """
+        Polls the get work endpoint and puts every new work item on `queue`.
+
+        The queue holds a single item, so the next item is fetched while the current round is in flight but
+        the producer never runs further ahead than that.
+        """
+        last_key = None
+        while True:
+            try:
+                with self.tracer.span("query_endpoint"):
+                    work_data = await self.query_endpoint()
+                if work_data is None or self.work_key(work_data) == last_key:
+                    await asyncio.sleep(self.config.neuron.work_poll_interval)
+                    continue
+                last_key = self.work_key(work_data)
+            except Exception as e:
+                # A bad work item must not stop the producer, the rounds would wait for work forever.
+                bt.logging.error(f"Error prefetching work: {type(e).__name__}, {str(e)}")
+                await asyncio.sleep(self.config.neuron.work_poll_interval)
+                continue
+            await queue.put(work_data)
+
+    @staticmethod
+    async def next_work(queue, producer):
+        """Waits for the next work item, raising the producer's error if it stopped instead."""
+        getter = asyncio.ensure_future(queue.get())
+        try:
+            done, _ = await asyncio.wait({getter, producer}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if not getter.done():
+                getter.cancel()
+        if getter in done:
+            return getter.result()
+        # The producer only returns by failing.
+        producer.result()
+        raise RuntimeError("Work prefetching stopped")
+
+    async def run_pipeline(self):
+        """
+        Runs rounds back to back as work becomes available, instead of the fixed fetch, dispatch, submit and
+        sleep cycle of `forward`.
+
+        The next work item is prefetched during the current round, and each submission overlaps the dispatch
+        of the following round.
+        """
+        queue = asyncio.Queue(maxsize=1)
+        producer = asyncio.ensure_future(self.prefetch_work(queue))
+        submissions = set()
+
+        def on_submitted(task):
+            submissions.discard(task)
+            if not task.cancelled() and task.exception() is None:
+                bt.logging.info(f"Work submission result: {task.result()}")
+
+        try:
+            while not self.should_exit:
+                work_data = await self.next_work(queue, producer)
+                bt.logging.info(f"Starting round for request ID: {work_data.get('request_id', 'N/A')}")
+                try:
+                    submission = await self.run_round(work_data, wait_for_submission=False)
+                except Exception as e:
+                    bt.logging.error(f"Error in pipelined round: {type(e).__name__}, {str(e)}")
+                    continue
+                if submission is not None:
+                    submissions.add(submission)
+                    submission.add_done_callback(on_submitted)
+                self.apply_background_sync()
+                self.save_state()
+        finally:
+            producer.cancel()
+            if submissions:
+                await asyncio.gather(*submissions, return_exceptions=True)
+
 async def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--debug', action='store_true', help='Enable debug logging')
@@ -239,10 +550,16 @@ async def main():
         bt.logging.set_debug(True)
 
     async with Validator() as validator:
-        while True:
-            bt.logging.info(f"Validator running... {time.time()}")
-            await validator.forward()
-            await asyncio.sleep(5)
+        if validator.config.neuron.pipeline:
+            bt.logging.info("Running validator in pipelined mode")
+            await validator.run_pipeline()
+        else:
+            while not validator.should_exit:
+                bt.logging.info(f"Validator running... {time.time()}")
+                await validator.forward()
+                validator.apply_background_sync()
+                validator.save_state()
+                await asyncio.sleep(5)
 
 # The main function parses the configuration and runs the validator.
 if __name__ == "__main__":
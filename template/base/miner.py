@@ -15,7 +15,6 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
-import time
 import asyncio
 import threading
 import argparse
@@ -115,13 +114,15 @@ class BaseMinerNeuron(BaseNeuron):
         # This loop maintains the miner's operations until intentionally stopped.
         try:
             while not self.should_exit:
+                next_sync_block = (
+                    self.metagraph.last_update[self.uid]
+                    + self.config.neuron.epoch_length
+                )
+                # Sleeps until the block arrives, waking up every second to check if we should exit.
                 while (
-                    self.block - self.metagraph.last_update[self.uid]
-                    < self.config.neuron.epoch_length
+                    self.block_clock.wait_for_block(next_sync_block, timeout=1)
+                    < next_sync_block
                 ):
-                    # Wait before checking again.
-                    time.sleep(1)
-
                     # Check if we should exit.
                     if self.should_exit:
                         break
@@ -160,6 +161,7 @@ class BaseMinerNeuron(BaseNeuron):
         if self.is_running:
             bt.logging.debug("Stopping miner in background thread.")
             self.should_exit = True
+            self.block_clock.stop()
             if self.thread is not None:
                 self.thread.join(5)
             self.is_running = False
@@ -194,3 +196,4 @@ class BaseMinerNeuron(BaseNeuron):
 
         # Sync the metagraph.
         self.metagraph.sync(subtensor=self.subtensor)
+        self.refresh_metagraph_index()
@@ -24,7 +24,8 @@ from abc import ABC, abstractmethod
 
 # Sync calls set weights and also resyncs the metagraph.
 from template.utils.config import check_config, add_args, config
-from template.utils.misc import ttl_get_block
+from template.utils.block_clock import BlockClock
+from template.base.utils.metagraph import MetagraphIndex
 from template import __spec_version__ as spec_version
 from template.mock import MockSubtensor, MockMetagraph
 
@@ -53,11 +54,12 @@ class BaseNeuron(ABC):
     subtensor: "bt.subtensor"
     wallet: "bt.wallet"
     metagraph: "bt.metagraph"
+    metagraph_index: MetagraphIndex
     spec_version: int = spec_version
 
     @property
     def block(self):
-        return ttl_get_block(self)
+        return self.block_clock.block
 
     def __init__(self, config=None):
         base_config = copy.deepcopy(config or BaseNeuron.config())
@@ -100,8 +102,20 @@ class BaseNeuron(ABC):
         bt.logging.info(f"Subtensor: {self.subtensor}")
         bt.logging.info(f"Metagraph: {self.metagraph}")
 
+        # Follows new blocks on its own connection, so reading the block costs no RPC.
+        self.block_clock = BlockClock(
+            self.subtensor,
+            subscription_subtensor=(
+                None
+                if self.config.neuron.disable_block_subscription
+                else self.connect_subtensor()
+            ),
+        )
+        self.block_clock.start()
+
         # Check if the miner is registered on the Bittensor network before proceeding further.
         self.check_registered()
+        self.refresh_metagraph_index()
 
         # Each miner gets a unique identity (UID) in the network for differentiation.
         self.uid = self.metagraph.hotkeys.index(
@@ -133,9 +147,33 @@ class BaseNeuron(ABC):
         if self.should_set_weights():
             self.set_weights()
 
-    def check_registered(self):
+    def connect_subtensor(self) -> "bt.subtensor":
+        """Opens another connection to the chain, for use from a different thread."""
+        if self.config.mock:
+            # The mock chain lives in memory, there is no connection to share.
+            return self.subtensor
+        return bt.subtensor(config=self.config)
+
+    def fetch_metagraph(self, subtensor: "bt.subtensor") -> "bt.metagraph":
+        """Fetches the current metagraph into a new object, leaving `self.metagraph` untouched."""
+        if self.config.mock:
+            return MockMetagraph(self.config.netuid, subtensor=subtensor)
+        return subtensor.metagraph(self.config.netuid)
+
+    def apply_metagraph(self, metagraph: "bt.metagraph"):
+        """Swaps in a metagraph fetched with `fetch_metagraph`."""
+        self.metagraph = metagraph
+        self.refresh_metagraph_index()
+
+    def refresh_metagraph_index(self):
+        """Rebuilds the hotkey, stake and permit lookups after the metagraph changed."""
+        # Built aside and swapped in with one assignment, readers never see a partial index.
+        self.metagraph_index = MetagraphIndex.build(self.metagraph)
+
+    def check_registered(self, subtensor: "bt.subtensor" = None):
+        subtensor = subtensor or self.subtensor
         # --- Check for registration.
-        if not self.subtensor.is_hotkey_registered(
+        if not subtensor.is_hotkey_registered(
             netuid=self.config.netuid,
             hotkey_ss58=self.wallet.hotkey.ss58_address,
         ):
@@ -145,15 +183,16 @@ class BaseNeuron(ABC):
             )
             exit()
 
-    def should_sync_metagraph(self):
+    def should_sync_metagraph(self, block: int = None):
         """
         Check if enough epoch blocks have elapsed since the last checkpoint to sync.
         """
+        block = self.block if block is None else block
         return (
-            self.block - self.metagraph.last_update[self.uid]
+            block - self.metagraph.last_update[self.uid]
         ) > self.config.neuron.epoch_length
 
-    def should_set_weights(self) -> bool:
+    def should_set_weights(self, block: int = None) -> bool:
         # Don't set weights on initialization.
         if self.step == 0:
             return False
@@ -163,8 +202,9 @@ class BaseNeuron(ABC):
             return False
 
         # Define appropriate logic for when set weights.
+        block = self.block if block is None else block
         return (
-            (self.block - self.metagraph.last_update[self.uid])
+            (block - self.metagraph.last_update[self.uid])
             > self.config.neuron.epoch_length
             and self.neuron_type != "MinerNeuron"
         )  # don't set weights if you're a miner
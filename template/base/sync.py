@@ -0,0 +1,184 @@
+import threading
+import numpy as np
+import bittensor as bt
+
+from dataclasses import dataclass
+from traceback import format_exception
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class WeightsSnapshot:
+    """
+    What a validator sets its weights from, captured on the forward thread
+    so the weights thread never reads state the forward loop is changing.
+
+    Attributes:
+    - scores: Copy of the moving average scores.
+    - metagraph: The metagraph the scores belong to, replaced rather than changed by the sync.
+    """
+
+    scores: np.ndarray
+    metagraph: "bt.metagraph"
+
+
+class SyncService:
+    """
+    Talks to the chain on behalf of a neuron from a background thread, so
+    that a slow RPC never stalls the forward loop.
+
+    Every `interval` seconds the service checks the neuron is still
+    registered and, once an epoch has passed, fetches a fresh metagraph into a
+    new object. The forward loop picks it up with `poll()` between steps,
+    which swaps the reference and runs the neuron's bookkeeping without any
+    chain calls. `poll()` also decides when weights are due and snapshots the
+    scores, the extrinsic is sent from a separate thread so it doesn't hold
+    back the forward loop or the next metagraph refresh. After weights were
+    set, no more are set until a metagraph fetched after that has been
+    applied, the older ones don't show the new `last_update` yet.
+
+    The service and its weight setting thread each own a subtensor
+    connection, a websocket connection must not be shared across threads.
+
+    Args:
+        neuron (BaseNeuron): The neuron to keep in sync.
+        interval (float): Seconds between two sync checks.
+        subtensor (bt.subtensor, optional): Connection used by the service, a new one by default.
+    """
+
+    def __init__(
+        self,
+        neuron,
+        interval: float = 60.0,
+        subtensor: Optional["bt.subtensor"] = None,
+    ):
+        self.neuron = neuron
+        self.interval = interval
+        self.subtensor = subtensor
+        self._lock = threading.Lock()
+        # (metagraph, number of the fetch that got it)
+        self._pending: Optional[tuple] = None
+        self._fetches = 0
+        # Last block seen by the service, `poll()` reads it instead of the chain.
+        self._block: Optional[int] = None
+        # Whether weights were set and no metagraph fetched since then was applied yet.
+        self._awaiting_metagraph = False
+        # Number of fetches started before the last weights were set.
+        self._weights_set_after: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._weights_thread: Optional[threading.Thread] = None
+        self._weights_subtensor: Optional["bt.subtensor"] = None
+        self.syncs = 0
+        self.failures = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running:
+            return
+        if self.subtensor is None:
+            self.subtensor = self.neuron.connect_subtensor()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="metagraph-sync", daemon=True
+        )
+        self._thread.start()
+        bt.logging.info(
+            f"Started background sync every {self.interval} seconds."
+        )
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        for thread in (self._thread, self._weights_thread):
+            if thread is not None:
+                thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.step()
+            except SystemExit:
+                # check_registered exits when the hotkey was deregistered,
+                # which only ends this thread, stop the neuron instead.
+                self.neuron.should_exit = True
+                return
+            except Exception as err:
+                self.failures += 1
+                bt.logging.error(f"Background sync failed: {err}")
+                bt.logging.debug(
+                    "".join(
+                        format_exception(type(err), err, err.__traceback__)
+                    )
+                )
+            self._stop.wait(self.interval)
+
+    def step(self):
+        """Runs one sync check, the chain calls happen here."""
+        neuron = self.neuron
+        neuron.check_registered(subtensor=self.subtensor)
+        block = neuron.block
+        self._block = block
+
+        if neuron.should_sync_metagraph(block=block):
+            with self._lock:
+                self._fetches += 1
+                number = self._fetches
+            metagraph = neuron.fetch_metagraph(self.subtensor)
+            with self._lock:
+                self._pending = (metagraph, number)
+            self.syncs += 1
+            bt.logging.debug(f"Fetched metagraph at block {block}.")
+
+    def _set_weights(self, snapshot: WeightsSnapshot):
+        try:
+            if self._weights_subtensor is None:
+                self._weights_subtensor = self.neuron.connect_subtensor()
+            self.neuron.set_weights(
+                subtensor=self._weights_subtensor, snapshot=snapshot
+            )
+        except Exception as err:
+            bt.logging.error(f"Background set_weights failed: {err}")
+        finally:
+            with self._lock:
+                self._weights_set_after = self._fetches
+
+    def poll(self) -> bool:
+        """Applies the latest fetched metagraph, if any, and starts setting weights when they are due.
+
+        Runs on the forward thread and never touches the chain.
+
+        Returns:
+            bool: Whether a new metagraph was applied.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, None
+            if (
+                pending is not None
+                and self._weights_set_after is not None
+                and pending[1] > self._weights_set_after
+            ):
+                # Fetched after the weights were set, it shows them.
+                self._awaiting_metagraph = False
+                self._weights_set_after = None
+            awaiting = self._awaiting_metagraph
+        if pending is not None:
+            self.neuron.apply_metagraph(pending[0])
+
+        if (
+            not awaiting
+            and self._block is not None
+            and self.neuron.should_set_weights(block=self._block)
+        ):
+            self._awaiting_metagraph = True
+            self._weights_thread = threading.Thread(
+                target=self._set_weights,
+                args=(self.neuron.weights_snapshot(),),
+                name="set-weights",
+                daemon=True,
+            )
+            self._weights_thread.start()
+        return pending is not None
@@ -0,0 +1,356 @@
+import os
+import queue
+import struct
+import zlib
+import threading
+import numpy as np
+import bittensor as bt
+
+from dataclasses import dataclass
+from typing import List, Optional, Union
+
+MAGIC = b"VALSTATE"
+VERSION = 1
+
+# magic, version, n, step, score step, hotkeys size, payload crc32
+_HEADER = struct.Struct("<8sIIqqqI")
+# Padded so the arrays that follow are aligned for memory mapping.
+HEADER_SIZE = 64
+
+# crc32 of the rest of the record, then count, step, score step
+_RECORD_CRC = struct.Struct("<I")
+_RECORD_FIELDS = struct.Struct("<Iqq")
+_RECORD_SIZE = _RECORD_CRC.size + _RECORD_FIELDS.size
+# A record is followed by count uids, update steps and values.
+_RECORD_ITEM_SIZE = 8 + 8 + 4
+
+
+class CheckpointError(Exception):
+    """Raised when a checkpoint can't be read."""
+
+
+@dataclass(frozen=True)
+class ValidatorState:
+    """
+    Everything a validator restores on restart.
+
+    Attributes:
+    - step: Step of the validator.
+    - score_step: Step of the score store, see `ScoreStore.raw`.
+    - updated: Step at which each uid's score was last updated.
+    - values: Score of each uid as of its update step.
+    - hotkeys: Hotkey of each uid.
+    """
+
+    step: int
+    score_step: int
+    updated: np.ndarray
+    values: np.ndarray
+    hotkeys: List[str]
+
+
+@dataclass(frozen=True)
+class StateDelta:
+    """
+    The uids whose score changed since the previous save, appended to the
+    log between two full snapshots.
+
+    Attributes:
+    - step: Step of the validator.
+    - score_step: Step of the score store.
+    - uids: The changed uids.
+    - updated: Step at which each changed uid was last updated.
+    - values: Score of each changed uid as of its update step.
+    """
+
+    step: int
+    score_step: int
+    uids: np.ndarray
+    updated: np.ndarray
+    values: np.ndarray
+
+
+def _fsync_dir(path: str):
+    try:
+        fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class Checkpoint:
+    """
+    Crash safe validator state on disk: a full snapshot, followed by a log
+    of deltas appended since.
+
+    A snapshot is a fixed header (magic, format version, sizes, crc32 of the
+    payload) followed by the update steps and values of every uid, and the
+    hotkeys. It is written to a temporary file, synced and renamed over the
+    previous one, so a crash mid-write leaves the previous snapshot intact.
+    The arrays are memory mapped on load, restoring is a checksum and a copy.
+
+    Between snapshots only the changed uids are appended to the log, each
+    record with its own crc32. A torn record at the end of the log, from a
+    crash mid-append, is dropped on load. Records older than the snapshot,
+    left over when a crash happened between writing a snapshot and
+    truncating the log, are skipped.
+
+    Args:
+        path (str): Path of the snapshot, the log is written next to it.
+        snapshot_interval (int): Number of deltas after which the next save is a full snapshot.
+    """
+
+    def __init__(self, path: str, snapshot_interval: int = 100):
+        self.path = path
+        self.log_path = path + ".log"
+        self.snapshot_interval = snapshot_interval
+        # Deltas saved since the last snapshot, counted when scheduled so a
+        # background writer doesn't delay the decision.
+        self.deltas = 0
+        # Set until a snapshot was saved or loaded, deltas need a base.
+        self.snapshot_due = True
+
+    @property
+    def needs_snapshot(self) -> bool:
+        """Whether the next save must be a full snapshot rather than a delta."""
+        return self.snapshot_due or self.deltas >= self.snapshot_interval
+
+    def schedule(self, item: Union[ValidatorState, StateDelta]):
+        """Accounts for `item` in `needs_snapshot`, before it is written."""
+        if isinstance(item, ValidatorState):
+            self.deltas = 0
+            self.snapshot_due = False
+        else:
+            self.deltas += 1
+
+    def save(self, item: Union[ValidatorState, StateDelta]):
+        """Writes a snapshot or appends a delta."""
+        self.schedule(item)
+        self.write(item)
+
+    def write(self, item: Union[ValidatorState, StateDelta]):
+        if isinstance(item, ValidatorState):
+            self.write_snapshot(item)
+        else:
+            self.append_delta(item)
+
+    def write_snapshot(self, state: ValidatorState):
+        """Atomically replaces the snapshot with `state` and empties the log."""
+        updated = np.ascontiguousarray(state.updated, dtype="<i8")
+        values = np.ascontiguousarray(state.values, dtype="<f4")
+        hotkeys = "\n".join(state.hotkeys).encode()
+        crc = zlib.crc32(hotkeys, zlib.crc32(values, zlib.crc32(updated)))
+        header = _HEADER.pack(
+            MAGIC,
+            VERSION,
+            len(values),
+            state.step,
+            state.score_step,
+            len(hotkeys),
+            crc,
+        )
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(header.ljust(HEADER_SIZE, b"\0"))
+            f.write(updated.tobytes())
+            f.write(values.tobytes())
+            f.write(hotkeys)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        _fsync_dir(self.path)
+
+        # The deltas are part of the snapshot now.
+        open(self.log_path, "wb").close()
+
+    def append_delta(self, delta: StateDelta):
+        """Appends the changed uids to the log."""
+        body = (
+            np.ascontiguousarray(delta.uids, dtype="<i8").tobytes()
+            + np.ascontiguousarray(delta.updated, dtype="<i8").tobytes()
+            + np.ascontiguousarray(delta.values, dtype="<f4").tobytes()
+        )
+        fields = _RECORD_FIELDS.pack(
+            len(delta.uids), delta.step, delta.score_step
+        )
+        crc = zlib.crc32(body, zlib.crc32(fields))
+        with open(self.log_path, "ab") as f:
+            f.write(_RECORD_CRC.pack(crc) + fields + body)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def load(self) -> Optional[ValidatorState]:
+        """Reads the snapshot and replays the log on top of it.
+
+        Returns:
+            Optional[ValidatorState]: The saved state, None if nothing was saved yet.
+
+        Raises:
+            CheckpointError: If the snapshot is corrupt or from an unknown format version.
+        """
+        if not os.path.exists(self.path):
+            return None
+        state = self._read_snapshot()
+        return self._replay(state)
+
+    def _read_snapshot(self) -> ValidatorState:
+        size = os.path.getsize(self.path)
+        with open(self.path, "rb") as f:
+            header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise CheckpointError(f"Truncated checkpoint header: {self.path}")
+        (
+            magic,
+            version,
+            n,
+            step,
+            score_step,
+            hotkeys_size,
+            crc,
+        ) = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise CheckpointError(f"Not a validator checkpoint: {self.path}")
+        if version != VERSION:
+            raise CheckpointError(
+                f"Unsupported checkpoint version {version}: {self.path}"
+            )
+        if size != HEADER_SIZE + n * 12 + hotkeys_size:
+            raise CheckpointError(f"Truncated checkpoint: {self.path}")
+
+        payload = np.memmap(self.path, dtype=np.uint8, mode="r")
+        updated = payload[HEADER_SIZE : HEADER_SIZE + n * 8].view("<i8")
+        values = payload[HEADER_SIZE + n * 8 : HEADER_SIZE + n * 12].view(
+            "<f4"
+        )
+        hotkeys = payload[HEADER_SIZE + n * 12 :].tobytes()
+        if zlib.crc32(hotkeys, zlib.crc32(values, zlib.crc32(updated))) != crc:
+            raise CheckpointError(f"Checkpoint checksum mismatch: {self.path}")
+
+        return ValidatorState(
+            step=step,
+            score_step=score_step,
+            updated=np.array(updated, dtype=np.int64),
+            values=np.array(values, dtype=np.float32),
+            hotkeys=hotkeys.decode().split("\n") if hotkeys else [],
+        )
+
+    def _replay(self, state: ValidatorState) -> ValidatorState:
+        if not os.path.exists(self.log_path):
+            self.deltas = 0
+            self.snapshot_due = False
+            return state
+        with open(self.log_path, "rb") as f:
+            log = f.read()
+
+        step, score_step = state.step, state.score_step
+        n = len(state.values)
+        offset = deltas = stale = 0
+        while offset + _RECORD_SIZE <= len(log):
+            (crc,) = _RECORD_CRC.unpack_from(log, offset)
+            count, record_step, record_score_step = _RECORD_FIELDS.unpack_from(
+                log, offset + _RECORD_CRC.size
+            )
+            end = offset + _RECORD_SIZE + count * _RECORD_ITEM_SIZE
+            if end > len(log) or crc != zlib.crc32(
+                log[offset + _RECORD_CRC.size : end]
+            ):
+                break
+            offset, body = end, offset + _RECORD_SIZE
+            if record_score_step <= state.score_step:
+                # Written before the snapshot, the log wasn't truncated.
+                stale += 1
+                continue
+            uids = np.frombuffer(log, "<i8", count, body)
+            if count and (uids.min() < 0 or uids.max() >= n):
+                raise CheckpointError(
+                    f"Checkpoint log doesn't match the snapshot: {self.log_path}"
+                )
+            state.updated[uids] = np.frombuffer(
+                log, "<i8", count, body + count * 8
+            )
+            state.values[uids] = np.frombuffer(
+                log, "<f4", count, body + count * 16
+            )
+            step, score_step = record_step, record_score_step
+            deltas += 1
+
+        if offset < len(log):
+            bt.logging.warning(
+                f"Dropping {len(log) - offset} bytes of incomplete checkpoint log: {self.log_path}"
+            )
+            with open(self.log_path, "r+b") as f:
+                f.truncate(offset)
+        self.deltas = deltas
+        # The next snapshot also drops the stale records.
+        self.snapshot_due = stale > 0
+        return ValidatorState(
+            step=step,
+            score_step=score_step,
+            updated=state.updated,
+            values=state.values,
+            hotkeys=state.hotkeys,
+        )
+
+
+class CheckpointWriter:
+    """
+    Writes checkpoints from a background thread, so saving never blocks the
+    forward loop on disk I/O.
+
+    Snapshots and deltas are written in the order they were submitted. A
+    failed write is logged and the next save is made a full snapshot.
+
+    Args:
+        checkpoint (Checkpoint): Where to write.
+    """
+
+    def __init__(self, checkpoint: Checkpoint):
+        self.checkpoint = checkpoint
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self.failures = 0
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="checkpoint-writer", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, item: Union[ValidatorState, StateDelta]):
+        self.start()
+        self.checkpoint.schedule(item)
+        self._queue.put(item)
+
+    def flush(self):
+        """Blocks until every submitted item was written."""
+        self._queue.join()
+
+    def stop(self, timeout: float = 5.0):
+        """Writes what is left and stops the thread."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self.checkpoint.write(item)
+            except Exception as err:
+                self.failures += 1
+                self.checkpoint.snapshot_due = True
+                bt.logging.error(f"Failed to write checkpoint: {err}")
+            finally:
+                self._queue.task_done()
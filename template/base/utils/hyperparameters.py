@@ -0,0 +1,115 @@
+import threading
+import bittensor
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class WeightHyperparameters:
+    """
+    The subnet hyperparameters that constrain the weights a validator sets.
+
+    Attributes:
+    - min_allowed_weights: Minimum number of non-zero weights.
+    - max_weight_limit: Largest normalized weight allowed.
+    - tempo: Number of blocks between two epochs.
+    - n: Number of uids in the subnet when the entry was fetched.
+    """
+
+    min_allowed_weights: int
+    max_weight_limit: float
+    tempo: Optional[int]
+    n: int
+
+
+def epoch_of(block: int, netuid: int, tempo: Optional[int]) -> int:
+    """Returns the index of the epoch `block` falls in.
+
+    The chain runs the epoch of a subnet on the blocks where
+    `(block + netuid + 1) % (tempo + 1) == 0`, hyperparameter changes
+    take effect from then on.
+    """
+    if not tempo:
+        return block
+    return (block + netuid + 1) // (tempo + 1)
+
+
+class HyperparameterCache:
+    """
+    Caches the weight hyperparameters of each subnet for the rest of the epoch
+    they were fetched in.
+
+    Setting weights needs `min_allowed_weights` and `max_weight_limit`, each a
+    chain RPC. They rarely change and only matter once the epoch turns, so
+    they are fetched once per netuid and epoch instead of on every call. The
+    cache is thread safe and shared by default through `DEFAULT_CACHE`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[int, Tuple[int, WeightHyperparameters]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self,
+        subtensor: "bittensor.subtensor",
+        netuid: int,
+        block: Optional[int] = None,
+    ) -> WeightHyperparameters:
+        """Returns the weight hyperparameters of `netuid`, fetching them if the cached ones are from an older epoch.
+
+        Args:
+            subtensor (bittensor.subtensor): Used to fetch the hyperparameters on a miss.
+            netuid (int): The subnet.
+            block (int, optional): The current block, queried from the chain when None.
+
+        Returns:
+            WeightHyperparameters: The hyperparameters of the subnet.
+        """
+        if block is None:
+            block = subtensor.get_current_block()
+        with self._lock:
+            entry = self._entries.get(netuid)
+            if entry is not None:
+                epoch, params = entry
+                if epoch_of(block, netuid, params.tempo) <= epoch:
+                    self.hits += 1
+                    return params
+            self.misses += 1
+
+        params = WeightHyperparameters(
+            min_allowed_weights=subtensor.min_allowed_weights(netuid=netuid),
+            max_weight_limit=subtensor.max_weight_limit(netuid=netuid),
+            tempo=subtensor.tempo(netuid=netuid),
+            n=subtensor.subnetwork_n(netuid=netuid),
+        )
+        bittensor.logging.debug(
+            f"Fetched hyperparameters of netuid {netuid} at block {block}: {params}"
+        )
+        with self._lock:
+            self._entries[netuid] = (
+                epoch_of(block, netuid, params.tempo),
+                params,
+            )
+        return params
+
+    def put(self, netuid: int, block: int, params: WeightHyperparameters):
+        """Seeds the cache, e.g. with fixed hyperparameters for offline tests."""
+        with self._lock:
+            self._entries[netuid] = (
+                epoch_of(block, netuid, params.tempo),
+                params,
+            )
+
+    def invalidate(self, netuid: Optional[int] = None):
+        """Drops the entry of `netuid`, or every entry when None."""
+        with self._lock:
+            if netuid is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(netuid, None)
+
+
+DEFAULT_CACHE = HyperparameterCache()
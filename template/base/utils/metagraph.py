@@ -0,0 +1,209 @@
+import numpy as np
+import bittensor
+
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Sequence
+
+
+def axon_fingerprint(axon: "bittensor.AxonInfo") -> int:
+    """Returns a hash of every field of an axon, equal fingerprints mean equal axons."""
+    return hash(
+        (
+            axon.version,
+            axon.ip,
+            axon.port,
+            axon.ip_type,
+            axon.hotkey,
+            axon.coldkey,
+            axon.protocol,
+            axon.placeholder1,
+            axon.placeholder2,
+        )
+    )
+
+
+def changed_uids(old: np.ndarray, new: np.ndarray) -> np.ndarray:
+    """Returns the uids present in both arrays whose values differ."""
+    n = min(len(old), len(new))
+    return np.flatnonzero(old[:n] != new[:n])
+
+
+@dataclass(frozen=True)
+class MetagraphSnapshot:
+    """
+    The parts of a metagraph the neurons react to, stored as flat arrays so
+    two snapshots can be compared without copying the metagraph itself.
+
+    Attributes:
+    - hotkeys: Hotkey of every uid.
+    - axons: Fingerprint of the axon info of every uid, see `axon_fingerprint`.
+    - stake: Stake of every uid.
+    - validator_permit: Validator permit of every uid.
+    """
+
+    hotkeys: np.ndarray
+    axons: np.ndarray
+    stake: np.ndarray
+    validator_permit: np.ndarray
+
+    @classmethod
+    def capture(cls, metagraph: "bittensor.metagraph") -> "MetagraphSnapshot":
+        return cls(
+            hotkeys=np.asarray(metagraph.hotkeys, dtype=str),
+            axons=np.fromiter(
+                (axon_fingerprint(axon) for axon in metagraph.axons),
+                dtype=np.int64,
+                count=len(metagraph.axons),
+            ),
+            stake=np.array(metagraph.S, dtype=np.float32),
+            validator_permit=np.array(metagraph.validator_permit, dtype=bool),
+        )
+
+    @property
+    def n(self) -> int:
+        return len(self.hotkeys)
+
+    def diff(self, new: "MetagraphSnapshot") -> "MetagraphDiff":
+        """Returns what changed from this snapshot to `new`."""
+        return MetagraphDiff(
+            old_n=self.n,
+            new_n=new.n,
+            replaced=changed_uids(self.hotkeys, new.hotkeys),
+            axons=changed_uids(self.axons, new.axons),
+            stake=changed_uids(self.stake, new.stake),
+            validator_permit=changed_uids(
+                self.validator_permit, new.validator_permit
+            ),
+        )
+
+
+@dataclass(frozen=True)
+class MetagraphDiff:
+    """
+    The uids that changed between two metagraph snapshots. Uids only present
+    in one of them are reported through `added` and `removed`.
+
+    Attributes:
+    - old_n: Number of uids before.
+    - new_n: Number of uids after.
+    - replaced: Uids whose hotkey changed, i.e. taken over by a new neuron.
+    - axons: Uids whose axon info changed.
+    - stake: Uids whose stake changed.
+    - validator_permit: Uids whose validator permit changed.
+    """
+
+    old_n: int
+    new_n: int
+    replaced: np.ndarray
+    axons: np.ndarray
+    stake: np.ndarray
+    validator_permit: np.ndarray
+
+    @property
+    def added(self) -> np.ndarray:
+        return np.arange(self.old_n, self.new_n)
+
+    @property
+    def removed(self) -> np.ndarray:
+        return np.arange(self.new_n, self.old_n)
+
+    @property
+    def resized(self) -> bool:
+        return self.old_n != self.new_n
+
+    @property
+    def axons_changed(self) -> bool:
+        """Whether any axon changed, was added or removed."""
+        return self.resized or self.axons.size > 0
+
+    @property
+    def changed(self) -> np.ndarray:
+        """Every uid that changed in any way, sorted."""
+        return np.union1d(
+            np.concatenate(
+                [
+                    self.replaced,
+                    self.axons,
+                    self.stake,
+                    self.validator_permit,
+                ]
+            ),
+            np.concatenate([self.added, self.removed]),
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.changed.size)
+
+
+def replaced_uids(
+    previous_hotkeys: Sequence[str], hotkeys: Sequence[str]
+) -> np.ndarray:
+    """Returns the uids whose hotkey differs between two hotkey lists of possibly different length."""
+    return changed_uids(
+        np.asarray(previous_hotkeys, dtype=str), np.asarray(hotkeys, dtype=str)
+    )
+
+
+@dataclass(frozen=True)
+class MetagraphIndex:
+    """
+    Constant time lookups into a metagraph for the request gates.
+
+    The index is immutable, it is rebuilt whenever the metagraph syncs and
+    swapped in with a single assignment. Axon handlers read the attribute
+    once per request and get a consistent view even while a sync runs.
+
+    Attributes:
+    - uid_by_hotkey: Uid of every registered hotkey.
+    - stake: Stake of every uid.
+    - validator_permit: Validator permit of every uid.
+    - max_stake: Largest stake in the metagraph.
+    - serving: Whether the axon of every uid is serving.
+    """
+
+    uid_by_hotkey: Dict[str, int]
+    stake: np.ndarray
+    validator_permit: np.ndarray
+    max_stake: float = 0.0
+    serving: Optional[np.ndarray] = None
+    _available: Dict[float, np.ndarray] = field(
+        default_factory=dict, compare=False, repr=False
+    )
+
+    @classmethod
+    def build(cls, metagraph: "bittensor.metagraph") -> "MetagraphIndex":
+        stake = np.array(metagraph.S, dtype=np.float32)
+        return cls(
+            uid_by_hotkey={
+                hotkey: uid for uid, hotkey in enumerate(metagraph.hotkeys)
+            },
+            stake=stake,
+            validator_permit=np.array(metagraph.validator_permit, dtype=bool),
+            max_stake=float(stake.max()) if stake.size else 0.0,
+            serving=np.fromiter(
+                (axon.is_serving for axon in metagraph.axons),
+                dtype=bool,
+                count=len(metagraph.axons),
+            ),
+        )
+
+    def uid(self, hotkey: str) -> Optional[int]:
+        """Returns the uid of `hotkey`, None if it isn't registered."""
+        return self.uid_by_hotkey.get(hotkey)
+
+    def __contains__(self, hotkey: str) -> bool:
+        return hotkey in self.uid_by_hotkey
+
+    def available(self, vpermit_tao_limit: float) -> np.ndarray:
+        """Returns the mask of uids worth querying: serving, and not a validator above `vpermit_tao_limit` stake.
+
+        The mask is computed once per index, i.e. once per metagraph sync, and must not be modified.
+        """
+        mask = self._available.get(vpermit_tao_limit)
+        if mask is None:
+            mask = self.serving & ~(
+                self.validator_permit & (self.stake > vpermit_tao_limit)
+            )
+            mask.flags.writeable = False
+            self._available[vpermit_tao_limit] = mask
+        return mask
@@ -0,0 +1,118 @@
+import numpy as np
+
+from typing import Sequence, Tuple, Union
+
+
+class ScoreStore:
+    """
+    Exponential moving average of the miner rewards, updated in time
+    proportional to the number of rewarded uids rather than the subnet size.
+
+    Every update is one step. A uid not rewarded in a step decays by
+    `1 - alpha`, so instead of touching every uid the store keeps the value
+    of each uid as of the step it was last rewarded, and applies the missed
+    decay in closed form, `value * (1 - alpha) ** missed_steps`, when the
+    uid is rewarded again or the scores are read. The scores are the same as
+    applying `alpha * rewards + (1 - alpha) * scores` to the full array on
+    every step, up to float rounding.
+
+    Args:
+        n (int): Number of uids.
+        alpha (float): Weight of the newest reward.
+        dtype (np.dtype): Dtype of the scores.
+    """
+
+    def __init__(self, n: int, alpha: float, dtype=np.float32):
+        self.alpha = alpha
+        self.step = 0
+        self._values = np.zeros(n, dtype=dtype)
+        # Step at which each value was last brought up to date.
+        self._updated = np.zeros(n, dtype=np.int64)
+        # Uids whose stored value changed since the last `take_dirty`.
+        self._dirty = np.zeros(n, dtype=bool)
+        self._scores = None
+
+    @property
+    def n(self) -> int:
+        return len(self._values)
+
+    def _decay(self, steps: Union[int, np.ndarray]) -> np.ndarray:
+        return np.power(1.0 - self.alpha, steps)
+
+    def update(self, uids: Sequence[int], rewards: Sequence[float]):
+        """Applies one moving average step, rewarding `uids` with `rewards` and decaying every other uid.
+
+        Args:
+            uids (Sequence[int]): The rewarded uids.
+            rewards (Sequence[float]): The reward of each uid.
+        """
+        uids = np.asarray(uids, dtype=np.int64)
+        rewards = np.asarray(rewards, dtype=self._values.dtype)
+        self.step += 1
+        # Values as of the previous step, then this step's average.
+        previous = self._values[uids] * self._decay(
+            self.step - 1 - self._updated[uids]
+        )
+        self._values[uids] = self.alpha * rewards + (1 - self.alpha) * previous
+        self._updated[uids] = self.step
+        self._dirty[uids] = True
+        self._scores = None
+
+    def scores(self) -> np.ndarray:
+        """Returns the scores of every uid as of the current step.
+
+        The pending decay is applied to every uid here, which is O(n), and the
+        result is cached until the next change. The returned array is read only.
+        """
+        if self._scores is None:
+            # Stored values are left as is, only rewarded uids ever change.
+            decay = self._decay(self.step - self._updated)
+            self._scores = (self._values * decay).astype(self._values.dtype)
+            self._scores.flags.writeable = False
+        return self._scores
+
+    def load(self, scores: np.ndarray):
+        """Replaces every score, e.g. with scores loaded from disk."""
+        self.restore(
+            self.step,
+            np.array(scores, dtype=self._values.dtype),
+            np.full(len(scores), self.step, dtype=np.int64),
+        )
+
+    def raw(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the stored values and the step each was last updated at, without the pending decay.
+
+        The arrays are the store's own and must not be modified.
+        """
+        return self._values, self._updated
+
+    def restore(self, step: int, values: np.ndarray, updated: np.ndarray):
+        """Replaces the whole store with arrays from `raw`, e.g. read from a checkpoint."""
+        self.step = int(step)
+        self._values = np.array(values, dtype=self._values.dtype)
+        self._updated = np.array(updated, dtype=np.int64)
+        self._dirty = np.zeros(self.n, dtype=bool)
+        self._scores = None
+
+    def take_dirty(self) -> np.ndarray:
+        """Returns the uids whose stored value changed since the last call, and forgets them."""
+        uids = np.flatnonzero(self._dirty)
+        self._dirty[uids] = False
+        return uids
+
+    def reset(self, uids: Sequence[int]):
+        """Sets the score of `uids` to zero, e.g. when they were taken over by a new hotkey."""
+        uids = np.asarray(uids, dtype=np.int64)
+        self._values[uids] = 0
+        self._updated[uids] = self.step
+        self._dirty[uids] = True
+        self._scores = None
+
+    def resize(self, n: int):
+        """Grows or truncates the store to `n` uids, new uids start at zero."""
+        if n == self.n:
+            return
+        scores = np.zeros(n, dtype=self._values.dtype)
+        keep = min(n, self.n)
+        scores[:keep] = self.scores()[:keep]
+        self.load(scores)
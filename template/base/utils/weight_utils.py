@@ -1,12 +1,57 @@
+import logging
 import numpy as np
-from typing import Tuple, List, Union, Any
+from typing import Tuple, List, Union, Any, Optional
 import bittensor
 from numpy import ndarray, dtype, floating, complexfloating
 
+from template.base.utils.hyperparameters import (
+    DEFAULT_CACHE,
+    HyperparameterCache,
+)
+
 U32_MAX = 4294967295
 U16_MAX = 65535
 
 
+def _max_weight_cutoff(x: np.ndarray, limit: float) -> Union[float, None]:
+    r"""Finds the value x has to be clipped at so that no normalized weight exceeds the limit.
+    Args:
+        x (:obj:`np.ndarray`):
+            Non-negative weights with a non-zero sum.
+        limit: float:
+            Max value after normalization.
+    Returns:
+        cutoff (float or None):
+            The clipping value, or None if x is already within the limit.
+    """
+    epsilon = 1e-7  # For numerical stability after normalization
+
+    values = np.sort(x)
+    values_sum = values.sum()
+    estimation = values / values_sum
+
+    if estimation[-1] <= limit:
+        return None
+
+    # Find the cumulative sum and sorted array
+    cumsum = np.cumsum(estimation, 0)
+
+    # Determine the index of cutoff: the weight of value i once every larger value is clipped to it.
+    n = len(values)
+    estimation_sum = (
+        np.arange(n - 1, -1, -1, dtype=estimation.dtype) * estimation
+    )
+    n_values = np.count_nonzero(
+        estimation / (estimation_sum + cumsum + epsilon) < limit
+    )
+
+    # Determine the cutoff based on the index
+    cutoff_scale = (limit * cumsum[n_values - 1] - epsilon) / (
+        1 - (limit * (n - n_values))
+    )
+    return cutoff_scale * values_sum
+
+
 def normalize_max_weight(x: np.ndarray, limit: float = 0.1) -> np.ndarray:
     r"""Normalizes the numpy array x so that sum(x) = 1 and the max value is not greater than the limit.
     Args:
@@ -18,53 +63,66 @@ def normalize_max_weight(x: np.ndarray, limit: float = 0.1) -> np.ndarray:
         y (:obj:`np.ndarray`):
             Normalized x array.
     """
-    epsilon = 1e-7  # For numerical stability after normalization
-
-    weights = x.copy()
-    values = np.sort(weights)
-
     if x.sum() == 0 or len(x) * limit <= 1:
         return np.ones_like(x) / x.size
-    else:
-        estimation = values / values.sum()
 
-        if estimation.max() <= limit:
-            return weights / weights.sum()
+    cutoff = _max_weight_cutoff(x, limit)
+    if cutoff is None:
+        return x / x.sum()
 
-        # Find the cumulative sum and sorted array
-        cumsum = np.cumsum(estimation, 0)
+    # Applying the cutoff
+    weights = x.copy()
+    weights[weights > cutoff] = cutoff
+    return weights / weights.sum()
 
-        # Determine the index of cutoff
-        estimation_sum = np.array(
-            [(len(values) - i - 1) * estimation[i] for i in range(len(values))]
-        )
-        n_values = (
-            estimation / (estimation_sum + cumsum + epsilon) < limit
-        ).sum()
 
-        # Determine the cutoff based on the index
-        cutoff_scale = (limit * cumsum[n_values - 1] - epsilon) / (
-            1 - (limit * (len(estimation) - n_values))
+def normalize_max_weight_(x: np.ndarray, limit: float = 0.1) -> np.ndarray:
+    r"""In-place variant of :func:`normalize_max_weight`, overwrites and returns x.
+    Args:
+        x (:obj:`np.ndarray`):
+            Floating point array to be max_value normalized.
+        limit: float:
+            Max value after normalization.
+    Returns:
+        x (:obj:`np.ndarray`):
+            The normalized x array.
+    """
+    if not np.issubdtype(x.dtype, np.floating):
+        raise TypeError(
+            "In-place normalization needs a floating point array, got {}".format(
+                x.dtype
+            )
         )
-        cutoff = cutoff_scale * values.sum()
+    if x.sum() == 0 or len(x) * limit <= 1:
+        x.fill(1)
+        x /= x.size
+        return x
 
-        # Applying the cutoff
-        weights[weights > cutoff] = cutoff
+    cutoff = _max_weight_cutoff(x, limit)
+    if cutoff is not None:
+        x[x > cutoff] = cutoff
+    x /= x.sum()
+    return x
 
-        y = weights / weights.sum()
 
-        return y
+def _debug_enabled() -> bool:
+    """Whether debug messages are emitted, checked before formatting whole arrays into them."""
+    # bittensor.logging routes through the standard "bittensor" logger, whose
+    # effective level reflects --logging.debug / --logging.trace.
+    return logging.getLogger("bittensor").isEnabledFor(logging.DEBUG)
 
 
 def convert_weights_and_uids_for_emit(
-    uids: np.ndarray, weights: np.ndarray
-) -> Tuple[List[int], List[int]]:
+    uids: np.ndarray, weights: np.ndarray, as_numpy: bool = False
+) -> Union[Tuple[List[int], List[int]], Tuple[np.ndarray, np.ndarray]]:
     r"""Converts weights into integer u32 representation that sum to MAX_INT_WEIGHT.
     Args:
         uids (:obj:`np.ndarray,`):
             Array of uids as destinations for passed weights.
         weights (:obj:`np.ndarray,`):
             Array of weights.
+        as_numpy (bool):
+            Return numpy arrays (int64 uids, uint16 weights) instead of lists, for emitters that accept them.
     Returns:
         weight_uids (List[int]):
             Uids as a list.
@@ -74,16 +132,22 @@ def convert_weights_and_uids_for_emit(
     # Checks.
     uids = np.asarray(uids)
     weights = np.asarray(weights)
+    debug = _debug_enabled()
 
-    # Get non-zero weights and corresponding uids
-    non_zero_weights = weights[weights > 0]
-    non_zero_weight_uids = uids[weights > 0]
+    if len(uids) != len(weights):
+        raise ValueError(
+            "Passed weights and uids must have the same length, got {} and {}".format(
+                len(uids), len(weights)
+            )
+        )
 
     # Debugging information
-    bittensor.logging.debug(f"weights: {weights}")
-    bittensor.logging.debug(f"non_zero_weights: {non_zero_weights}")
-    bittensor.logging.debug(f"uids: {uids}")
-    bittensor.logging.debug(f"non_zero_weight_uids: {non_zero_weight_uids}")
+    if debug:
+        non_zero = weights > 0
+        bittensor.logging.debug(f"weights: {weights}")
+        bittensor.logging.debug(f"non_zero_weights: {weights[non_zero]}")
+        bittensor.logging.debug(f"uids: {uids}")
+        bittensor.logging.debug(f"non_zero_weight_uids: {uids[non_zero]}")
 
     if np.min(weights) < 0:
         raise ValueError(
@@ -95,37 +159,31 @@ def convert_weights_and_uids_for_emit(
         raise ValueError(
             "Passed uid is negative cannot exist on chain {}".format(uids)
         )
-    if len(uids) != len(weights):
-        raise ValueError(
-            "Passed weights and uids must have the same length, got {} and {}".format(
-                len(uids), len(weights)
-            )
-        )
     if np.sum(weights) == 0:
         bittensor.logging.debug("nothing to set on chain")
+        if as_numpy:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.uint16)
         return [], []  # Nothing to set on chain.
-    else:
-        max_weight = float(np.max(weights))
-        weights = [
-            float(value) / max_weight for value in weights
-        ]  # max-upscale values (max_weight = 1).
+
+    # max-upscale values (max_weight = 1) and convert to int representation,
+    # rint rounds half to even like the builtin round().
+    max_weight = float(np.max(weights))
+    scaled = weights.astype(np.float64) / max_weight
+    if debug:
         bittensor.logging.debug(
-            f"setting on chain max: {max_weight} and weights: {weights}"
+            f"setting on chain max: {max_weight} and weights: {scaled}"
         )
+    uint16_vals = np.rint(scaled * int(U16_MAX)).astype(np.uint16)
 
-    weight_vals = []
-    weight_uids = []
-    for i, (weight_i, uid_i) in enumerate(list(zip(weights, uids))):
-        uint16_val = round(
-            float(weight_i) * int(U16_MAX)
-        )  # convert to int representation.
-
-        # Filter zeros
-        if uint16_val != 0:  # Filter zeros
-            weight_vals.append(uint16_val)
-            weight_uids.append(uid_i)
-    bittensor.logging.debug(f"final params: {weight_uids} : {weight_vals}")
-    return weight_uids, weight_vals
+    # Filter zeros
+    keep = uint16_vals != 0
+    weight_uids = uids[keep].astype(np.int64)
+    weight_vals = uint16_vals[keep]
+    if debug:
+        bittensor.logging.debug(f"final params: {weight_uids} : {weight_vals}")
+    if as_numpy:
+        return weight_uids, weight_vals
+    return weight_uids.tolist(), weight_vals.tolist()
 
 
 def process_weights_for_netuid(
@@ -135,6 +193,8 @@ def process_weights_for_netuid(
     subtensor: "bittensor.subtensor",
     metagraph: "bittensor.metagraph" = None,
     exclude_quantile: int = 0,
+    block: Optional[int] = None,
+    hyperparameters: Optional[HyperparameterCache] = None,
 ) -> Union[
     tuple[
         ndarray[Any, dtype[Any]],
@@ -155,19 +215,23 @@ def process_weights_for_netuid(
     bittensor.logging.debug("subtensor", subtensor)
     bittensor.logging.debug("metagraph", metagraph)
 
-    # Get latest metagraph from chain if metagraph is None.
-    if metagraph is None:
-        metagraph = subtensor.metagraph(netuid)
+    # Network configuration parameters from an subtensor, cached per epoch.
+    # These parameters determine the range of acceptable weights for each neuron.
+    if hyperparameters is None:
+        hyperparameters = DEFAULT_CACHE
+    if block is None and metagraph is not None:
+        block = int(metagraph.block)
+    params = hyperparameters.get(subtensor, netuid, block)
+    # Only the size of the metagraph is needed, no need to sync a full one.
+    n = int(metagraph.n) if metagraph is not None else params.n
 
     # Cast weights to floats.
     if not isinstance(weights, np.ndarray) or weights.dtype != np.float32:
         weights = weights.astype(np.float32)
 
-    # Network configuration parameters from an subtensor.
-    # These parameters determine the range of acceptable weights for each neuron.
     quantile = exclude_quantile / U16_MAX
-    min_allowed_weights = subtensor.min_allowed_weights(netuid=netuid)
-    max_weight_limit = subtensor.max_weight_limit(netuid=netuid)
+    min_allowed_weights = params.min_allowed_weights
+    max_weight_limit = params.max_weight_limit
     bittensor.logging.debug("quantile", quantile)
     bittensor.logging.debug("min_allowed_weights", min_allowed_weights)
     bittensor.logging.debug("max_weight_limit", max_weight_limit)
@@ -177,9 +241,9 @@ def process_weights_for_netuid(
     non_zero_weight_idx = np.atleast_1d(non_zero_weight_idx)
     non_zero_weight_uids = uids[non_zero_weight_idx]
     non_zero_weights = weights[non_zero_weight_idx]
-    if non_zero_weights.size == 0 or metagraph.n < min_allowed_weights:
+    if non_zero_weights.size == 0 or n < min_allowed_weights:
         bittensor.logging.warning("No non-zero weights returning all ones.")
-        final_weights = np.ones(metagraph.n) / metagraph.n
+        final_weights = np.ones(n) / n
         bittensor.logging.debug("final_weights", final_weights)
         return np.arange(len(final_weights)), final_weights
 
@@ -187,9 +251,7 @@ def process_weights_for_netuid(
         bittensor.logging.warning(
             "No non-zero weights less then min allowed weight, returning all ones."
         )
-        weights = (
-            np.ones(metagraph.n) * 1e-5
-        )  # creating minimum even non-zero weights
+        weights = np.ones(n) * 1e-5  # creating minimum even non-zero weights
         weights[non_zero_weight_idx] += non_zero_weights
         bittensor.logging.debug("final_weights", weights)
         normalized_weights = normalize_max_weight(
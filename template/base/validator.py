@@ -18,7 +18,7 @@
 # DEALINGS IN THE SOFTWARE.
 
 
-import copy
+import os
 import numpy as np
 import asyncio
 import argparse
@@ -27,8 +27,19 @@ import bittensor as bt
 
 from typing import List, Union
 from traceback import print_exception
+from bittensor.utils.registration import use_torch
 
 from template.base.neuron import BaseNeuron
+from template.base.sync import SyncService, WeightsSnapshot
+from template.base.utils.checkpoint import (
+    Checkpoint,
+    CheckpointError,
+    CheckpointWriter,
+    StateDelta,
+    ValidatorState,
+)
+from template.base.utils.metagraph import MetagraphSnapshot, replaced_uids
+from template.base.utils.scores import ScoreStore
 from template.base.utils.weight_utils import (
     process_weights_for_netuid,
     convert_weights_and_uids_for_emit,
@@ -53,7 +64,7 @@ class BaseValidatorNeuron(BaseNeuron):
         super().__init__(config=config)
 
         # Save a copy of the hotkeys to local memory.
-        self.hotkeys = copy.deepcopy(self.metagraph.hotkeys)
+        self.hotkeys = list(self.metagraph.hotkeys)
 
         # Dendrite lets us send messages to other nodes (axons) in the network.
         if self.config.mock:
@@ -64,11 +75,32 @@ class BaseValidatorNeuron(BaseNeuron):
 
         # Set up initial scoring weights for validation
         bt.logging.info("Building validation weights.")
-        self.scores = np.zeros(self.metagraph.n, dtype=np.float32)
+        self.score_store = ScoreStore(
+            int(self.metagraph.n),
+            alpha=self.config.neuron.moving_average_alpha,
+        )
+
+        # Full snapshots of the state, with the changed scores logged in between.
+        self.checkpoint = Checkpoint(
+            os.path.join(self.config.neuron.full_path, "state.ckpt"),
+            snapshot_interval=self.config.neuron.snapshot_interval,
+        )
+        self.checkpoint_writer: Union[CheckpointWriter, None] = None
+        if self.config.neuron.background_save:
+            self.checkpoint_writer = CheckpointWriter(self.checkpoint)
+        # Hotkeys of the last snapshot, a delta can't record hotkey changes.
+        self.snapshot_hotkeys: Union[List[str], None] = None
 
         # Init sync with the network. Updates the metagraph.
         self.sync()
 
+        # Optionally keep syncing from a background thread rather than between forward steps.
+        self.sync_service: Union[SyncService, None] = None
+        if self.config.neuron.background_sync:
+            self.sync_service = SyncService(
+                self, interval=self.config.neuron.sync_interval
+            )
+
         # Serve axon to enable external connections.
         if not self.config.neuron.axon_off:
             self.serve_axon()
@@ -138,6 +170,8 @@ class BaseValidatorNeuron(BaseNeuron):
 
         # Check that validator is registered on the network.
         self.sync()
+        if self.sync_service is not None:
+            self.sync_service.start()
 
         bt.logging.info(f"Validator starting at block: {self.block}")
 
@@ -154,8 +188,13 @@ class BaseValidatorNeuron(BaseNeuron):
                     break
 
                 # Sync metagraph and potentially set weights.
-                self.sync()
+                if self.sync_service is not None:
+                    # Only picks up what the sync thread fetched, never waits on the chain.
+                    self.sync_service.poll()
+                else:
+                    self.sync()
 
+                self.save_state()
                 self.step += 1
 
         # If someone intentionally stops the validator, it'll safely terminate operations.
@@ -191,7 +230,12 @@ class BaseValidatorNeuron(BaseNeuron):
         if self.is_running:
             bt.logging.debug("Stopping validator in background thread.")
             self.should_exit = True
+            self.block_clock.stop()
             self.thread.join(5)
+            if self.sync_service is not None:
+                self.sync_service.stop()
+            if self.checkpoint_writer is not None:
+                self.checkpoint_writer.stop()
             self.is_running = False
             bt.logging.debug("Stopped")
 
@@ -215,17 +259,41 @@ class BaseValidatorNeuron(BaseNeuron):
         if self.is_running:
             bt.logging.debug("Stopping validator in background thread.")
             self.should_exit = True
+            self.block_clock.stop()
             self.thread.join(5)
+            if self.sync_service is not None:
+                self.sync_service.stop()
+            if self.checkpoint_writer is not None:
+                self.checkpoint_writer.stop()
             self.is_running = False
             bt.logging.debug("Stopped")
 
-    def set_weights(self):
+    def weights_snapshot(self) -> WeightsSnapshot:
+        """Captures what `set_weights` reads, on the thread that updates the scores and metagraph."""
+        return WeightsSnapshot(
+            scores=np.array(self.scores), metagraph=self.metagraph
+        )
+
+    def set_weights(
+        self,
+        subtensor: "bt.subtensor" = None,
+        snapshot: WeightsSnapshot = None,
+    ):
         """
         Sets the validator weights to the metagraph hotkeys based on the scores it has received from the miners. The weights determine the trust and incentive level the validator assigns to miner nodes on the network.
+
+        Args:
+            subtensor (bt.subtensor, optional): Connection to set the weights through, defaults to `self.subtensor`.
+            snapshot (WeightsSnapshot, optional): Scores and metagraph to set the weights from, taken with
+                `weights_snapshot` when setting weights from another thread. Defaults to the current ones.
         """
+        subtensor = subtensor or self.subtensor
+        snapshot = snapshot or self.weights_snapshot()
+        scores = snapshot.scores
+        metagraph = snapshot.metagraph
 
-        # Check if self.scores contains any NaN values and log a warning if it does.
-        if np.isnan(self.scores).any():
+        # Check if the scores contain any NaN values and log a warning if they do.
+        if np.isnan(scores).any():
             bt.logging.warning(
                 f"Scores contain NaN values. This may be due to a lack of responses from miners, or a bug in your reward functions."
             )
@@ -233,27 +301,28 @@ class BaseValidatorNeuron(BaseNeuron):
         # Calculate the average reward for each uid across non-zero values.
         # Replace any NaN values with 0.
         # Compute the norm of the scores
-        norm = np.linalg.norm(self.scores, ord=1, axis=0, keepdims=True)
+        norm = np.linalg.norm(scores, ord=1, axis=0, keepdims=True)
 
         # Check if the norm is zero or contains NaN values
         if np.any(norm == 0) or np.isnan(norm).any():
             norm = np.ones_like(norm)  # Avoid division by zero or NaN
 
         # Compute raw_weights safely
-        raw_weights = self.scores / norm
+        raw_weights = scores / norm
 
         bt.logging.debug("raw_weights", raw_weights)
-        bt.logging.debug("raw_weight_uids", str(self.metagraph.uids.tolist()))
+        bt.logging.debug("raw_weight_uids", str(metagraph.uids.tolist()))
         # Process the raw weights to final_weights via subtensor limitations.
         (
             processed_weight_uids,
             processed_weights,
         ) = process_weights_for_netuid(
-            uids=self.metagraph.uids,
+            uids=metagraph.uids,
             weights=raw_weights,
             netuid=self.config.netuid,
-            subtensor=self.subtensor,
-            metagraph=self.metagraph,
+            subtensor=subtensor,
+            metagraph=metagraph,
+            block=int(metagraph.block),
         )
         bt.logging.debug("processed_weights", processed_weights)
         bt.logging.debug("processed_weight_uids", processed_weight_uids)
@@ -263,13 +332,16 @@ class BaseValidatorNeuron(BaseNeuron):
             uint_uids,
             uint_weights,
         ) = convert_weights_and_uids_for_emit(
-            uids=processed_weight_uids, weights=processed_weights
+            uids=processed_weight_uids,
+            weights=processed_weights,
+            # The numpy emit path takes arrays as they are, the torch path only converts lists.
+            as_numpy=not use_torch(),
         )
         bt.logging.debug("uint_weights", uint_weights)
         bt.logging.debug("uint_uids", uint_uids)
 
         # Set the weights on chain via our subtensor connection.
-        result, msg = self.subtensor.set_weights(
+        result, msg = subtensor.set_weights(
             wallet=self.wallet,
             netuid=self.config.netuid,
             uids=uint_uids,
@@ -287,38 +359,57 @@ class BaseValidatorNeuron(BaseNeuron):
         """Resyncs the metagraph and updates the hotkeys and moving averages based on the new metagraph."""
         bt.logging.info("resync_metagraph()")
 
-        # Copies state of metagraph before syncing.
-        previous_metagraph = copy.deepcopy(self.metagraph)
+        # Snapshots the arrays we compare before syncing, rather than copying the whole metagraph.
+        previous = MetagraphSnapshot.capture(self.metagraph)
 
         # Sync the metagraph.
         self.metagraph.sync(subtensor=self.subtensor)
+        self.refresh_metagraph_index()
+        self.update_hotkeys(previous)
+
+    def apply_metagraph(self, metagraph: "bt.metagraph"):
+        """Swaps in a metagraph fetched in the background and updates the hotkeys and moving averages."""
+        previous = MetagraphSnapshot.capture(self.metagraph)
+        super().apply_metagraph(metagraph)
+        self.update_hotkeys(previous)
 
+    def update_hotkeys(self, previous: MetagraphSnapshot):
+        """Updates the hotkeys and moving averages after the metagraph changed from `previous`."""
         # Check if the metagraph axon info has changed.
-        if previous_metagraph.axons == self.metagraph.axons:
+        changes = previous.diff(MetagraphSnapshot.capture(self.metagraph))
+        if not changes.axons_changed:
             return
 
         bt.logging.info(
-            "Metagraph updated, re-syncing hotkeys, dendrite pool and moving averages"
+            f"Metagraph updated ({changes.changed.size} uids changed), re-syncing hotkeys, dendrite pool and moving averages"
         )
         # Zero out all hotkeys that have been replaced.
-        for uid, hotkey in enumerate(self.hotkeys):
-            if hotkey != self.metagraph.hotkeys[uid]:
-                self.scores[uid] = 0  # hotkey has been replaced
+        replaced = replaced_uids(self.hotkeys, self.metagraph.hotkeys)
+        self.score_store.reset(replaced[replaced < self.score_store.n])
 
         # Check to see if the metagraph has changed size.
         # If so, we need to add new hotkeys and moving averages.
         if len(self.hotkeys) < len(self.metagraph.hotkeys):
             # Update the size of the moving average scores.
-            new_moving_average = np.zeros((self.metagraph.n))
-            min_len = min(len(self.hotkeys), len(self.scores))
-            new_moving_average[:min_len] = self.scores[:min_len]
-            self.scores = new_moving_average
+            self.score_store.resize(int(self.metagraph.n))
 
         # Update the hotkeys.
-        self.hotkeys = copy.deepcopy(self.metagraph.hotkeys)
+        self.hotkeys = list(self.metagraph.hotkeys)
+
+    @property
+    def scores(self) -> np.ndarray:
+        """The moving average scores of every uid, read only. Assigning replaces every score."""
+        return self.score_store.scores()
+
+    @scores.setter
+    def scores(self, scores: np.ndarray):
+        self.score_store.load(scores)
 
     def update_scores(self, rewards: np.ndarray, uids: List[int]):
-        """Performs exponential moving average on the scores based on the rewards received from the miners."""
+        """Performs exponential moving average on the scores based on the rewards received from the miners.
+
+        Only the rewarded uids are updated, the other uids decay lazily, see `ScoreStore`.
+        """
 
         # Check if rewards contains NaN values.
         if np.isnan(rewards).any():
@@ -350,38 +441,113 @@ class BaseValidatorNeuron(BaseNeuron):
                 f"cannot be broadcast to uids array of shape {uids_array.shape}"
             )
 
-        # Compute forward pass rewards, assumes uids are mutually exclusive.
-        # shape: [ metagraph.n ]
-        scattered_rewards: np.ndarray = np.zeros_like(self.scores)
-        scattered_rewards[uids_array] = rewards
-        bt.logging.debug(f"Scattered rewards: {rewards}")
-
-        # Update scores with rewards produced by this step.
-        # shape: [ metagraph.n ]
-        alpha: float = self.config.neuron.moving_average_alpha
-        self.scores: np.ndarray = (
-            alpha * scattered_rewards + (1 - alpha) * self.scores
-        )
-        bt.logging.debug(f"Updated moving avg scores: {self.scores}")
+        # Update scores with rewards produced by this step, assumes uids are mutually exclusive.
+        # shape: [ len(uids) ]
+        self.score_store.update(uids_array, rewards)
+        bt.logging.debug(f"Rewarded uids {uids_array}: {rewards}")
 
     def save_state(self):
-        """Saves the state of the validator to a file."""
-        bt.logging.info("Saving validator state.")
-
-        # Save the state of the validator to file.
-        np.savez(
-            self.config.neuron.full_path + "/state.npz",
-            step=self.step,
-            scores=self.scores,
-            hotkeys=self.hotkeys,
-        )
+        """Saves the state of the validator to disk.
+
+        Writes a full snapshot every `neuron.snapshot_interval` saves or when the hotkeys changed, and
+        otherwise only appends the scores that changed since the last save. With `neuron.background_save`
+        the write happens on a background thread.
+        """
+        values, updated = self.score_store.raw()
+        if (
+            self.checkpoint.needs_snapshot
+            or self.hotkeys != self.snapshot_hotkeys
+        ):
+            bt.logging.debug("Saving validator state snapshot.")
+            self.score_store.take_dirty()
+            item = ValidatorState(
+                step=int(self.step),
+                score_step=self.score_store.step,
+                updated=updated.copy(),
+                values=values.copy(),
+                hotkeys=list(self.hotkeys),
+            )
+            self.snapshot_hotkeys = item.hotkeys
+        else:
+            uids = self.score_store.take_dirty()
+            if uids.size == 0:
+                return
+            item = StateDelta(
+                step=int(self.step),
+                score_step=self.score_store.step,
+                uids=uids,
+                updated=updated[uids],
+                values=values[uids],
+            )
+
+        if self.checkpoint_writer is not None:
+            self.checkpoint_writer.submit(item)
+            return
+        try:
+            self.checkpoint.save(item)
+        except OSError as err:
+            self.checkpoint.snapshot_due = True
+            bt.logging.error(f"Failed to save validator state: {err}")
 
     def load_state(self):
-        """Loads the state of the validator from a file."""
+        """Loads the state of the validator from disk, if it was saved before."""
         bt.logging.info("Loading validator state.")
 
-        # Load the state of the validator from file.
-        state = np.load(self.config.neuron.full_path + "/state.npz")
-        self.step = state["step"]
-        self.scores = state["scores"]
-        self.hotkeys = state["hotkeys"]
+        try:
+            state = self.checkpoint.load()
+        except CheckpointError as err:
+            bt.logging.error(f"Ignoring unreadable validator state: {err}")
+            return
+        if state is None:
+            state = self.load_legacy_state()
+        if state is None:
+            bt.logging.info("No saved validator state, starting fresh.")
+            return
+
+        self.step = state.step
+        self.score_store.restore(state.score_step, state.values, state.updated)
+        self.hotkeys = state.hotkeys
+        self.snapshot_hotkeys = list(state.hotkeys)
+
+        # The metagraph may have changed while the validator was down.
+        replaced = replaced_uids(self.hotkeys, self.metagraph.hotkeys)
+        self.score_store.reset(replaced[replaced < self.score_store.n])
+        self.score_store.resize(int(self.metagraph.n))
+        self.hotkeys = list(self.metagraph.hotkeys)
+        bt.logging.info(
+            f"Loaded validator state at step {self.step}, {self.checkpoint.deltas} deltas replayed."
+        )
+
+    def load_legacy_state(self) -> Union[ValidatorState, None]:
+        """Reads the `state.npz` written by earlier versions, if there is one.
+
+        The state is only read, the next save writes it as a checkpoint snapshot and later starts load that
+        instead. The old file is left in place.
+
+        Returns:
+            Union[ValidatorState, None]: The state to restore, or None if there is no readable legacy state.
+        """
+        path = os.path.join(self.config.neuron.full_path, "state.npz")
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as state:
+                scores = np.asarray(state["scores"], dtype=np.float32)
+                step = int(state["step"])
+                hotkeys = [str(hotkey) for hotkey in state["hotkeys"]]
+        except (OSError, KeyError, ValueError) as err:
+            bt.logging.error(
+                f"Ignoring unreadable legacy validator state {path}: {err}"
+            )
+            return None
+        bt.logging.warning(
+            f"Migrating legacy validator state from {path}, it will be saved as a checkpoint."
+        )
+        # The old scores are already decayed to the current step.
+        return ValidatorState(
+            step=step,
+            score_step=0,
+            updated=np.zeros(len(scores), dtype=np.int64),
+            values=scores,
+            hotkeys=hotkeys,
+        )
@@ -0,0 +1,4 @@
+from .engine import HashEngine, SearchResult, create_engine
+from .scheduler import JobScheduler, QueueFullError
+from .rate_limit import RateLimiter
+from .metrics import MinerMetrics
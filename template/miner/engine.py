@@ -0,0 +1,456 @@
+import os
+import time
+import asyncio
+import hashlib
+import multiprocessing
+import bittensor as bt
+
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional, Tuple, Type
+
+from template.utils.pow import BlockHeader, STRING_FORMAT
+
+
+DEFAULT_CHUNK_SIZE = 65536
+
+# Compares greater than every 32 byte digest, the initial "best" hash.
+MAX_DIGEST = b"\xff" * 32 + b"\x00"
+
+
+def physical_core_count() -> int:
+    """Returns the number of physical cores, falling back to the logical count.
+
+    Returns:
+        int: Number of physical cores available to this machine.
+    """
+    try:
+        import psutil
+
+        count = psutil.cpu_count(logical=False)
+    except ImportError:
+        count = None
+    return count or os.cpu_count() or 1
+
+
+# Number of nonces hashed between two deadline checks inside a worker.
+DEADLINE_CHECK_INTERVAL = 4096
+
+# Seconds to wait for running workers to report their partial results once
+# the deadline has passed.
+DEADLINE_GRACE = 0.1
+
+# (found, nonce, block_hash, hashes) where nonce and block_hash are the
+# winner if found and the lowest hash seen otherwise.
+ChunkResult = Tuple[bool, Optional[int], Optional[str], int]
+
+
+def search_nonce_range(
+    block: str,
+    target: int,
+    start: int,
+    end: int,
+    header_format: str = STRING_FORMAT,
+    deadline: Optional[float] = None,
+) -> ChunkResult:
+    """Scans the nonces in [start, end) for a hash below the target.
+
+    This is the unit of work executed by the hashing engines, it must stay a
+    module level function so it can be pickled into worker processes.
+
+    Args:
+        block (str): The block data the nonce is appended to.
+        target (int): The full (expanded) target the hash has to be below.
+        start (int): First nonce of the range.
+        end (int): End of the range, exclusive.
+        header_format (str): How the nonce is appended to the block, see `template.utils.pow`.
+        deadline (float, optional): Wall clock time (`time.time()`) after which the scan stops early.
+
+    Returns:
+        ChunkResult: Whether a winner was found, the winning (or lowest) nonce
+            and hash and the number of hashes computed.
+    """
+    header = BlockHeader(block, target, header_format)
+    header.check_nonce_range(start, end)
+
+    # Bind everything the loop touches to locals, this loop is the hot path.
+    midstate_copy = header.midstate.copy
+    encode_nonce = header.encode_nonce
+    target_bytes = header.target_bytes
+    sha256 = hashlib.sha256
+
+    best_digest = MAX_DIGEST
+    best_nonce = None
+    hashes = 0
+    for block_start in range(start, end, DEADLINE_CHECK_INTERVAL):
+        if deadline is not None and time.time() >= deadline:
+            break
+        block_end = min(block_start + DEADLINE_CHECK_INTERVAL, end)
+        for nonce in range(block_start, block_end):
+            inner = midstate_copy()
+            inner.update(encode_nonce(nonce))
+            digest = sha256(inner.digest()).digest()
+            # Only a new best hash can be a winner, so the common case costs
+            # a single comparison.
+            if digest < best_digest:
+                best_digest = digest
+                best_nonce = nonce
+                if digest < target_bytes:
+                    return True, nonce, digest.hex(), nonce - start + 1
+        hashes += block_end - block_start
+
+    if best_nonce is None:
+        return False, None, None, hashes
+    return False, best_nonce, best_digest.hex(), hashes
+
+
+def worker_context() -> multiprocessing.context.BaseContext:
+    """Returns the multiprocessing context hashing workers are started with.
+
+    Workers come from a fork server where the platform has one, which
+    imports this module once so starting a worker stays cheap, and are
+    spawned otherwise. Neither forks the threaded neuron process.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def _is_better(candidate: ChunkResult, best: ChunkResult) -> bool:
+    """Whether a chunk result beats the best one so far, winners first then lowest hash."""
+    if candidate[1] is None:
+        return False
+    if best[1] is None or candidate[0] != best[0]:
+        return best[1] is None or candidate[0]
+    # Hex digests have a fixed width, so they order like their values.
+    return candidate[2] < best[2]
+
+
+def iter_chunks(
+    start: int, end: int, chunk_size: int
+) -> Iterator[Tuple[int, int]]:
+    """Splits [start, end) into consecutive [chunk_start, chunk_end) ranges."""
+    for chunk_start in range(start, end, chunk_size):
+        yield chunk_start, min(chunk_start + chunk_size, end)
+
+
+@dataclass
+class SearchResult:
+    """
+    Outcome of a nonce search.
+
+    Attributes:
+    - found: Whether a hash below the target was found.
+    - nonce: The winning nonce, or the nonce of the lowest hash seen if none won.
+    - block_hash: The hex digest belonging to `nonce`.
+    - hashes: Number of hashes computed across all workers.
+    - duration: Wall time spent searching in seconds.
+    - expired: Whether the search was cut short by its deadline.
+    """
+
+    found: bool
+    nonce: Optional[int]
+    block_hash: Optional[str]
+    hashes: int
+    duration: float
+    expired: bool = False
+
+    @property
+    def hash_rate(self) -> float:
+        return self.hashes / self.duration if self.duration > 0 else 0.0
+
+
+class HashEngine(ABC):
+    """
+    Base class for nonce search engines. Engines search a nonce range for a
+    double sha256 below the target without blocking the calling event loop,
+    and give up with the lowest hash seen once the deadline has passed.
+    """
+
+    name: str = "base"
+    # Number of searches running in parallel.
+    num_workers: int = 1
+
+    @abstractmethod
+    async def search(
+        self,
+        block: str,
+        target: int,
+        start: int,
+        end: int,
+        header_format: str = STRING_FORMAT,
+        deadline: Optional[float] = None,
+    ) -> SearchResult:
+        ...
+
+    def start(self):
+        """Prepares the engine ahead of the first search."""
+        pass
+
+    def shutdown(self):
+        """Releases the resources held by the engine."""
+        pass
+
+
+class InlineHashEngine(HashEngine):
+    """
+    Searches the whole range with a single worker on a background thread.
+    Mirrors the original single core behaviour, useful for debugging.
+    """
+
+    name: str = "inline"
+
+    def __init__(self, **kwargs):
+        pass
+
+    async def search(
+        self,
+        block: str,
+        target: int,
+        start: int,
+        end: int,
+        header_format: str = STRING_FORMAT,
+        deadline: Optional[float] = None,
+    ) -> SearchResult:
+        loop = asyncio.get_running_loop()
+        start_time = time.time()
+        found, nonce, block_hash, hashes = await loop.run_in_executor(
+            None,
+            search_nonce_range,
+            block,
+            target,
+            start,
+            end,
+            header_format,
+            deadline,
+        )
+        return SearchResult(
+            found=found,
+            nonce=nonce,
+            block_hash=block_hash,
+            hashes=hashes,
+            duration=time.time() - start_time,
+            expired=not found and hashes < end - start,
+        )
+
+
+class ProcessPoolHashEngine(HashEngine):
+    """
+    Splits the nonce range into chunks and hashes them on a pool of worker
+    processes. The first winning chunk ends the search, pending chunks are
+    cancelled and running chunks are discarded as soon as they finish.
+
+    When a deadline is given no chunks are handed out past it, and workers
+    stop hashing on their own once it passes so the pool is free for the
+    next request.
+
+    Args:
+        num_workers (int): Number of worker processes, defaults to the number of physical cores.
+        chunk_size (int): Number of nonces handed to a worker at a time. Bounds how long
+            a worker keeps hashing after a winner was found.
+    """
+
+    name: str = "process"
+
+    def __init__(
+        self,
+        num_workers: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        **kwargs,
+    ):
+        self.num_workers = num_workers or physical_core_count()
+        self.chunk_size = max(1, chunk_size)
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # By now the axon, logging and block clock threads may be running.
+        # Forking a threaded process can copy locks held by those threads,
+        # so workers are started from a fork server (or spawned where there
+        # is none) instead.
+        if self.executor is None:
+            bt.logging.info(
+                f"Starting hashing pool with {self.num_workers} workers."
+            )
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.num_workers, mp_context=worker_context()
+            )
+        return self.executor
+
+    def start(self):
+        """Starts the worker processes, otherwise the first search waits for them."""
+        executor = self._get_executor()
+        for future in [
+            executor.submit(os.getpid) for _ in range(self.num_workers)
+        ]:
+            future.result()
+
+    def _reset_executor(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    async def search(
+        self,
+        block: str,
+        target: int,
+        start: int,
+        end: int,
+        header_format: str = STRING_FORMAT,
+        deadline: Optional[float] = None,
+    ) -> SearchResult:
+        # Validate once here rather than failing inside every worker.
+        BlockHeader(block, target, header_format).check_nonce_range(start, end)
+
+        # A worker that died takes the pool down with it. Start a new pool
+        # and try once more, a second failure only fails this request.
+        for attempt in range(2):
+            try:
+                return await self._search(
+                    self._get_executor(),
+                    block,
+                    target,
+                    start,
+                    end,
+                    header_format,
+                    deadline,
+                )
+            except BrokenProcessPool:
+                self._reset_executor()
+                if attempt:
+                    raise
+                bt.logging.error(
+                    "Hashing pool broke, restarting it and retrying the search."
+                )
+
+    async def _search(
+        self,
+        executor: ProcessPoolExecutor,
+        block: str,
+        target: int,
+        start: int,
+        end: int,
+        header_format: str,
+        deadline: Optional[float],
+    ) -> SearchResult:
+        chunks = iter_chunks(start, end, self.chunk_size)
+        # Maps the awaitable wrapper to the executor future, which is the one
+        # that knows whether the chunk is still queued or already running.
+        submitted: Dict[asyncio.Future, Future] = {}
+        pending = set()
+        hashes = 0
+        best: ChunkResult = (False, None, None, 0)
+        expired = False
+        start_time = time.time()
+
+        def submit_next() -> bool:
+            chunk = next(chunks, None)
+            if chunk is None:
+                return False
+            future = executor.submit(
+                search_nonce_range,
+                block,
+                target,
+                *chunk,
+                header_format,
+                deadline,
+            )
+            wrapper = asyncio.wrap_future(future)
+            submitted[wrapper] = future
+            pending.add(wrapper)
+            return True
+
+        def collect(done):
+            nonlocal hashes, best
+            for wrapper in done:
+                result = wrapper.result()
+                hashes += result[3]
+                if _is_better(result, best):
+                    best = result
+
+        # Keep every worker busy plus one queued chunk each, without
+        # materialising the whole range up front.
+        for _ in range(self.num_workers * 2):
+            if not submit_next():
+                break
+
+        try:
+            while pending:
+                timeout = None
+                if deadline is not None:
+                    timeout = max(0.0, deadline - time.time())
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=timeout,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                collect(done)
+                if best[0]:
+                    break
+                if deadline is not None and time.time() >= deadline:
+                    expired = True
+                    # Drop the queued chunks, the running ones stop by
+                    # themselves within a few milliseconds and still hold
+                    # the best partial hashes of their chunk.
+                    running = {
+                        wrapper
+                        for wrapper in pending
+                        if not submitted[wrapper].cancel()
+                    }
+                    pending = set()
+                    if running:
+                        done, pending = await asyncio.wait(
+                            running, timeout=DEADLINE_GRACE
+                        )
+                        collect(done)
+                    break
+                for _ in done:
+                    submit_next()
+        finally:
+            for wrapper, future in submitted.items():
+                future.cancel()
+                if wrapper.done() and not wrapper.cancelled():
+                    # Chunks that failed alongside a broken pool, the error
+                    # is already being raised.
+                    wrapper.exception()
+                else:
+                    wrapper.cancel()
+
+        found, nonce, block_hash, _ = best
+        return SearchResult(
+            found=found,
+            nonce=nonce,
+            block_hash=block_hash,
+            hashes=hashes,
+            duration=time.time() - start_time,
+            expired=expired,
+        )
+
+    def shutdown(self):
+        self._reset_executor()
+
+
+ENGINES: Dict[str, Type[HashEngine]] = {
+    InlineHashEngine.name: InlineHashEngine,
+    ProcessPoolHashEngine.name: ProcessPoolHashEngine,
+}
+
+
+def create_engine(name: str, **kwargs) -> HashEngine:
+    """Instantiates the hashing engine registered under `name`.
+
+    Args:
+        name (str): Name of the engine, one of the keys of `ENGINES`.
+        **kwargs: Engine specific options such as `num_workers` and `chunk_size`.
+
+    Returns:
+        HashEngine: The engine instance.
+    """
+    if name not in ENGINES:
+        raise ValueError(
+            f"Unknown hash engine {name}, expected one of {list(ENGINES)}"
+        )
+    return ENGINES[name](**kwargs)
@@ -0,0 +1,97 @@
+from template.miner.engine import SearchResult
+from template.miner.rate_limit import RateLimiter
+from template.miner.scheduler import JobScheduler
+from template.utils.metrics import MetricsRegistry
+
+# Share of the assigned nonce range hashed.
+COVERAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1.0)
+
+
+class MinerMetrics:
+    """
+    The miner's telemetry: hashing throughput, time spent queued and to a
+    solution, how much of each assigned range was hashed, and why requests
+    were turned away.
+
+    Everything is recorded once per request, never from the hashing loop.
+
+    Args:
+        registry (MetricsRegistry): Registry the metrics are added to.
+    """
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self.requests = registry.counter(
+            "miner_requests_total",
+            "Searches run, by outcome: found, partial or none.",
+            ("outcome",),
+        )
+        self.hashes = registry.counter(
+            "miner_hashes_total", "Hashes computed."
+        )
+        self.hash_rate = registry.gauge(
+            "miner_hash_rate", "Hashes per second of the last search."
+        )
+        self.average_worker_hash_rate = registry.gauge(
+            "miner_average_worker_hash_rate",
+            "Hashes per second of the last search divided by the number of hashing workers.",
+        )
+        self.queue_wait = registry.histogram(
+            "miner_queue_wait_seconds",
+            "Time requests waited for a hashing slot.",
+        )
+        self.time_to_solution = registry.histogram(
+            "miner_time_to_solution_seconds",
+            "Time from the start of a search to a winning nonce.",
+        )
+        self.nonce_coverage = registry.histogram(
+            "miner_nonce_coverage_ratio",
+            "Share of the assigned nonce range hashed per request.",
+            buckets=COVERAGE_BUCKETS,
+        )
+        self.rejects = registry.counter(
+            "miner_blacklist_rejects_total",
+            "Requests turned away by the blacklist, by reason.",
+            ("reason",),
+        )
+        self.dropped = registry.counter(
+            "miner_requests_dropped_total",
+            "Admitted requests dropped before hashing, by reason.",
+            ("reason",),
+        )
+
+    def bind_scheduler(self, scheduler: JobScheduler):
+        """Reports the job queue state at collection time."""
+        self.registry.gauge(
+            "miner_queue_depth", "Requests waiting for a hashing slot."
+        ).set_function(lambda: scheduler.queue_depth)
+        self.registry.gauge(
+            "miner_active_jobs", "Searches currently running."
+        ).set_function(lambda: scheduler.active_jobs)
+
+    def bind_rate_limiter(self, rate_limiter: RateLimiter):
+        """Reports the rate limiter state at collection time."""
+        self.registry.gauge(
+            "miner_rate_limited_hotkeys",
+            "Hotkeys tracked by the rate limiter.",
+        ).set_function(lambda: rate_limiter.metrics()["tracked_hotkeys"])
+
+    def observe_search(
+        self, result: SearchResult, range_size: int, num_workers: int
+    ):
+        """Records a finished search over a nonce range of `range_size` nonces."""
+        self.hashes.inc(result.hashes)
+        self.hash_rate.set(result.hash_rate)
+        self.average_worker_hash_rate.set(
+            result.hash_rate / max(1, num_workers)
+        )
+        if range_size > 0:
+            self.nonce_coverage.observe(min(1.0, result.hashes / range_size))
+        if result.found:
+            self.time_to_solution.observe(result.duration)
+            outcome = "found"
+        elif result.expired and result.nonce is not None:
+            outcome = "partial"
+        else:
+            outcome = "none"
+        self.requests.inc(outcome=outcome)
@@ -0,0 +1,145 @@
+import time
+import heapq
+import asyncio
+import itertools
+import numpy as np
+
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the scheduler queue is full."""
+
+    pass
+
+
+class JobScheduler:
+    """
+    Orders mining jobs from concurrent validators by priority in front of a
+    fixed number of hashing slots.
+
+    Jobs enter through `slot()`. Up to `max_concurrent_jobs` of them hash at
+    once, the rest wait in a queue ordered by priority (highest first, FIFO
+    among equal priorities) that holds at most `max_queue_size` jobs. The axon
+    blacklist checks `is_full()` to turn away overflow before the request
+    body is deserialized.
+
+    The scheduler lives on the axon's event loop and is not thread safe.
+
+    Args:
+        max_concurrent_jobs (int): Number of jobs hashing at the same time.
+        max_queue_size (int): Number of jobs allowed to wait for a slot.
+        wait_window (int): Number of recent wait times kept for the metrics.
+    """
+
+    def __init__(
+        self,
+        max_concurrent_jobs: int = 1,
+        max_queue_size: int = 16,
+        wait_window: int = 1024,
+    ):
+        self.max_concurrent_jobs = max(1, max_concurrent_jobs)
+        self.max_queue_size = max(0, max_queue_size)
+        self.active_jobs = 0
+        self._waiters: List[Tuple[float, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._wait_times: Deque[float] = deque(maxlen=wait_window)
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.completed = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, waiter in self._waiters if not waiter.done())
+
+    def is_full(self) -> bool:
+        """Whether a new job would be rejected right now."""
+        return (
+            self.active_jobs >= self.max_concurrent_jobs
+            and self.queue_depth >= self.max_queue_size
+        )
+
+    async def _acquire(self, priority: float, timeout: Optional[float]):
+        if (
+            self.active_jobs < self.max_concurrent_jobs
+            and not self.queue_depth
+        ):
+            self.active_jobs += 1
+            return
+        if self.is_full():
+            self.rejected += 1
+            raise QueueFullError(
+                f"Job queue is full ({self.max_queue_size} waiting)"
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._waiters, (-priority, next(self._sequence), waiter)
+        )
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over right as we gave up, pass it on.
+                self._release()
+            else:
+                waiter.cancel()
+            raise
+
+    def _release(self):
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                # The slot moves straight to the waiter, active_jobs stays.
+                waiter.set_result(None)
+                return
+        self.active_jobs -= 1
+
+    @asynccontextmanager
+    async def slot(
+        self, priority: float = 0.0, timeout: Optional[float] = None
+    ) -> AsyncIterator[float]:
+        """Waits for a hashing slot, yields the time spent in the queue.
+
+        Args:
+            priority (float): Higher priority jobs are served first.
+            timeout (float, optional): Maximum seconds to wait for a slot.
+
+        Raises:
+            QueueFullError: If the queue is full.
+            asyncio.TimeoutError: If no slot freed up within `timeout`.
+        """
+        queued_at = time.monotonic()
+        try:
+            await self._acquire(priority, timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise
+        wait_time = time.monotonic() - queued_at
+        self._wait_times.append(wait_time)
+        self.admitted += 1
+        try:
+            yield wait_time
+        finally:
+            self.completed += 1
+            self._release()
+
+    def metrics(self) -> Dict[str, float]:
+        """Returns queue depth, throughput counters and wait time statistics."""
+        waits = np.fromiter(self._wait_times, dtype=np.float64)
+        return {
+            "queue_depth": self.queue_depth,
+            "active_jobs": self.active_jobs,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "completed": self.completed,
+            "wait_time_mean": float(waits.mean()) if waits.size else 0.0,
+            "wait_time_p95": (
+                float(np.percentile(waits, 95)) if waits.size else 0.0
+            ),
+            "wait_time_max": float(waits.max()) if waits.size else 0.0,
+        }
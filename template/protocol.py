@@ -86,6 +86,7 @@ class WorkData(bt.Synapse):
     - timestamp: The time the request was created.
     - validator_hotkey: Hotkey of the validator making the request.
     - miner_response: Optional field for the miner's response to the work.
+    - hashes: Optional field for the number of hashes the miner computed, set even when nothing was found.
     """
 
     # Required request inputs
@@ -96,6 +97,7 @@ class WorkData(bt.Synapse):
 
     # Optional response output
     miner_response: typing.Optional[dict] = None
+    hashes: typing.Optional[int] = None
 
     def deserialize(self) -> dict:
         """
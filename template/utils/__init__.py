@@ -1,3 +1,5 @@
 from . import config
 from . import misc
 from . import uids
+from . import pow
+from . import http
@@ -0,0 +1,210 @@
+import time
+import threading
+import bittensor as bt
+
+from typing import Callable, Optional
+
+# Target block time of the chain in seconds.
+BLOCK_TIME = 12.0
+
+
+class BlockClock:
+    """
+    Tracks the current block number without polling the chain.
+
+    If the subscription connection supports it, a background thread
+    subscribes to new block headers and the clock advances as they arrive.
+    Otherwise the block is extrapolated from the last block read from the
+    chain and the block time, and read again every `resync_interval`
+    seconds to correct for drift. A subscription that delivered no header
+    for `stale_after` seconds is treated as stalled, the block is then read
+    from the chain and extrapolated until headers arrive again.
+
+    Waiters block in `wait_for_block` on a condition that is notified on
+    every new block, instead of sleeping and querying in a loop.
+
+    Args:
+        subtensor (bt.subtensor): Connection used to read the block when extrapolating.
+        subscription_subtensor (bt.subtensor, optional): Dedicated connection to subscribe on. A
+            subscription holds its websocket, it must not be the connection used elsewhere.
+        block_time (float): Seconds per block.
+        resync_interval (float): Seconds after which an extrapolated block is read again from the chain.
+        stale_after (float, optional): Seconds without a new header after which the subscription
+            counts as stalled, two block times by default.
+        clock (Callable[[], float]): Monotonic time source.
+    """
+
+    def __init__(
+        self,
+        subtensor: "bt.subtensor",
+        subscription_subtensor: Optional["bt.subtensor"] = None,
+        block_time: float = BLOCK_TIME,
+        resync_interval: float = 300.0,
+        stale_after: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.subtensor = subtensor
+        self.subscription_subtensor = subscription_subtensor
+        self.block_time = block_time
+        self.resync_interval = resync_interval
+        self.stale_after = (
+            2 * block_time if stale_after is None else stale_after
+        )
+        self.clock = clock
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._subscribed = False
+        self._anchor_block: Optional[int] = None
+        self._anchor_time = 0.0
+        # Whether the anchor is a header delivered by the subscription.
+        self._live = False
+        self.rpc_calls = 0
+
+    @property
+    def can_subscribe(self) -> bool:
+        substrate = getattr(self.subscription_subtensor, "substrate", None)
+        return hasattr(substrate, "subscribe_block_headers")
+
+    @property
+    def is_subscribed(self) -> bool:
+        return self._subscribed
+
+    def start(self):
+        """Starts following new block headers, if the connection supports subscriptions."""
+        if self._thread is not None or not self.can_subscribe:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._subscribe, name="block-clock", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        with self._condition:
+            self._condition.notify_all()
+
+    def _subscribe(self):
+        def on_header(header, update_nr, subscription_id):
+            self.on_block(int(header["header"]["number"]), live=True)
+            if self._stop.is_set():
+                return True  # Ends the subscription.
+
+        while not self._stop.is_set():
+            try:
+                self._subscribed = True
+                self.subscription_subtensor.substrate.subscribe_block_headers(
+                    on_header
+                )
+            except Exception as e:
+                bt.logging.warning(
+                    f"Block subscription failed, extrapolating blocks: {e}"
+                )
+            finally:
+                self._subscribed = False
+            # Retry later, extrapolation covers the gap.
+            self._stop.wait(self.block_time)
+        self._thread = None
+
+    def on_block(self, block: int, live: bool = False):
+        """Records a block read from the chain and wakes the waiters.
+
+        Args:
+            block (int): The block number.
+            live (bool): Whether the block was delivered by the subscription.
+        """
+        with self._condition:
+            if self._anchor_block is None or block >= self._anchor_block:
+                self._anchor_block = block
+                self._anchor_time = self.clock()
+                self._live = live
+            self._condition.notify_all()
+
+    def _sync(self):
+        # Called without holding the condition, the RPC can take a while.
+        self.rpc_calls += 1
+        self.on_block(self.subtensor.get_current_block())
+
+    def _following(self, now: float) -> bool:
+        """Whether the anchor is a recent header from a running subscription."""
+        return (
+            self._subscribed
+            and self._live
+            and now - self._anchor_time < self.stale_after
+        )
+
+    def _sync_if_due(self):
+        """Reads the block from the chain when the anchor is missing or too old to extrapolate from."""
+        now = self.clock()
+        if self._anchor_block is not None:
+            if self._following(now):
+                return
+            # A stalled subscription is read again sooner than a clock that
+            # never had one.
+            interval = (
+                self.stale_after if self._subscribed else self.resync_interval
+            )
+            if now - self._anchor_time < interval:
+                return
+            if self._live:
+                bt.logging.warning(
+                    f"No block header for {now - self._anchor_time:.0f}s, reading the block from the chain"
+                )
+        self._sync()
+
+    def _current(self, now: float) -> int:
+        if self._following(now):
+            return self._anchor_block
+        return self._anchor_block + int(
+            (now - self._anchor_time) // self.block_time
+        )
+
+    @property
+    def block(self) -> int:
+        """The current block, from the subscription or extrapolated."""
+        self._sync_if_due()
+        with self._condition:
+            return self._current(self.clock())
+
+    def wait_for_block(
+        self, block: int, timeout: Optional[float] = None
+    ) -> int:
+        """Waits until `block` is reached, or `timeout` seconds passed or the clock was stopped.
+
+        Args:
+            block (int): The block to wait for.
+            timeout (float, optional): Maximum seconds to wait.
+
+        Returns:
+            int: The current block when the wait ended.
+        """
+        deadline = None if timeout is None else self.clock() + timeout
+        while True:
+            # Outside the condition, a sync is an RPC.
+            self._sync_if_due()
+            with self._condition:
+                now = self.clock()
+                current = self._current(now)
+                remaining = None if deadline is None else deadline - now
+                if (
+                    current >= block
+                    or self._stop.is_set()
+                    or (remaining is not None and remaining <= 0)
+                ):
+                    return current
+                if self._following(now):
+                    # Until the next header, or until the subscription
+                    # would count as stalled.
+                    wait = self._anchor_time + self.stale_after - now
+                else:
+                    # Until the extrapolated block would be reached.
+                    wait = (
+                        self._anchor_time
+                        + (block - self._anchor_block) * self.block_time
+                        - now
+                    )
+                wait = max(0.0, wait)
+                if remaining is not None:
+                    wait = min(wait, remaining)
+                self._condition.wait(wait)
@@ -62,7 +62,12 @@ def check_config(cls, config: "bt.Config"):
     if not config.neuron.dont_save_events:
         # Add custom event logger for the events.
         events_logger = setup_events_logger(
-            config.neuron.full_path, config.neuron.events_retention_size
+            config.neuron.full_path,
+            config.neuron.events_retention_size,
+            asynchronous=config.neuron.events_async,
+            json_lines=config.neuron.events_json,
+            queue_size=config.neuron.events_queue_size,
+            flush_interval=config.neuron.events_flush_interval,
         )
         bt.logging.register_primary_logger(events_logger.name)
 
@@ -109,6 +114,69 @@ def add_args(cls, parser):
         default=False,
     )
 
+    parser.add_argument(
+        "--neuron.events_async",
+        action="store_true",
+        help="If set, events are written to the log file in batches from a background thread instead of by the logging thread.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--neuron.events_queue_size",
+        type=int,
+        help="Maximum number of events waiting to be written with --neuron.events_async, further events are dropped and counted.",
+        default=10000,
+    )
+
+    parser.add_argument(
+        "--neuron.events_flush_interval",
+        type=float,
+        help="Maximum seconds an event waits before it is written with --neuron.events_async.",
+        default=1.0,
+    )
+
+    parser.add_argument(
+        "--neuron.events_json",
+        action="store_true",
+        help="If set, events are written as compact JSON lines.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--neuron.disable_block_subscription",
+        action="store_true",
+        help="If set, the block number is extrapolated from the block time instead of following new block headers.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--neuron.background_sync",
+        action="store_true",
+        help="If set, the metagraph is synced and weights are set from a background thread instead of between forward steps.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--neuron.sync_interval",
+        type=float,
+        help="Seconds between two checks of the background sync.",
+        default=60,
+    )
+
+    parser.add_argument(
+        "--neuron.metrics_port",
+        type=int,
+        help="Port to serve Prometheus metrics on, disabled when not set.",
+        default=None,
+    )
+
+    parser.add_argument(
+        "--neuron.metrics_host",
+        type=str,
+        help="Address to serve Prometheus metrics on.",
+        default="127.0.0.1",
+    )
+
     parser.add_argument(
         "--wandb.off",
         action="store_true",
@@ -155,6 +223,70 @@ def add_miner_args(cls, parser):
         default=False,
     )
 
+    parser.add_argument(
+        "--blacklist.rate_limit",
+        type=float,
+        help="Requests per second allowed per hotkey without stake, scaled up with stake. 0 disables rate limiting.",
+        default=2.0,
+    )
+
+    parser.add_argument(
+        "--blacklist.burst",
+        type=float,
+        help="Number of requests a hotkey without stake may send in a burst.",
+        default=10.0,
+    )
+
+    parser.add_argument(
+        "--blacklist.max_stake_multiplier",
+        type=float,
+        help="Rate limit multiplier of the hotkey with the largest stake.",
+        default=10.0,
+    )
+
+    parser.add_argument(
+        "--neuron.hash_engine",
+        type=str,
+        choices=["process", "inline"],
+        help="Engine used to search nonce ranges.",
+        default="process",
+    )
+
+    parser.add_argument(
+        "--neuron.hash_workers",
+        type=int,
+        help="Number of hashing worker processes, 0 uses one per physical core.",
+        default=0,
+    )
+
+    parser.add_argument(
+        "--neuron.nonce_chunk_size",
+        type=int,
+        help="Number of nonces handed to a hashing worker at a time.",
+        default=65536,
+    )
+
+    parser.add_argument(
+        "--neuron.max_concurrent_jobs",
+        type=int,
+        help="Number of requests hashing at the same time, each one shares the hashing workers.",
+        default=1,
+    )
+
+    parser.add_argument(
+        "--neuron.max_queue_size",
+        type=int,
+        help="Number of requests allowed to wait for a hashing slot, further requests are rejected.",
+        default=16,
+    )
+
+    parser.add_argument(
+        "--neuron.deadline_margin",
+        type=float,
+        help="Seconds before the validator's timeout at which hashing stops and the best result is returned.",
+        default=0.3,
+    )
+
     parser.add_argument(
         "--wandb.project_name",
         type=str,
@@ -215,6 +347,34 @@ def add_validator_args(cls, parser):
         default=0.1,
     )
 
+    parser.add_argument(
+        "--neuron.snapshot_interval",
+        type=int,
+        help="Number of incremental state saves between two full snapshots.",
+        default=100,
+    )
+
+    parser.add_argument(
+        "--neuron.background_save",
+        action="store_true",
+        help="If set, the validator state is written to disk from a background thread.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--neuron.trace_sample_rate",
+        type=float,
+        help="Share of the miners whose responses are logged individually each round, the rest only appear in the round summary.",
+        default=0.0,
+    )
+
+    parser.add_argument(
+        "--neuron.trace_dump_interval",
+        type=int,
+        help="Number of rounds between two dumps of the round timing histograms to traces.json, 0 to disable.",
+        default=100,
+    )
+
     parser.add_argument(
         "--neuron.axon_off",
         "--axon_off",
@@ -225,6 +385,63 @@ def add_validator_args(cls, parser):
         default=False,
     )
 
+    parser.add_argument(
+        "--neuron.max_concurrent_queries",
+        type=int,
+        help="Maximum number of miners queried at the same time in a round.",
+        default=64,
+    )
+
+    parser.add_argument(
+        "--neuron.early_win",
+        action="store_true",
+        help="Submit the first hash below the target as soon as it arrives instead of waiting for every miner.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--neuron.pipeline",
+        action="store_true",
+        help="Prefetch work and start a round as soon as new work is available instead of sleeping between rounds.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--neuron.work_poll_interval",
+        type=float,
+        help="Seconds between polls of the get work endpoint while no new work is available, in pipelined mode.",
+        default=1.0,
+    )
+
+    parser.add_argument(
+        "--neuron.verify_workers",
+        type=int,
+        help="Number of threads verifying miner hashes, 0 picks a default from the cpu count.",
+        default=0,
+    )
+
+    parser.add_argument(
+        "--neuron.min_nonce_share",
+        type=float,
+        help="Smallest nonce slice a serving miner gets, as a fraction of an even split.",
+        default=0.1,
+    )
+
+    parser.add_argument(
+        "--neuron.hashrate_alpha",
+        type=float,
+        help="Moving average alpha of the per-miner hashrate estimates used to split nonce ranges.",
+        default=0.3,
+    )
+
+    parser.add_argument(
+        "--neuron.header_format",
+        type=str,
+        choices=["string", "binary"],
+        help="Block header format miners are asked to hash, string is understood by all miners.",
+        default="string",
+    )
+
     parser.add_argument(
         "--neuron.vpermit_tao_limit",
         type=int,
@@ -246,6 +463,27 @@ def add_validator_args(cls, parser):
         default="opentensor-dev",
     )
 
+    parser.add_argument(
+        "--neuron.http_pool_size",
+        type=int,
+        help="Maximum number of pooled connections to the work endpoints.",
+        default=100,
+    )
+
+    parser.add_argument(
+        "--neuron.http_timeout",
+        type=float,
+        help="Default timeout in seconds of a call to the work endpoints.",
+        default=10,
+    )
+
+    parser.add_argument(
+        "--neuron.http_keepalive",
+        type=float,
+        help="Seconds an idle connection to the work endpoints is kept open.",
+        default=30,
+    )
+
 
 def config(cls):
     """
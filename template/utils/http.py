@@ -0,0 +1,77 @@
+import aiohttp
+
+from typing import Optional
+
+
+class HttpClient:
+    """
+    A long lived, connection pooled HTTP client shared by everything a neuron
+    sends to its work endpoints.
+
+    Connections are kept alive between calls and DNS lookups are cached, so
+    a request to a known endpoint skips the TCP/TLS handshake. The session is
+    bound to the event loop it is first used on; create the client where it
+    is going to be used and `close()` it on the same loop.
+
+    Args:
+        pool_size (int): Maximum number of simultaneous connections.
+        timeout (float): Default total timeout of a request in seconds.
+        keepalive_timeout (float): Seconds an idle connection is kept open.
+        dns_cache_ttl (int): Seconds resolved hostnames are cached.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 100,
+        timeout: float = 10.0,
+        keepalive_timeout: float = 30.0,
+        dns_cache_ttl: int = 300,
+    ):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The underlying session, created on first use."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=True,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    def request(
+        self, method: str, url: str, timeout: Optional[float] = None, **kwargs
+    ):
+        """Sends a request, use as `async with client.request(...) as response`.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The URL to send the request to.
+            timeout (float, optional): Total timeout of this call, defaults to the client timeout.
+            **kwargs: Passed on to `aiohttp.ClientSession.request`.
+        """
+        if timeout is not None:
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, timeout: Optional[float] = None, **kwargs):
+        return self.request("GET", url, timeout=timeout, **kwargs)
+
+    def post(self, url: str, timeout: Optional[float] = None, **kwargs):
+        return self.request("POST", url, timeout=timeout, **kwargs)
+
+    async def close(self):
+        """Closes the pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
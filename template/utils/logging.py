@@ -1,12 +1,224 @@
 import os
+import json
+import time
+import queue
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import threading
+from logging.handlers import QueueHandler, RotatingFileHandler
+from typing import Optional
 
 EVENTS_LEVEL_NUM = 38
 DEFAULT_LOG_BACKUP_COUNT = 10
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_FLUSH_INTERVAL = 1.0
 
 
-def setup_events_logger(full_path, events_retention_size):
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Formats records as compact JSON objects, one per line. A dict logged as
+    the message is embedded as an object rather than its string form.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+        }
+        if isinstance(record.msg, dict) and not record.args:
+            entry["event"] = record.msg
+        else:
+            entry["msg"] = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, separators=(",", ":"), default=str)
+
+
+class BatchedRotatingFileHandler(RotatingFileHandler):
+    """
+    A `RotatingFileHandler` that leaves flushing to its caller, so a batch of
+    records costs one write to the file instead of one per record. The file
+    size is tracked in encoded bytes as records are written instead of asked
+    from the file. The file is written as UTF-8 unless another encoding is
+    given.
+    """
+
+    def __init__(self, filename, *args, encoding: str = "utf-8", **kwargs):
+        super().__init__(filename, *args, encoding=encoding, **kwargs)
+        self._size = (
+            os.path.getsize(self.baseFilename)
+            if os.path.exists(self.baseFilename)
+            else 0
+        )
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            msg = self.format(record) + self.terminator
+            size = len(msg.encode(self.encoding or "utf-8"))
+            if (
+                self.maxBytes > 0
+                and self._size
+                and self._size + size >= self.maxBytes
+            ):
+                self.doRollover()
+                self._size = 0
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(msg)
+            self._size += size
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+# Put on the queue to stop the writer thread once everything before it is written.
+_STOP = object()
+
+
+class BatchingQueueHandler(QueueHandler):
+    """
+    Hands records to a background thread that writes them to `handlers` in
+    batches, so logging never blocks the caller on I/O.
+
+    The queue is bounded. When it is full new records are dropped rather
+    than blocking the caller, and counted in `dropped`; the writer notes the
+    number of lost records in the log. A batch is written once it holds
+    `batch_size` records or `flush_interval` seconds after its first record,
+    followed by one flush of every handler.
+
+    Args:
+        *handlers (logging.Handler): Handlers the records are written to.
+        maxsize (int): Maximum number of queued records.
+        batch_size (int): Maximum number of records written per flush.
+        flush_interval (float): Maximum seconds a record waits in a batch before it is written.
+    """
+
+    def __init__(
+        self,
+        *handlers: logging.Handler,
+        maxsize: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    ):
+        super().__init__(queue.Queue(maxsize))
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._drop_lock = threading.Lock()
+        self.dropped = 0
+        self._reported_drops = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue stays in process, so the record is passed as is. Only the
+        # arguments are merged now, they may change before the record is written.
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(
+                record.exc_info
+            )
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._drop_lock:
+                self.dropped += 1
+
+    def start(self):
+        """Starts the writer thread."""
+        self._thread = threading.Thread(
+            target=self._drain, name="events-log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def close(self):
+        """Writes the queued records and stops the writer thread."""
+        if self._thread is not None:
+            # The queue may be full, wait for room rather than losing the stop.
+            self.queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+        for handler in self.handlers:
+            handler.close()
+        super().close()
+
+    def _drain(self):
+        q = self.queue
+        while True:
+            # Collect until the batch is full or `flush_interval` has passed
+            # since its first record.
+            batch = [q.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                try:
+                    batch.append(
+                        q.get(timeout=max(deadline - time.monotonic(), 0))
+                    )
+                except queue.Empty:
+                    break
+
+            for record in batch:
+                if record is _STOP:
+                    break
+                self._write(record)
+            self._report_drops()
+            for handler in self.handlers:
+                handler.flush()
+            if batch[-1] is _STOP:
+                return
+
+    def _write(self, record: logging.LogRecord):
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def _report_drops(self):
+        dropped = self.dropped
+        if dropped == self._reported_drops:
+            return
+        record = logging.makeLogRecord(
+            {
+                "name": "event",
+                "levelno": logging.WARNING,
+                "levelname": logging.getLevelName(logging.WARNING),
+                "msg": f"Dropped {dropped - self._reported_drops} events, the queue was full.",
+            }
+        )
+        self._reported_drops = dropped
+        for handler in self.handlers:
+            handler.handle(record)
+
+
+def setup_events_logger(
+    full_path,
+    events_retention_size,
+    asynchronous: bool = False,
+    json_lines: bool = False,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+):
+    """Sets up the `event` logger writing to `events.log` in `full_path`.
+
+    Args:
+        full_path (str): Directory of the log file.
+        events_retention_size (int): Size in bytes after which the file is rotated.
+        asynchronous (bool): Whether events are written in batches from a background thread.
+        json_lines (bool): Whether events are written as JSON lines instead of text.
+        queue_size (int): Maximum number of events waiting to be written when asynchronous.
+        flush_interval (float): Maximum seconds an event waits before it is written when asynchronous.
+
+    Returns:
+        logging.Logger: The events logger.
+    """
     logging.addLevelName(EVENTS_LEVEL_NUM, "EVENT")
 
     logger = logging.getLogger("event")
@@ -18,18 +230,35 @@ def setup_events_logger(full_path, events_retention_size):
 
     logging.Logger.event = event
 
-    formatter = logging.Formatter(
-        "%(asctime)s | %(levelname)s | %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
+    if json_lines:
+        formatter = JsonLinesFormatter()
+    else:
+        formatter = logging.Formatter(
+            "%(asctime)s | %(levelname)s | %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+        )
 
-    file_handler = RotatingFileHandler(
+    file_handler_class = (
+        BatchedRotatingFileHandler if asynchronous else RotatingFileHandler
+    )
+    file_handler = file_handler_class(
         os.path.join(full_path, "events.log"),
-        maxBytes=events_retention_size,
+        maxBytes=int(events_retention_size),
         backupCount=DEFAULT_LOG_BACKUP_COUNT,
     )
     file_handler.setFormatter(formatter)
     file_handler.setLevel(EVENTS_LEVEL_NUM)
-    logger.addHandler(file_handler)
+
+    if asynchronous:
+        queue_handler = BatchingQueueHandler(
+            file_handler, maxsize=queue_size, flush_interval=flush_interval
+        )
+        queue_handler.setLevel(EVENTS_LEVEL_NUM)
+        queue_handler.start()
+        # Write out what is still queued when the process exits.
+        atexit.register(queue_handler.close)
+        logger.addHandler(queue_handler)
+    else:
+        logger.addHandler(file_handler)
 
     return logger
@@ -0,0 +1,459 @@
+import math
+import bisect
+import threading
+import numpy as np
+import bittensor as bt
+
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Version 0.0.4 of the Prometheus text exposition format.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# (suffix, label values, extra labels, value)
+Sample = Tuple[str, Tuple[str, ...], Tuple[Tuple[str, str], ...], float]
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Metric(ABC):
+    """
+    Base class of the metrics in a registry. Values are kept per combination
+    of label values and updated under a lock, so metrics can be updated from
+    any thread.
+
+    Args:
+        name (str): Name of the metric.
+        documentation (str): Help text of the metric.
+        labelnames (Sequence[str]): Names of the labels every update has to give.
+    """
+
+    type: str = "untyped"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames) or not all(
+            name in labels for name in self.labelnames
+        ):
+            raise ValueError(
+                f"Metric {self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> Iterator[Sample]:
+        ...
+
+    def render(self) -> List[str]:
+        """Returns the lines of the metric in the Prometheus text format."""
+        lines = [
+            f"# HELP {self.name} {_escape(self.documentation)}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for suffix, values, extra, value in self.samples():
+            labels = [
+                f'{name}="{_escape(label)}"'
+                for name, label in zip(self.labelnames, values)
+            ]
+            labels += [f'{name}="{_escape(label)}"' for name, label in extra]
+            label_text = "{" + ",".join(labels) + "}" if labels else ""
+            lines.append(
+                f"{self.name}{suffix}{label_text} {_format_value(value)}"
+            )
+        return lines
+
+
+class Counter(Metric):
+    """A value that only goes up, e.g. the number of requests handled."""
+
+    type = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only be increased.")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield "", key, (), value
+
+
+class Gauge(Metric):
+    """A value that goes up and down, e.g. the current queue depth."""
+
+    type = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float]):
+        """Reads the value from `function` at collection time instead, only for gauges without labels."""
+        if self.labelnames:
+            raise ValueError("Only gauges without labels can use a function.")
+        self._function = function
+
+    def value(self, **labels) -> float:
+        if self._function is not None:
+            return float(self._function())
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterator[Sample]:
+        if self._function is not None:
+            yield "", (), (), float(self._function())
+            return
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield "", key, (), value
+
+
+class Histogram(Metric):
+    """
+    Counts observations into fixed buckets, e.g. request latencies.
+
+    Args:
+        buckets (Sequence[float]): Upper bounds of the buckets, an infinite bucket is always added.
+    """
+
+    type = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(*args)
+        self.buckets = tuple(sorted(set(buckets) | {math.inf}))
+        # label values -> [per bucket counts, sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry is not None else 0
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            items = [
+                (key, list(counts), total)
+                for key, (counts, total) in self._values.items()
+            ]
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = "+Inf" if math.isinf(bound) else repr(float(bound))
+                yield "_bucket", key, (("le", le),), cumulative
+            yield "_sum", key, (), total
+            yield "_count", key, (), cumulative
+
+
+class HdrHistogram:
+    """
+    Records latencies with a bounded relative error over a wide range, in
+    the style of HdrHistogram.
+
+    Values are counted in units of `unit` seconds. Up to `2 ** sub_bits`
+    units every value has its own bucket; above that every power of two is
+    split into the same number of linear buckets, so the error stays below
+    one part in `10 ** significant_figures` from microseconds to an hour in
+    a few thousand counters. Recording is O(1).
+
+    A histogram is meant to be written from a single thread, reads from
+    other threads see a consistent enough view for reporting.
+
+    Args:
+        max_value (float): Largest value tracked in seconds, larger values are clamped.
+        significant_figures (int): Number of significant decimal figures kept.
+        unit (float): Resolution in seconds.
+    """
+
+    def __init__(
+        self,
+        max_value: float = 3600.0,
+        significant_figures: int = 2,
+        unit: float = 1e-6,
+    ):
+        self.unit = unit
+        self._max_units = max(1, int(max_value / unit))
+        self._sub_bits = max(
+            1, math.ceil(math.log2(2 * 10**significant_figures))
+        )
+        self._half = 1 << (self._sub_bits - 1)
+        self.counts = np.zeros(self._index(self._max_units) + 1, np.int64)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def _index(self, units: int) -> int:
+        shift = units.bit_length() - self._sub_bits
+        if shift <= 0:
+            return units
+        return self._half * shift + (units >> shift)
+
+    def _highest_equivalent(self, index: int) -> int:
+        if index < 2 * self._half:
+            return index
+        shift = index // self._half - 1
+        top = index - self._half * shift
+        return ((top + 1) << shift) - 1
+
+    def record(self, value: float):
+        units = min(max(int(value / self.unit), 0), self._max_units)
+        self.counts[self._index(units)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "HdrHistogram"):
+        """Adds the counts of a histogram with the same layout."""
+        self.counts += other.counts
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percentile: float) -> float:
+        """Returns the value below which `percentile` percent of the recorded values fall."""
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(percentile / 100 * self.count))
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        value = self._highest_equivalent(index) * self.unit
+        return min(max(value, self.min), self.max)
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        """Returns the count, extremes, mean and usual percentiles, e.g. to dump to a file."""
+        return {
+            "count": self.count,
+            "min": self.min if self.count else 0.0,
+            "mean": self.mean,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "p999": self.percentile(99.9),
+            "max": self.max,
+        }
+
+
+class LatencySummary(Metric):
+    """
+    Exposes a set of `HdrHistogram`s as a Prometheus summary, with one
+    series of quantiles per label values. The histograms are read at
+    collection time through `collect`.
+
+    Args:
+        collect (Callable[[], Dict[Tuple[str, ...], HdrHistogram]]): Returns the histogram of every label values.
+        quantiles (Sequence[float]): Quantiles to expose.
+    """
+
+    type = "summary"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], Dict[Tuple[str, ...], HdrHistogram]],
+        quantiles: Sequence[float] = (0.5, 0.9, 0.99),
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+        self.quantiles = tuple(quantiles)
+
+    def samples(self) -> Iterator[Sample]:
+        for key, histogram in list(self.collect().items()):
+            key = tuple(str(value) for value in key)
+            for quantile in self.quantiles:
+                yield "", key, (
+                    ("quantile", repr(quantile)),
+                ), histogram.percentile(quantile * 100)
+            yield "_sum", key, (), histogram.sum
+            yield "_count", key, (), histogram.count
+
+
+class MetricsRegistry:
+    """
+    The metrics of a process, rendered together in the Prometheus text
+    format by `render`, see `MetricsExporter`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} already registered.")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(
+            Histogram(name, documentation, labelnames, buckets=buckets)
+        )
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Returns every metric in the Prometheus text format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes are routine, keep them out of the neuron's logs.
+        pass
+
+
+class MetricsExporter:
+    """
+    Serves a registry at `/metrics` in the Prometheus text format, from a
+    background thread.
+
+    Args:
+        registry (MetricsRegistry): The metrics to serve.
+        port (int): Port to listen on, 0 picks a free one.
+        host (str): Address to listen on, local only by default.
+    """
+
+    def __init__(
+        self, registry: MetricsRegistry, port: int, host: str = "127.0.0.1"
+    ):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._server is not None:
+            return
+        handler = type(
+            "MetricsHandler", (_MetricsHandler,), {"registry": self.registry}
+        )
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name="metrics-exporter",
+            daemon=True,
+        )
+        self._thread.start()
+        bt.logging.info(
+            f"Serving metrics on http://{self.host}:{self.port}/metrics"
+        )
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        self._thread = None
@@ -17,11 +17,106 @@
 # DEALINGS IN THE SOFTWARE.
 
 import time
-import math
-import hashlib as rpccheckhealth
-from math import floor
-from typing import Callable, Any
-from functools import lru_cache, update_wrapper
+import threading
+from collections import OrderedDict
+from typing import Callable, Any, Dict, Hashable, Optional
+from functools import update_wrapper
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    A thread safe LRU cache whose entries expire `ttl` seconds after they were stored.
+
+    Expiry is tracked per entry on a monotonic clock, so entries stored at different times expire at different
+    times and wall clock adjustments don't affect them. When the cache grows past `maxsize` the least recently
+    used entry is evicted.
+
+    Args:
+        maxsize (int): Maximum number of entries. Defaults to 128.
+        ttl (float): Seconds an entry stays valid. If set to a non-positive value, entries never expire.
+                     Defaults to -1.
+        clock (Callable[[], float]): Monotonic time source, overridable for tests.
+
+    Example:
+        cache = TTLCache(maxsize=16, ttl=12)
+        block = cache.get_or_compute(subtensor, subtensor.get_current_block)
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        ttl: float = -1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = max(1, maxsize)
+        self.ttl = ttl if ttl > 0 else None
+        self.clock = clock
+        self._lock = threading.Lock()
+        # key -> (expires_at, value)
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Returns the cached value of `key`, or `default` if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or self.clock() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any):
+        """Stores `value` under `key`, evicting the least recently used entry if the cache is full."""
+        expires_at = None if self.ttl is None else self.clock() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Returns the cached value of `key`, computing and storing it on a miss.
+
+        The lock is not held while computing, concurrent misses on the same key may compute it more than once.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key: Hashable = _MISSING):
+        """Drops the entry of `key`, or every entry when no key is given."""
+        with self._lock:
+            if key is _MISSING:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the hit, miss, eviction and expiration counters and the current size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "size": len(self._entries),
+        }
 
 
 # LRU Cache with TTL
@@ -37,10 +132,11 @@ def ttl_cache(maxsize: int = 128, typed: bool = False, ttl: int = -1):
         typed (bool): If set to True, arguments of different types will be cached separately. For example,
                       f(3) and f(3.0) will be treated as distinct calls with distinct results. Defaults to False.
         ttl (int): The time-to-live for each cache entry, measured in seconds. If set to a non-positive value,
-                   the TTL is set to a very large number, effectively making the cache entries permanent. Defaults to -1.
+                   the cache entries never expire. Defaults to -1.
 
     Returns:
-        Callable: A decorator that can be applied to functions to cache their return values.
+        Callable: A decorator that can be applied to functions to cache their return values. The decorated
+                  function exposes its `TTLCache` as `.cache`.
 
     The decorator is useful for caching results of functions that are expensive to compute and are called
     with the same arguments frequently within short periods of time. The TTL feature helps in ensuring
@@ -52,61 +148,20 @@ def ttl_cache(maxsize: int = 128, typed: bool = False, ttl: int = -1):
             # Expensive data retrieval operation
             return data
     """
-    if ttl <= 0:
-        ttl = 65536
-    hash_gen = _ttl_hash_gen(ttl)
 
     def wrapper(func: Callable) -> Callable:
-        @lru_cache(maxsize, typed)
-        def ttl_func(ttl_hash, *args, **kwargs):
-            return func(*args, **kwargs)
+        cache = TTLCache(maxsize=maxsize, ttl=ttl)
 
         def wrapped(*args, **kwargs) -> Any:
-            th = next(hash_gen)
-            return ttl_func(th, *args, **kwargs)
-
+            key = (args, tuple(sorted(kwargs.items())))
+            if typed:
+                key += (
+                    tuple(type(arg) for arg in args),
+                    tuple(type(value) for _, value in key[1]),
+                )
+            return cache.get_or_compute(key, lambda: func(*args, **kwargs))
+
+        wrapped.cache = cache
         return update_wrapper(wrapped, func)
 
     return wrapper
-
-
-def _ttl_hash_gen(seconds: int):
-    """
-    Internal generator function used by the `ttl_cache` decorator to generate a new hash value at regular
-    time intervals specified by `seconds`.
-
-    Args:
-        seconds (int): The number of seconds after which a new hash value will be generated.
-
-    Yields:
-        int: A hash value that represents the current time interval.
-
-    This generator is used to create time-based hash values that enable the `ttl_cache` to determine
-    whether cached entries are still valid or if they have expired and should be recalculated.
-    """
-    start_time = time.time()
-    while True:
-        yield floor((time.time() - start_time) / seconds)
-
-
-# 12 seconds updating block.
-@ttl_cache(maxsize=1, ttl=12)
-def ttl_get_block(self) -> int:
-    """
-    Retrieves the current block number from the blockchain. This method is cached with a time-to-live (TTL)
-    of 12 seconds, meaning that it will only refresh the block number from the blockchain at most every 12 seconds,
-    reducing the number of calls to the underlying blockchain interface.
-
-    Returns:
-        int: The current block number on the blockchain.
-
-    This method is useful for applications that need to access the current block number frequently and can
-    tolerate a delay of up to 12 seconds for the latest information. By using a cache with TTL, the method
-    efficiently reduces the workload on the blockchain interface.
-
-    Example:
-        current_block = ttl_get_block(self)
-
-    Note: self here is the miner or validator instance
-    """
-    return self.subtensor.get_current_block()
@@ -0,0 +1,128 @@
+import struct
+import hashlib
+
+from typing import Callable
+
+# Header formats understood by miners. "string" appends the decimal nonce to
+# the block text (the original format), "binary" appends the nonce as a
+# little endian uint32 to the hex decoded block header.
+STRING_FORMAT = "string"
+BINARY_FORMAT = "binary"
+HEADER_FORMATS = (STRING_FORMAT, BINARY_FORMAT)
+
+MAX_HASH = (1 << 256) - 1
+MAX_BINARY_NONCE = 0xFFFFFFFF
+
+# Miners and validators raise the target by this factor to simulate a lower
+# difficulty while testing.
+TEST_DIFFICULTY_FACTOR = 1e20
+
+_NONCE_STRUCT = struct.Struct("<I")
+
+
+def double_sha256(block_header: str) -> str:
+    """Returns the hex digest of sha256(sha256(block_header))."""
+    return hashlib.sha256(
+        hashlib.sha256(block_header.encode("utf-8")).digest()
+    ).hexdigest()
+
+
+def bits_to_target(bits: int) -> int:
+    """Expands a compact `bits` difficulty into the full target."""
+    exponent = (bits >> 24) & 0xFF
+    mantissa = bits & 0xFFFFFF
+    return mantissa * (1 << (8 * (exponent - 3)))
+
+
+def expand_target(
+    target: str, difficulty_factor: float = TEST_DIFFICULTY_FACTOR
+) -> int:
+    """Turns the compact hex target of a work item into the full target miners hash against.
+
+    Args:
+        target (str): Compact `bits` target as a hex string.
+        difficulty_factor (float): Multiplier applied to the target, values above one lower the difficulty.
+
+    Returns:
+        int: The full target.
+    """
+    return int(bits_to_target(int(target, 16)) * difficulty_factor)
+
+
+def target_to_bytes(target: int) -> bytes:
+    """Converts a target into a byte string comparable with raw digests.
+
+    Raw sha256 digests compare like their big endian integer values, so
+    `digest < target_to_bytes(target)` is equivalent to
+    `int.from_bytes(digest, "big") < target`. Targets above the largest
+    possible hash get a trailing byte so that every digest compares lower.
+
+    Args:
+        target (int): The full target.
+
+    Returns:
+        bytes: The target as a 32 byte (or 33 byte for unreachable) string.
+    """
+    if target <= 0:
+        return bytes(32)
+    if target > MAX_HASH:
+        return MAX_HASH.to_bytes(32, "big") + b"\x00"
+    return target.to_bytes(32, "big")
+
+
+class BlockHeader:
+    """
+    A block header prepared for repeated hashing with different nonces.
+
+    The constant prefix is fed into a sha256 object once and its midstate is
+    reused for every nonce with `.copy()`, so hashing a nonce only costs the
+    nonce bytes plus the second sha256 round.
+
+    Args:
+        block (str): The block data received from the validator.
+        target (int): The full target hashes have to be below.
+        header_format (str): One of `HEADER_FORMATS`.
+    """
+
+    def __init__(
+        self, block: str, target: int, header_format: str = STRING_FORMAT
+    ):
+        if header_format == STRING_FORMAT:
+            prefix = block.encode("utf-8")
+            self.encode_nonce: Callable[[int], bytes] = b"%d".__mod__
+        elif header_format == BINARY_FORMAT:
+            prefix = bytes.fromhex(block)
+            self.encode_nonce = _NONCE_STRUCT.pack
+        else:
+            raise ValueError(
+                f"Unknown header format {header_format}, expected one of {HEADER_FORMATS}"
+            )
+        self.header_format = header_format
+        self.midstate = hashlib.sha256(prefix)
+        self.target = target
+        self.target_bytes = target_to_bytes(target)
+
+    def check_nonce_range(self, start: int, end: int):
+        """Raises a ValueError if [start, end) can not be encoded."""
+        if start < 0:
+            raise ValueError(
+                f"Nonce range start must be non-negative, got {start}"
+            )
+        if self.header_format == BINARY_FORMAT and end - 1 > MAX_BINARY_NONCE:
+            raise ValueError(
+                f"Binary headers only support 32 bit nonces, got range end {end}"
+            )
+
+    def digest(self, nonce: int) -> bytes:
+        """Returns the raw double sha256 digest of the header with `nonce`."""
+        inner = self.midstate.copy()
+        inner.update(self.encode_nonce(nonce))
+        return hashlib.sha256(inner.digest()).digest()
+
+    def hash_hex(self, nonce: int) -> str:
+        """Returns the double sha256 hex digest of the header with `nonce`."""
+        return self.digest(nonce).hex()
+
+    def meets_target(self, digest: bytes) -> bool:
+        """Whether the raw `digest` is below the target."""
+        return digest < self.target_bytes
@@ -1,7 +1,10 @@
-import random
 import bittensor as bt
 import numpy as np
-from typing import List
+from typing import List, Optional
+
+from template.base.utils.metagraph import MetagraphIndex
+
+_rng = np.random.default_rng()
 
 
 def check_uid_availability(
@@ -26,37 +29,56 @@ def check_uid_availability(
     return True
 
 
-def get_random_uids(self, k: int, exclude: List[int] = None) -> np.ndarray:
+def get_random_uids(
+    self,
+    k: int,
+    exclude: List[int] = None,
+    weights: Optional[np.ndarray] = None,
+    rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
     """Returns k available random uids from the metagraph.
     Args:
         k (int): Number of uids to return.
         exclude (List[int]): List of uids to exclude from the random sampling.
+        weights (np.ndarray, optional): Sampling weight of every uid, e.g. its recent responsiveness. Uniform if None.
+        rng (np.random.Generator, optional): Random generator to sample with.
     Returns:
         uids (np.ndarray): Randomly sampled available uids.
     Notes:
         If `k` is larger than the number of available `uids`, set `k` to the number of available `uids`.
     """
-    candidate_uids = []
-    avail_uids = []
+    rng = rng or _rng
+    index = getattr(self, "metagraph_index", None)
+    if index is None:
+        index = MetagraphIndex.build(self.metagraph)
+    # Cached on the index, so only recomputed when the metagraph syncs.
+    available = index.available(self.config.neuron.vpermit_tao_limit)
 
-    for uid in range(self.metagraph.n.item()):
-        uid_is_available = check_uid_availability(
-            self.metagraph, uid, self.config.neuron.vpermit_tao_limit
-        )
-        uid_is_not_excluded = exclude is None or uid not in exclude
+    excluded = np.zeros(len(available), dtype=bool)
+    if exclude:
+        exclude = np.fromiter(set(exclude), dtype=np.int64)
+        excluded[exclude[(exclude >= 0) & (exclude < len(available))]] = True
 
-        if uid_is_available:
-            avail_uids.append(uid)
-            if uid_is_not_excluded:
-                candidate_uids.append(uid)
+    avail_uids = np.flatnonzero(available)
+    candidate_uids = np.flatnonzero(available & ~excluded)
     # If k is larger than the number of available uids, set k to the number of available uids.
     k = min(k, len(avail_uids))
+
     # Check if candidate_uids contain enough for querying, if not grab all avaliable uids
-    available_uids = candidate_uids
     if len(candidate_uids) < k:
-        available_uids += random.sample(
-            [uid for uid in avail_uids if uid not in candidate_uids],
+        fill = rng.choice(
+            np.flatnonzero(available & excluded),
             k - len(candidate_uids),
+            replace=False,
+        )
+        return rng.permutation(np.concatenate([candidate_uids, fill]))
+
+    p = None
+    if weights is not None:
+        # A small floor keeps every candidate reachable, and enough of them to draw k without replacement.
+        p = np.clip(
+            np.asarray(weights, dtype=np.float64)[candidate_uids], 0, None
         )
-    uids = np.array(random.sample(available_uids, k))
-    return uids
+        p += max(p.sum(), 1.0) * 1e-6 / max(len(p), 1)
+        p /= p.sum()
+    return rng.choice(candidate_uids, k, replace=False, p=p)
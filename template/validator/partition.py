@@ -0,0 +1,121 @@
+import time
+import numpy as np
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+class HashrateTracker:
+    """
+    Keeps a moving estimate of every miner's hashrate from the nonce ranges it
+    covered and how long it took to answer, and remembers miners that keep
+    failing to answer.
+
+    Args:
+        alpha (float): Weight of a new observation in the moving average.
+        max_failures (int): Consecutive failures after which a miner counts as dead.
+        retry_after (float): Seconds after its last failure a dead miner is tried again.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.3,
+        max_failures: int = 3,
+        retry_after: float = 600.0,
+    ):
+        self.alpha = alpha
+        self.max_failures = max_failures
+        self.retry_after = retry_after
+        self.hashrates: Dict[int, float] = {}
+        self.failures: Dict[int, int] = {}
+        self.last_failure: Dict[int, float] = {}
+
+    def observe(self, uid: int, hashes: int, seconds: float):
+        """Records that `uid` covered `hashes` nonces in `seconds`."""
+        self.failures.pop(uid, None)
+        self.last_failure.pop(uid, None)
+        if hashes <= 0 or seconds <= 0:
+            return
+        rate = hashes / seconds
+        previous = self.hashrates.get(uid)
+        self.hashrates[uid] = (
+            rate
+            if previous is None
+            else self.alpha * rate + (1 - self.alpha) * previous
+        )
+
+    def observe_failure(self, uid: int):
+        """Records that `uid` could not be reached or timed out."""
+        self.failures[uid] = self.failures.get(uid, 0) + 1
+        self.last_failure[uid] = time.monotonic()
+
+    def is_dead(self, uid: int) -> bool:
+        if self.failures.get(uid, 0) < self.max_failures:
+            return False
+        return time.monotonic() - self.last_failure[uid] < self.retry_after
+
+    def estimates(self, uids: Sequence[int]) -> np.ndarray:
+        """Returns the hashrate estimate of each uid.
+
+        Miners without observations yet get the median of the known
+        estimates (or 1 when nothing is known), so they receive a typical
+        slice until they have been measured.
+        """
+        known = [self.hashrates[uid] for uid in uids if uid in self.hashrates]
+        default = float(np.median(known)) if known else 1.0
+        return np.array(
+            [self.hashrates.get(uid, default) for uid in uids],
+            dtype=np.float64,
+        )
+
+
+def partition_nonce_range(
+    start: int,
+    end: int,
+    uids: Sequence[int],
+    hashrates: Optional[np.ndarray] = None,
+    min_share: float = 0.1,
+) -> List[Tuple[int, int, int]]:
+    """Splits the inclusive nonce range [start, end] between miners in proportion to their hashrate.
+
+    Args:
+        start (int): First nonce of the round.
+        end (int): Last nonce of the round, inclusive.
+        uids (Sequence[int]): Miners to split the range between.
+        hashrates (np.ndarray, optional): Hashrate estimate per uid, an even split when None.
+        min_share (float): Smallest slice a miner gets, as a fraction of an even split. Keeps slow
+            or new miners measurable.
+
+    Returns:
+        List[Tuple[int, int, int]]: (uid, first nonce, last nonce) for every miner with a non-empty slice,
+            the slices are contiguous and cover the whole range.
+    """
+    total = end - start + 1
+    if not len(uids) or total <= 0:
+        return []
+
+    num_miners = len(uids)
+    if hashrates is None:
+        weights = np.ones(num_miners, dtype=np.float64)
+    else:
+        weights = np.nan_to_num(np.asarray(hashrates, dtype=np.float64))
+        weights = np.clip(weights, 0, None)
+    if weights.sum() <= 0:
+        weights = np.ones(num_miners, dtype=np.float64)
+    weights = weights / weights.sum()
+
+    # Lift everyone to the exploration floor and take it from the rest.
+    floor = min(max(min_share, 0.0), 1.0) / num_miners
+    weights = floor + (1 - floor * num_miners) * weights
+
+    sizes = np.floor(weights * total).astype(np.int64)
+    # Hand the rounding remainder to the fastest miners.
+    remainder = total - int(sizes.sum())
+    sizes[np.argsort(-weights, kind="stable")[:remainder]] += 1
+
+    ends = start + np.cumsum(sizes) - 1
+    starts = ends - sizes + 1
+    return [
+        (int(uid), int(first), int(last))
+        for uid, first, last, size in zip(uids, starts, ends, sizes)
+        if size > 0
+    ]
@@ -52,6 +52,27 @@ def reward(query: Dict, response: Dict) -> float:
     return 0.0
 
 
+def pow_reward(response: Dict, target: int) -> float:
+    """
+    Reward a miner's proof-of-work response. A hash below the round's target
+    earns the full reward, anything else earns nothing.
+
+    Args:
+    - response (Dict): The miner response, holding at least 'block_hash'.
+    - target (int): The full target of the round.
+
+    Returns:
+    - float: The reward value for the miner.
+    """
+    if response is None or response.get('block_hash') is None:
+        return 0.0
+    try:
+        return 1.0 if int(response['block_hash'], 16) < target else 0.0
+    except (TypeError, ValueError):
+        bt.logging.warning(f"Malformed block hash in response: {response}")
+        return 0.0
+
+
 def get_rewards(
     self,
     query: Dict,
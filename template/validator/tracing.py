@@ -0,0 +1,238 @@
+import os
+import json
+import time
+import random
+import bittensor as bt
+
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+from template.utils.metrics import (
+    HdrHistogram,
+    LatencySummary,
+    MetricsRegistry,
+)
+
+
+@dataclass(frozen=True)
+class MinerCall:
+    """
+    One dendrite call of a round.
+
+    Attributes:
+    - uid: The queried miner.
+    - latency: Seconds from sending the request to receiving the response.
+    - status: Status code of the response, "error" if the call raised.
+    - bytes_sent: Size of the request body.
+    - bytes_received: Size of the response body.
+    """
+
+    uid: int
+    latency: float
+    status: str
+    bytes_sent: int = 0
+    bytes_received: int = 0
+
+
+@dataclass
+class RoundTrace:
+    """
+    Timings of a single forward round, summarized in one line when the round
+    finishes instead of logging every miner.
+
+    Attributes:
+    - request_id: The work item of the round.
+    - started: `time.perf_counter()` at the start of the round.
+    - stages: Seconds spent in each stage of the round.
+    - calls: Every dendrite call of the round.
+    - sample_rate: Share of the miners whose events are logged individually.
+    - rng: Random source of the sampling.
+    """
+
+    request_id: str = "N/A"
+    started: float = field(default_factory=time.perf_counter)
+    stages: Dict[str, float] = field(default_factory=dict)
+    calls: List[MinerCall] = field(default_factory=list)
+    sample_rate: float = 0.0
+    rng: random.Random = field(default_factory=random.Random, repr=False)
+    _sampled: Dict[int, bool] = field(default_factory=dict, repr=False)
+
+    def is_sampled(self, uid: int) -> bool:
+        """Whether the events of `uid` are logged individually this round, decided once per uid."""
+        sampled = self._sampled.get(uid)
+        if sampled is None:
+            sampled = self._sampled[uid] = (
+                self.sample_rate > 0 and self.rng.random() < self.sample_rate
+            )
+        return sampled
+
+
+class RoundTracer:
+    """
+    Traces validator rounds: how long each stage takes, and the latency,
+    status and payload size of every dendrite call.
+
+    Stage and call latencies go into `HdrHistogram`s kept for the lifetime
+    of the validator, which can be dumped to a file with `dump` or scraped
+    through a metrics registry, see `register`. Each round ends with a one
+    line summary; per-miner events are only logged for a random sample of
+    `sample_rate` of the miners.
+
+    Args:
+        sample_rate (float): Share of the miners whose events are logged individually each round.
+        rng (random.Random, optional): Random source of the sampling.
+    """
+
+    def __init__(self, sample_rate: float = 0.0, rng: random.Random = None):
+        self.sample_rate = sample_rate
+        self.rng = rng or random.Random()
+        self.stages: Dict[str, HdrHistogram] = {}
+        self.dendrite = HdrHistogram()
+        self.miners: Dict[int, HdrHistogram] = {}
+        self.statuses: Counter = Counter()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.rounds = 0
+        # Mirrors `statuses` once registered, see `register`.
+        self._status_metric = None
+
+    def start_round(self, request_id: str = "N/A") -> RoundTrace:
+        """Starts tracing a round, the request id can be filled in once the work is fetched."""
+        return RoundTrace(
+            request_id=request_id, sample_rate=self.sample_rate, rng=self.rng
+        )
+
+    def observe_stage(
+        self, stage: str, seconds: float, trace: Optional[RoundTrace] = None
+    ):
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = HdrHistogram()
+        histogram.record(seconds)
+        if trace is not None:
+            trace.stages[stage] = trace.stages.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def span(
+        self, stage: str, trace: Optional[RoundTrace] = None
+    ) -> Iterator[None]:
+        """Times the enclosed block as `stage`, of `trace` if given."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(stage, time.perf_counter() - start, trace)
+
+    def record_call(self, trace: Optional[RoundTrace], call: MinerCall):
+        """Records a dendrite call."""
+        self.dendrite.record(call.latency)
+        histogram = self.miners.get(call.uid)
+        if histogram is None:
+            histogram = self.miners[call.uid] = HdrHistogram()
+        histogram.record(call.latency)
+        self.statuses[call.status] += 1
+        if self._status_metric is not None:
+            self._status_metric.inc(status=call.status)
+        self.bytes_sent += call.bytes_sent
+        self.bytes_received += call.bytes_received
+        if trace is not None:
+            trace.calls.append(call)
+
+    def finish_round(self, trace: RoundTrace) -> str:
+        """Records the round's total time and logs its summary.
+
+        Returns:
+            str: The summary line.
+        """
+        self.observe_stage("round", time.perf_counter() - trace.started)
+        self.rounds += 1
+        latencies = HdrHistogram()
+        statuses: Counter = Counter()
+        for call in trace.calls:
+            latencies.record(call.latency)
+            statuses[call.status] += 1
+        stages = ", ".join(
+            f"{stage} {seconds:.3f}s"
+            for stage, seconds in trace.stages.items()
+        )
+        summary = (
+            f"Round {trace.request_id}: {len(trace.calls)} calls "
+            f"{dict(statuses)}, dendrite p50 {latencies.percentile(50):.3f}s "
+            f"p99 {latencies.percentile(99):.3f}s max {latencies.max:.3f}s, "
+            f"sent {sum(call.bytes_sent for call in trace.calls)}B "
+            f"received {sum(call.bytes_received for call in trace.calls)}B, "
+            f"stages: {stages}, total "
+            f"{time.perf_counter() - trace.started:.3f}s"
+        )
+        bt.logging.info(summary)
+        return summary
+
+    def snapshot(self) -> dict:
+        """Returns the histograms and totals since startup as plain data."""
+        return {
+            "rounds": self.rounds,
+            "stages": {
+                stage: histogram.summary()
+                for stage, histogram in self.stages.items()
+            },
+            "dendrite": self.dendrite.summary(),
+            "miners": {
+                str(uid): histogram.summary()
+                for uid, histogram in sorted(self.miners.items())
+            },
+            "statuses": dict(self.statuses),
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+        }
+
+    def dump(self, path: str):
+        """Writes `snapshot` to `path` as JSON, replacing the file atomically."""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    def register(self, registry: MetricsRegistry):
+        """Exposes the histograms and totals through `registry`."""
+        registry.register(
+            LatencySummary(
+                "validator_stage_seconds",
+                "Time spent in each stage of a round.",
+                ("stage",),
+                lambda: {(stage,): h for stage, h in self.stages.items()},
+            )
+        )
+        registry.register(
+            LatencySummary(
+                "validator_dendrite_seconds",
+                "Latency of dendrite calls to miners.",
+                (),
+                lambda: {(): self.dendrite},
+            )
+        )
+        registry.register(
+            LatencySummary(
+                "validator_miner_dendrite_seconds",
+                "Latency of dendrite calls, by miner uid.",
+                ("uid",),
+                lambda: {(uid,): h for uid, h in self.miners.items()},
+            )
+        )
+        registry.gauge("validator_rounds", "Rounds traced.").set_function(
+            lambda: self.rounds
+        )
+        registry.gauge(
+            "validator_dendrite_bytes_sent", "Request bytes sent."
+        ).set_function(lambda: self.bytes_sent)
+        registry.gauge(
+            "validator_dendrite_bytes_received", "Response bytes received."
+        ).set_function(lambda: self.bytes_received)
+        self._status_metric = registry.counter(
+            "validator_dendrite_responses_total",
+            "Dendrite calls, by response status.",
+            ("status",),
+        )
+        for status, count in self.statuses.items():
+            self._status_metric.inc(count, status=status)
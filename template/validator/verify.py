@@ -0,0 +1,170 @@
+import os
+import asyncio
+import numpy as np
+import bittensor as bt
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from template.utils.pow import BlockHeader, STRING_FORMAT
+
+# Nonce range assigned to a miner, both ends inclusive.
+NonceRange = Tuple[int, int]
+
+
+def check_response(
+    header: BlockHeader,
+    response: Dict,
+    nonce_range: Optional[NonceRange] = None,
+) -> Optional[str]:
+    """Recomputes the hash of a miner response and checks it against the claim.
+
+    A response claiming a solution also has to meet the target. Partial
+    responses, the best hash a miner found before its deadline, only have to
+    be genuine.
+
+    Args:
+        header (BlockHeader): The header of the round, built from its block and full target.
+        response (Dict): The miner response, holding 'nonce', 'block_hash' and optionally 'partial'.
+        nonce_range (NonceRange, optional): The range assigned to the miner, checked when given.
+
+    Returns:
+        Optional[str]: None if the response is genuine, otherwise why it was rejected.
+    """
+    try:
+        nonce = int(response["nonce"])
+        claimed = bytes.fromhex(response["block_hash"])
+    except (KeyError, TypeError, ValueError):
+        return "malformed response"
+    if nonce_range is not None and not (
+        nonce_range[0] <= nonce <= nonce_range[1]
+    ):
+        return f"nonce {nonce} outside of assigned range {nonce_range}"
+    try:
+        digest = header.digest(nonce)
+    except Exception:
+        return f"nonce {nonce} can not be encoded"
+    if digest != claimed:
+        return f"claimed hash does not match nonce {nonce}"
+    if not response.get("partial") and not header.meets_target(digest):
+        return f"hash of nonce {nonce} does not meet the target"
+    return None
+
+
+def check_batch(
+    block: str,
+    target: int,
+    responses: Sequence[Dict],
+    nonce_ranges: Sequence[Optional[NonceRange]],
+    header_format: str = STRING_FORMAT,
+) -> List[Optional[str]]:
+    """Runs `check_response` over a batch of responses to the same round."""
+    header = BlockHeader(block, target, header_format)
+    return [
+        check_response(header, response, nonce_range)
+        for response, nonce_range in zip(responses, nonce_ranges)
+    ]
+
+
+class ProofVerifier:
+    """
+    Verifies the proof-of-work of miner responses before the validator
+    scores or submits them.
+
+    Every response is re-hashed from its nonce with the round's header
+    midstate, the nonce has to lie in the range assigned to the miner, the
+    recomputed hash has to equal the claimed one and, unless the response is
+    marked partial, it has to meet the target. A batch is split across a
+    thread pool so verifying a full round stays off the event loop.
+
+    Args:
+        max_workers (int, optional): Number of verification threads.
+        min_batch_size (int): Batches smaller than this are verified by a single thread.
+    """
+
+    def __init__(
+        self, max_workers: Optional[int] = None, min_batch_size: int = 32
+    ):
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.min_batch_size = max(1, min_batch_size)
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.verified = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="pow-verifier",
+            )
+        return self.executor
+
+    async def verify(
+        self,
+        work_data: Dict,
+        target: int,
+        responses: Sequence[Dict],
+        assignments: Optional[Dict[int, NonceRange]] = None,
+    ) -> np.ndarray:
+        """Verifies a batch of responses to the same work item.
+
+        Args:
+            work_data (Dict): The work item the responses answer, with the 'header_format' sent to the miners.
+            target (int): The full target of the round.
+            responses (Sequence[Dict]): Miner responses holding 'uid', 'nonce', 'block_hash' and optionally 'partial'.
+            assignments (Dict[int, NonceRange], optional): Nonce range assigned to each uid.
+
+        Returns:
+            np.ndarray: Boolean mask, True where the response is genuine.
+        """
+        if not responses:
+            return np.zeros(0, dtype=bool)
+        block = work_data.get("block", "")
+        header_format = work_data.get("header_format", STRING_FORMAT)
+        assignments = assignments or {}
+        nonce_ranges = [
+            assignments.get(response.get("uid")) for response in responses
+        ]
+
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        num_batches = min(
+            self.max_workers, max(1, len(responses) // self.min_batch_size)
+        )
+        bounds = np.linspace(0, len(responses), num_batches + 1, dtype=int)
+        try:
+            batches = await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        executor,
+                        check_batch,
+                        block,
+                        target,
+                        responses[lo:hi],
+                        nonce_ranges[lo:hi],
+                        header_format,
+                    )
+                    for lo, hi in zip(bounds[:-1], bounds[1:])
+                )
+            )
+        except ValueError as e:
+            # The header itself is unusable, nothing in the batch can be trusted.
+            bt.logging.warning(f"Can not verify responses: {e}")
+            self.rejected += len(responses)
+            return np.zeros(len(responses), dtype=bool)
+
+        reasons = [reason for batch in batches for reason in batch]
+        for response, reason in zip(responses, reasons):
+            if reason is not None:
+                bt.logging.warning(
+                    f"Rejected response from miner {response.get('uid')}: {reason}"
+                )
+        valid = np.array([reason is None for reason in reasons], dtype=bool)
+        self.verified += int(valid.sum())
+        self.rejected += int(len(valid) - valid.sum())
+        return valid
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
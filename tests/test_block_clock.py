@@ -0,0 +1,118 @@
+import time
+import types
+import threading
+import unittest
+
+from template.utils.block_clock import BlockClock
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeSubtensor:
+    def __init__(self, block=100):
+        self.current_block = block
+        self.calls = 0
+
+    def get_current_block(self):
+        self.calls += 1
+        return self.current_block
+
+
+class BlockClockTestCase(unittest.TestCase):
+    def test_extrapolates_between_resyncs(self):
+        clock = FakeClock()
+        subtensor = FakeSubtensor(block=100)
+        block_clock = BlockClock(
+            subtensor, block_time=12.0, resync_interval=300.0, clock=clock
+        )
+        self.assertEqual(block_clock.block, 100)
+        clock.now = 35.0
+        self.assertEqual(block_clock.block, 102)
+        self.assertEqual(subtensor.calls, 1)
+
+        # The chain fell behind, the resync corrects the extrapolation.
+        subtensor.current_block = 120
+        clock.now = 300.0
+        self.assertEqual(block_clock.block, 120)
+        self.assertEqual(subtensor.calls, 2)
+        self.assertEqual(block_clock.rpc_calls, 2)
+
+    def test_on_block_wakes_waiter(self):
+        block_clock = BlockClock(FakeSubtensor(block=100), block_time=60.0)
+        result = []
+        waiter = threading.Thread(
+            target=lambda: result.append(
+                block_clock.wait_for_block(101, timeout=5)
+            )
+        )
+        waiter.start()
+        time.sleep(0.05)
+        block_clock.on_block(101)
+        waiter.join(1)
+        self.assertFalse(waiter.is_alive())
+        self.assertEqual(result, [101])
+
+    def test_wait_times_out(self):
+        block_clock = BlockClock(FakeSubtensor(block=100), block_time=60.0)
+        start = time.monotonic()
+        self.assertEqual(block_clock.wait_for_block(105, timeout=0.1), 100)
+        self.assertLess(time.monotonic() - start, 1.0)
+
+    def test_stop_releases_waiter(self):
+        block_clock = BlockClock(FakeSubtensor(block=100), block_time=60.0)
+        threading.Timer(0.05, block_clock.stop).start()
+        self.assertEqual(block_clock.wait_for_block(105), 100)
+
+    def test_stalled_subscription_falls_back_to_the_chain(self):
+        clock = FakeClock()
+        subtensor = FakeSubtensor(block=100)
+        block_clock = BlockClock(subtensor, block_time=12.0, clock=clock)
+        block_clock._subscribed = True
+        block_clock.on_block(100, live=True)
+        clock.now = 23.0
+        self.assertEqual(block_clock.block, 100)
+        self.assertEqual(subtensor.calls, 0)
+
+        # No header for two block times, the chain is read instead.
+        subtensor.current_block = 102
+        clock.now = 24.0
+        self.assertEqual(block_clock.block, 102)
+        clock.now = 36.0
+        self.assertEqual(block_clock.block, 103)
+        self.assertEqual(subtensor.calls, 1)
+
+        # Headers arriving again take over.
+        block_clock.on_block(104, live=True)
+        self.assertEqual(block_clock.block, 104)
+        self.assertEqual(subtensor.calls, 1)
+
+    def test_wait_survives_stalled_subscription(self):
+        started = time.monotonic()
+        chain = types.SimpleNamespace(
+            get_current_block=lambda: 100
+            + int((time.monotonic() - started) // 0.05)
+        )
+        block_clock = BlockClock(chain, block_time=0.05)
+        block_clock._subscribed = True
+        block_clock.on_block(100, live=True)
+        self.assertGreaterEqual(
+            block_clock.wait_for_block(102, timeout=2), 102
+        )
+
+    def test_no_subscription_without_substrate(self):
+        block_clock = BlockClock(
+            FakeSubtensor(), subscription_subtensor=FakeSubtensor()
+        )
+        self.assertFalse(block_clock.can_subscribe)
+        block_clock.start()
+        self.assertFalse(block_clock.is_subscribed)
+
+
+if __name__ == "__main__":
+    unittest.main()
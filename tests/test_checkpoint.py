@@ -0,0 +1,169 @@
+import os
+import shutil
+import tempfile
+import types
+import unittest
+
+import numpy as np
+
+from neurons.validator import Validator
+from template.base.utils.checkpoint import (
+    Checkpoint,
+    CheckpointError,
+    CheckpointWriter,
+    StateDelta,
+    ValidatorState,
+)
+from template.base.utils.scores import ScoreStore
+
+
+def make_state(store: ScoreStore, step: int = 0) -> ValidatorState:
+    values, updated = store.raw()
+    store.take_dirty()
+    return ValidatorState(
+        step=step,
+        score_step=store.step,
+        updated=updated.copy(),
+        values=values.copy(),
+        hotkeys=[f"hotkey-{uid}" for uid in range(store.n)],
+    )
+
+
+def make_delta(store: ScoreStore, step: int = 0) -> StateDelta:
+    values, updated = store.raw()
+    uids = store.take_dirty()
+    return StateDelta(
+        step=step,
+        score_step=store.step,
+        uids=uids,
+        updated=updated[uids],
+        values=values[uids],
+    )
+
+
+class CheckpointTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "state.ckpt")
+        self.store = ScoreStore(8, alpha=0.5)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def restored(self, state: ValidatorState) -> ScoreStore:
+        store = ScoreStore(0, alpha=0.5)
+        store.restore(state.score_step, state.values, state.updated)
+        return store
+
+    def test_missing_checkpoint(self):
+        checkpoint = Checkpoint(self.path)
+        self.assertIsNone(checkpoint.load())
+        self.assertTrue(checkpoint.needs_snapshot)
+
+    def test_snapshot_and_deltas_round_trip(self):
+        checkpoint = Checkpoint(self.path, snapshot_interval=3)
+        self.store.update([0, 1], [1.0, 0.5])
+        checkpoint.save(make_state(self.store, step=1))
+        self.assertFalse(checkpoint.needs_snapshot)
+        for step in range(2, 5):
+            self.store.update([step], [1.0])
+            checkpoint.save(make_delta(self.store, step=step))
+        self.assertTrue(checkpoint.needs_snapshot)
+
+        loaded = Checkpoint(self.path, snapshot_interval=3)
+        state = loaded.load()
+        self.assertEqual(state.step, 4)
+        self.assertEqual(state.hotkeys, [f"hotkey-{uid}" for uid in range(8)])
+        self.assertEqual(loaded.deltas, 3)
+        np.testing.assert_array_equal(
+            self.restored(state).scores(), self.store.scores()
+        )
+
+    def test_torn_delta_is_dropped(self):
+        checkpoint = Checkpoint(self.path)
+        checkpoint.save(make_state(self.store))
+        self.store.update([3], [1.0])
+        checkpoint.save(make_delta(self.store, step=1))
+        expected = self.store.scores()
+        self.store.update([4], [1.0])
+        checkpoint.save(make_delta(self.store, step=2))
+        with open(checkpoint.log_path, "r+b") as f:
+            f.truncate(os.path.getsize(checkpoint.log_path) - 3)
+
+        state = Checkpoint(self.path).load()
+        self.assertEqual(state.step, 1)
+        np.testing.assert_array_equal(self.restored(state).scores(), expected)
+
+    def test_stale_deltas_are_skipped(self):
+        checkpoint = Checkpoint(self.path)
+        checkpoint.save(make_state(self.store))
+        self.store.update([3], [1.0])
+        checkpoint.save(make_delta(self.store, step=1))
+        with open(checkpoint.log_path, "rb") as f:
+            log = f.read()
+        checkpoint.save(make_state(self.store, step=1))
+        # Crash between writing the snapshot and truncating the log.
+        with open(checkpoint.log_path, "wb") as f:
+            f.write(log)
+
+        loaded = Checkpoint(self.path)
+        state = loaded.load()
+        self.assertEqual(state.step, 1)
+        self.assertEqual(loaded.deltas, 0)
+        self.assertTrue(loaded.needs_snapshot)
+
+    def test_corrupt_snapshot_raises(self):
+        checkpoint = Checkpoint(self.path)
+        self.store.update([0], [1.0])
+        checkpoint.save(make_state(self.store))
+        with open(self.path, "r+b") as f:
+            f.seek(70)
+            f.write(b"\xff")
+        with self.assertRaises(CheckpointError):
+            Checkpoint(self.path).load()
+
+    def test_background_writer(self):
+        checkpoint = Checkpoint(self.path)
+        writer = CheckpointWriter(checkpoint)
+        writer.submit(make_state(self.store))
+        for step in range(1, 20):
+            self.store.update([step % 8], [1.0])
+            writer.submit(make_delta(self.store, step=step))
+        writer.stop()
+        self.assertEqual(writer.failures, 0)
+
+        state = Checkpoint(self.path).load()
+        self.assertEqual(state.step, 19)
+        np.testing.assert_array_equal(
+            self.restored(state).scores(), self.store.scores()
+        )
+
+    def test_validator_migrates_legacy_state(self):
+        hotkeys = [f"hotkey-{uid}" for uid in range(4)]
+        scores = np.array([0.5, 0.0, 0.25, 1.0], dtype=np.float32)
+        np.savez(
+            os.path.join(self.dir, "state.npz"),
+            step=7,
+            scores=scores,
+            hotkeys=hotkeys,
+        )
+        validator = Validator.__new__(Validator)
+        validator.config = types.SimpleNamespace(
+            neuron=types.SimpleNamespace(full_path=self.dir)
+        )
+        validator.checkpoint = Checkpoint(self.path)
+        validator.score_store = ScoreStore(4, alpha=0.5)
+        validator.metagraph = types.SimpleNamespace(
+            n=5, hotkeys=hotkeys[:3] + ["new-hotkey", "hotkey-4"]
+        )
+        validator.load_state()
+
+        self.assertEqual(validator.step, 7)
+        self.assertTrue(validator.checkpoint.needs_snapshot)
+        np.testing.assert_allclose(
+            validator.score_store.scores(), [0.5, 0.0, 0.25, 0.0, 0.0]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from template.utils.logging import (
+    EVENTS_LEVEL_NUM,
+    BatchedRotatingFileHandler,
+    BatchingQueueHandler,
+    JsonLinesFormatter,
+    setup_events_logger,
+)
+
+
+class BlockingHandler(logging.Handler):
+    """Collects records, holding up the writer until `unblocked` is set."""
+
+    def __init__(self):
+        super().__init__()
+        self.unblocked = threading.Event()
+        self.records = []
+        self.flushes = 0
+
+    def emit(self, record):
+        self.unblocked.wait(5)
+        self.records.append(record.getMessage())
+
+    def flush(self):
+        self.flushes += 1
+
+
+class EventsLoggingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.logger = logging.getLogger(f"test-events-{id(self)}")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+            handler.close()
+        shutil.rmtree(self.dir)
+
+    def test_batches_share_a_flush(self):
+        target = BlockingHandler()
+        target.unblocked.set()
+        handler = BatchingQueueHandler(target, batch_size=64)
+        self.logger.addHandler(handler)
+        for i in range(100):
+            self.logger.info("event %d", i)
+        handler.start()
+        handler.close()
+
+        self.assertEqual(target.records, [f"event {i}" for i in range(100)])
+        self.assertEqual(target.flushes, 2)
+        self.assertEqual(handler.dropped, 0)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        target = BlockingHandler()
+        handler = BatchingQueueHandler(target, maxsize=5, flush_interval=0)
+        self.logger.addHandler(handler)
+        handler.start()
+        self.logger.info("first")  # Held up in the writer.
+        for i in range(20):
+            self.logger.info("event %d", i)
+        target.unblocked.set()
+        handler.close()
+
+        self.assertGreater(handler.dropped, 0)
+        self.assertEqual(len(target.records), 21 - handler.dropped + 1)
+        self.assertEqual(
+            target.records[-1],
+            f"Dropped {handler.dropped} events, the queue was full.",
+        )
+
+    def test_json_lines_rotate(self):
+        path = os.path.join(self.dir, "events.log")
+        target = BatchedRotatingFileHandler(path, maxBytes=200, backupCount=2)
+        target.setFormatter(JsonLinesFormatter())
+        handler = BatchingQueueHandler(target)
+        self.logger.addHandler(handler)
+        handler.start()
+        for i in range(10):
+            self.logger.info({"uid": i, "reward": 0.5})
+        self.logger.info("plain %s", "message")
+        handler.close()
+
+        with open(path) as f:
+            lines = [json.loads(line) for line in f]
+        self.assertTrue(os.path.exists(path + ".1"))
+        self.assertEqual(lines[-1]["msg"], "plain message")
+        self.assertEqual(lines[-2]["event"], {"uid": 9, "reward": 0.5})
+        self.assertTrue(
+            all(os.path.getsize(p) <= 200 for p in (path, path + ".1"))
+        )
+
+    def test_rotation_counts_encoded_bytes(self):
+        path = os.path.join(self.dir, "events.log")
+        target = BatchedRotatingFileHandler(path, maxBytes=200, backupCount=2)
+        self.logger.addHandler(target)
+        for _ in range(10):
+            self.logger.info("\u00e9" * 30)
+        target.close()
+
+        for p in (path, path + ".1", path + ".2"):
+            self.assertLessEqual(os.path.getsize(p), 200)
+
+    def test_setup_events_logger(self):
+        logger = setup_events_logger(
+            self.dir, 1024 * 1024, asynchronous=True, json_lines=True
+        )
+        try:
+            logger.event({"step": 1})
+            handler = logger.handlers[-1]
+            self.assertIsInstance(handler, BatchingQueueHandler)
+            handler.close()
+            with open(os.path.join(self.dir, "events.log")) as f:
+                entry = json.loads(f.readline())
+            self.assertEqual(entry["event"], {"step": 1})
+            self.assertEqual(entry["level"], "EVENT")
+        finally:
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+                handler.close()
+            self.assertEqual(logger.level, EVENTS_LEVEL_NUM)
+
+
+if __name__ == "__main__":
+    unittest.main()
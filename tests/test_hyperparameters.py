@@ -0,0 +1,85 @@
+import unittest
+
+import numpy as np
+
+from template.base.utils.hyperparameters import (
+    HyperparameterCache,
+    WeightHyperparameters,
+    epoch_of,
+)
+from template.base.utils.weight_utils import process_weights_for_netuid
+
+
+class CountingSubtensor:
+    def __init__(self, tempo=10):
+        self.calls = 0
+        self._tempo = tempo
+
+    def _call(self, value):
+        self.calls += 1
+        return value
+
+    def min_allowed_weights(self, netuid):
+        return self._call(2)
+
+    def max_weight_limit(self, netuid):
+        return self._call(0.5)
+
+    def tempo(self, netuid):
+        return self._call(self._tempo)
+
+    def subnetwork_n(self, netuid):
+        return self._call(4)
+
+    def get_current_block(self):
+        raise AssertionError("the block is always passed in these tests")
+
+
+class HyperparameterCacheTestCase(unittest.TestCase):
+    def test_epoch_boundaries(self):
+        # Epochs of netuid 1 with tempo 10 run on blocks 9, 20, 31, ...
+        self.assertEqual(epoch_of(8, 1, 10), 0)
+        self.assertEqual(epoch_of(9, 1, 10), 1)
+        self.assertEqual(epoch_of(19, 1, 10), 1)
+        self.assertEqual(epoch_of(20, 1, 10), 2)
+
+    def test_refreshes_once_per_epoch(self):
+        cache = HyperparameterCache()
+        subtensor = CountingSubtensor()
+        for block in range(9, 20):
+            params = cache.get(subtensor, netuid=1, block=block)
+        self.assertEqual(subtensor.calls, 4)
+        self.assertEqual(params.max_weight_limit, 0.5)
+
+        cache.get(subtensor, netuid=1, block=20)
+        self.assertEqual(subtensor.calls, 8)
+
+        cache.invalidate(1)
+        cache.get(subtensor, netuid=1, block=20)
+        self.assertEqual(subtensor.calls, 12)
+        self.assertEqual((cache.hits, cache.misses), (10, 3))
+
+    def test_process_weights_offline(self):
+        cache = HyperparameterCache()
+        cache.put(
+            1,
+            block=0,
+            params=WeightHyperparameters(
+                min_allowed_weights=1, max_weight_limit=0.5, tempo=100, n=4
+            ),
+        )
+        uids, weights = process_weights_for_netuid(
+            uids=np.arange(4),
+            weights=np.array([0.0, 1.0, 1.0, 2.0], dtype=np.float32),
+            netuid=1,
+            subtensor=None,
+            block=50,
+            hyperparameters=cache,
+        )
+        self.assertEqual(uids.tolist(), [1, 2, 3])
+        self.assertAlmostEqual(float(weights.sum()), 1.0, places=5)
+        self.assertLessEqual(float(weights.max()), 0.5 + 1e-6)
+
+
+if __name__ == "__main__":
+    unittest.main()
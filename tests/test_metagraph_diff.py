@@ -0,0 +1,87 @@
+import types
+import unittest
+
+import bittensor as bt
+import numpy as np
+
+from template.base.utils.metagraph import (
+    MetagraphIndex,
+    MetagraphSnapshot,
+    replaced_uids,
+)
+
+
+def fake_metagraph(hotkeys, ports=None, stake=None, permits=None):
+    n = len(hotkeys)
+    ports = ports or [8091] * n
+    return types.SimpleNamespace(
+        hotkeys=list(hotkeys),
+        axons=[
+            bt.AxonInfo(
+                version=1,
+                ip="1.2.3.4",
+                port=port,
+                ip_type=4,
+                hotkey=hotkey,
+                coldkey="cold",
+            )
+            for hotkey, port in zip(hotkeys, ports)
+        ],
+        S=np.array(stake or [1.0] * n, dtype=np.float32),
+        validator_permit=np.array(permits or [False] * n),
+    )
+
+
+class MetagraphDiffTestCase(unittest.TestCase):
+    def test_unchanged(self):
+        old = MetagraphSnapshot.capture(fake_metagraph(["a", "b", "c"]))
+        new = MetagraphSnapshot.capture(fake_metagraph(["a", "b", "c"]))
+        changes = old.diff(new)
+        self.assertFalse(changes)
+        self.assertFalse(changes.axons_changed)
+
+    def test_reports_changed_uids(self):
+        old = MetagraphSnapshot.capture(fake_metagraph(["a", "b", "c"]))
+        new = MetagraphSnapshot.capture(
+            fake_metagraph(
+                ["a", "x", "c", "d"],
+                ports=[8091, 8091, 9000, 8091],
+                stake=[2.0, 1.0, 1.0, 1.0],
+                permits=[False, False, False, True],
+            )
+        )
+        changes = old.diff(new)
+        self.assertEqual(changes.replaced.tolist(), [1])
+        self.assertEqual(changes.axons.tolist(), [1, 2])
+        self.assertEqual(changes.stake.tolist(), [0])
+        self.assertEqual(changes.validator_permit.tolist(), [])
+        self.assertEqual(changes.added.tolist(), [3])
+        self.assertEqual(changes.changed.tolist(), [0, 1, 2, 3])
+        self.assertTrue(changes.axons_changed)
+
+    def test_replaced_uids_handles_resizes(self):
+        self.assertEqual(
+            replaced_uids(["a", "b", "c"], ["a", "x"]).tolist(), [1]
+        )
+        self.assertEqual(replaced_uids([], ["a"]).tolist(), [])
+
+
+class MetagraphIndexTestCase(unittest.TestCase):
+    def test_lookups(self):
+        index = MetagraphIndex.build(
+            fake_metagraph(
+                ["a", "b", "c"],
+                stake=[1.0, 5.0, 2.0],
+                permits=[False, True, False],
+            )
+        )
+        self.assertEqual(index.uid("b"), 1)
+        self.assertIsNone(index.uid("unknown"))
+        self.assertIn("c", index)
+        self.assertNotIn("unknown", index)
+        self.assertEqual(float(index.stake[index.uid("b")]), 5.0)
+        self.assertTrue(index.validator_permit[index.uid("b")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import unittest
+import urllib.request
+
+import numpy as np
+
+from template.miner.engine import SearchResult
+from template.miner.metrics import MinerMetrics
+from template.utils.metrics import (
+    CONTENT_TYPE,
+    HdrHistogram,
+    LatencySummary,
+    MetricsExporter,
+    MetricsRegistry,
+)
+
+
+class MetricsRegistryTestCase(unittest.TestCase):
+    def test_render(self):
+        registry = MetricsRegistry()
+        requests = registry.counter(
+            "requests_total", "Requests.", ("outcome",)
+        )
+        requests.inc(outcome="found")
+        requests.inc(2, outcome="none")
+        registry.gauge("depth", "Queue depth.").set_function(lambda: 3)
+        latency = registry.histogram(
+            "latency_seconds", "Latency.", buckets=(0.1, 1.0)
+        )
+        latency.observe(0.05)
+        latency.observe(0.5)
+        latency.observe(5.0)
+
+        self.assertEqual(
+            registry.render().splitlines(),
+            [
+                "# HELP requests_total Requests.",
+                "# TYPE requests_total counter",
+                'requests_total{outcome="found"} 1.0',
+                'requests_total{outcome="none"} 2.0',
+                "# HELP depth Queue depth.",
+                "# TYPE depth gauge",
+                "depth 3.0",
+                "# HELP latency_seconds Latency.",
+                "# TYPE latency_seconds histogram",
+                'latency_seconds_bucket{le="0.1"} 1.0',
+                'latency_seconds_bucket{le="1.0"} 2.0',
+                'latency_seconds_bucket{le="+Inf"} 3.0',
+                "latency_seconds_sum 5.55",
+                "latency_seconds_count 3.0",
+            ],
+        )
+
+    def test_labels_are_checked(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("rejects_total", "Rejects.", ("reason",))
+        with self.assertRaises(ValueError):
+            counter.inc()
+        with self.assertRaises(ValueError):
+            counter.inc(reason="a", other="b")
+        with self.assertRaises(ValueError):
+            registry.counter("rejects_total", "Again.")
+
+    def test_exporter(self):
+        registry = MetricsRegistry()
+        registry.counter("hashes_total", "Hashes.").inc(10)
+        exporter = MetricsExporter(registry, port=0)
+        exporter.start()
+        try:
+            url = f"http://127.0.0.1:{exporter.port}/metrics"
+            with urllib.request.urlopen(url, timeout=5) as response:
+                self.assertEqual(
+                    response.headers["Content-Type"], CONTENT_TYPE
+                )
+                self.assertIn("hashes_total 10.0", response.read().decode())
+        finally:
+            exporter.stop()
+
+
+class HdrHistogramTestCase(unittest.TestCase):
+    def test_percentiles_within_relative_error(self):
+        rng = np.random.default_rng(0)
+        values = rng.lognormal(mean=-2.0, sigma=1.5, size=20000)
+        histogram = HdrHistogram(significant_figures=2)
+        for value in values:
+            histogram.record(value)
+
+        self.assertEqual(histogram.count, values.size)
+        self.assertAlmostEqual(histogram.mean, values.mean())
+        for percentile in (50, 90, 99, 99.9):
+            expected = np.percentile(values, percentile, method="higher")
+            self.assertAlmostEqual(
+                histogram.percentile(percentile) / expected, 1.0, delta=0.01
+            )
+        self.assertEqual(histogram.percentile(100), values.max())
+
+    def test_merge_and_summary(self):
+        first, second = HdrHistogram(), HdrHistogram()
+        first.record(0.001)
+        second.record(0.002)
+        second.record(10_000.0)  # Clamped to the largest tracked value.
+        first.merge(second)
+        summary = first.summary()
+        self.assertEqual(summary["count"], 3)
+        self.assertEqual(summary["min"], 0.001)
+        self.assertEqual(summary["max"], 10_000.0)
+        self.assertEqual(HdrHistogram().summary()["p99"], 0.0)
+
+    def test_latency_summary(self):
+        histogram = HdrHistogram()
+        histogram.record(0.5)
+        registry = MetricsRegistry()
+        registry.register(
+            LatencySummary(
+                "stage_seconds",
+                "Stages.",
+                ("stage",),
+                lambda: {("verify",): histogram},
+                quantiles=(0.5,),
+            )
+        )
+        lines = registry.render().splitlines()
+        self.assertIn("# TYPE stage_seconds summary", lines)
+        self.assertIn(
+            'stage_seconds{stage="verify",quantile="0.5"} 0.5', lines
+        )
+        self.assertIn('stage_seconds_count{stage="verify"} 1.0', lines)
+
+
+class MinerMetricsTestCase(unittest.TestCase):
+    def test_observe_search(self):
+        metrics = MinerMetrics(MetricsRegistry())
+        metrics.observe_search(
+            SearchResult(True, 7, "00ab", hashes=400, duration=2.0),
+            range_size=1000,
+            num_workers=4,
+        )
+        metrics.observe_search(
+            SearchResult(
+                False, 3, "0fff", hashes=1000, duration=1.0, expired=True
+            ),
+            range_size=1000,
+            num_workers=4,
+        )
+        self.assertEqual(metrics.hashes.value(), 1400)
+        self.assertEqual(metrics.average_worker_hash_rate.value(), 250)
+        self.assertEqual(metrics.requests.value(outcome="found"), 1)
+        self.assertEqual(metrics.requests.value(outcome="partial"), 1)
+        self.assertEqual(metrics.time_to_solution.count(), 1)
+        self.assertEqual(metrics.nonce_coverage.count(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import asyncio
+import hashlib
+import os
+import signal
+import time
+import pytest
+
+from template.miner.engine import create_engine, search_nonce_range
+from template.utils.pow import (
+    BINARY_FORMAT,
+    MAX_HASH,
+    BlockHeader,
+    double_sha256,
+    target_to_bytes,
+)
+
+BLOCK = "00000020a1b2c3d4"
+# Roughly one in sixteen hashes falls below this target.
+EASY_TARGET = 1 << 252
+
+
+def linear_search(block, target, start, end):
+    for nonce in range(start, end):
+        block_hash = double_sha256(block + str(nonce))
+        if int(block_hash, 16) < target:
+            return nonce, block_hash
+    return None, None
+
+
+@pytest.mark.parametrize("engine_name", ["inline", "process"])
+def test_engine_finds_valid_nonce(engine_name):
+    engine = create_engine(engine_name, num_workers=2, chunk_size=8)
+    try:
+        result = asyncio.run(engine.search(BLOCK, EASY_TARGET, 0, 512))
+    finally:
+        engine.shutdown()
+
+    assert result.found
+    assert 0 <= result.nonce < 512
+    assert result.block_hash == double_sha256(BLOCK + str(result.nonce))
+    assert int(result.block_hash, 16) < EASY_TARGET
+
+
+@pytest.mark.parametrize("engine_name", ["inline", "process"])
+def test_engine_exhausts_range_without_winner(engine_name):
+    engine = create_engine(engine_name, num_workers=2, chunk_size=7)
+    try:
+        result = asyncio.run(engine.search(BLOCK, 0, 10, 110))
+    finally:
+        engine.shutdown()
+
+    assert not result.found
+    assert not result.expired
+    assert result.hashes == 100
+    # Without a winner the lowest hash of the range is reported.
+    assert result.block_hash == min(
+        double_sha256(BLOCK + str(nonce)) for nonce in range(10, 110)
+    )
+
+
+def test_search_nonce_range_matches_linear_scan():
+    found, nonce, block_hash, hashes = search_nonce_range(
+        BLOCK, EASY_TARGET, 0, 512
+    )
+    assert found
+    assert (nonce, block_hash) == linear_search(BLOCK, EASY_TARGET, 0, 512)
+    assert hashes == nonce + 1
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        create_engine("gpu")
+
+
+def test_string_header_matches_double_sha256():
+    header = BlockHeader(BLOCK, EASY_TARGET)
+    for nonce in (0, 7, 123456):
+        assert header.hash_hex(nonce) == double_sha256(BLOCK + str(nonce))
+
+
+def test_binary_header_appends_packed_nonce():
+    header = BlockHeader(BLOCK, EASY_TARGET, BINARY_FORMAT)
+    expected = hashlib.sha256(
+        hashlib.sha256(
+            bytes.fromhex(BLOCK) + (5).to_bytes(4, "little")
+        ).digest()
+    ).hexdigest()
+    assert header.hash_hex(5) == expected
+
+    with pytest.raises(ValueError):
+        header.check_nonce_range(0, 1 << 33)
+    with pytest.raises(ValueError):
+        BlockHeader("not hex", EASY_TARGET, BINARY_FORMAT)
+
+
+@pytest.mark.parametrize("target", [0, 1, EASY_TARGET, MAX_HASH, MAX_HASH + 1])
+def test_target_bytes_compare_like_integers(target):
+    target_bytes = target_to_bytes(target)
+    for digest in (bytes(32), (1).to_bytes(32, "big"), b"\xff" * 32):
+        assert (digest < target_bytes) == (
+            int.from_bytes(digest, "big") < target
+        )
+
+
+def test_binary_search_finds_valid_nonce():
+    _, nonce, block_hash, _ = search_nonce_range(
+        BLOCK, EASY_TARGET, 0, 512, BINARY_FORMAT
+    )
+    header = BlockHeader(BLOCK, EASY_TARGET, BINARY_FORMAT)
+    assert block_hash == header.hash_hex(nonce)
+    assert int(block_hash, 16) < EASY_TARGET
+
+
+@pytest.mark.parametrize("engine_name", ["inline", "process"])
+def test_engine_stops_at_deadline(engine_name):
+    engine = create_engine(engine_name, num_workers=2, chunk_size=1 << 20)
+    engine.start()
+    try:
+        started = time.time()
+        result = asyncio.run(
+            engine.search(BLOCK, 0, 0, 1 << 30, deadline=started + 0.2)
+        )
+    finally:
+        engine.shutdown()
+
+    assert result.expired
+    assert not result.found
+    assert time.time() - started < 2
+    assert result.block_hash == double_sha256(BLOCK + str(result.nonce))
+
+
+def test_search_nonce_range_past_deadline_hashes_nothing():
+    result = search_nonce_range(BLOCK, 0, 0, 100, deadline=time.time() - 1)
+    assert result == (False, None, None, 0)
+
+
+def test_process_engine_recovers_from_dead_worker():
+    engine = create_engine("process", num_workers=2, chunk_size=8)
+
+    async def search_twice():
+        await engine.search(BLOCK, EASY_TARGET, 0, 512)
+        for pid in list(engine.executor._processes):
+            os.kill(pid, signal.SIGKILL)
+        return await engine.search(BLOCK, EASY_TARGET, 0, 512)
+
+    try:
+        result = asyncio.run(search_twice())
+    finally:
+        engine.shutdown()
+
+    assert result.found
+    assert result.block_hash == double_sha256(BLOCK + str(result.nonce))
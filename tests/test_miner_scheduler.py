@@ -0,0 +1,64 @@
+import asyncio
+import pytest
+
+from template.miner.scheduler import JobScheduler, QueueFullError
+
+
+def test_waiting_jobs_run_by_priority():
+    async def run():
+        scheduler = JobScheduler(max_concurrent_jobs=1, max_queue_size=8)
+        order = []
+        release = asyncio.Event()
+
+        async def job(name, priority):
+            async with scheduler.slot(priority):
+                order.append(name)
+                await release.wait()
+
+        first = asyncio.ensure_future(job("first", 0))
+        await asyncio.sleep(0)
+        others = [
+            asyncio.ensure_future(job(name, priority))
+            for name, priority in (("low", 1), ("high", 10), ("mid", 5))
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.queue_depth == 3
+        release.set()
+        await asyncio.gather(first, *others)
+        return order, scheduler.metrics()
+
+    order, metrics = asyncio.run(run())
+    assert order == ["first", "high", "mid", "low"]
+    assert metrics["completed"] == 4
+    assert metrics["queue_depth"] == 0
+    assert metrics["active_jobs"] == 0
+
+
+def test_overflow_is_rejected_and_timeouts_free_the_queue():
+    async def run():
+        scheduler = JobScheduler(max_concurrent_jobs=1, max_queue_size=1)
+        release = asyncio.Event()
+
+        async def job(timeout=None):
+            async with scheduler.slot(timeout=timeout):
+                await release.wait()
+
+        running = asyncio.ensure_future(job())
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.TimeoutError):
+            await job(timeout=0.01)
+        assert not scheduler.is_full()
+
+        queued = asyncio.ensure_future(job())
+        await asyncio.sleep(0)
+        assert scheduler.is_full()
+        with pytest.raises(QueueFullError):
+            await job()
+        release.set()
+        await asyncio.gather(running, queued)
+        return scheduler.metrics()
+
+    metrics = asyncio.run(run())
+    assert metrics["rejected"] == 1
+    assert metrics["timed_out"] == 1
+    assert metrics["completed"] == 2
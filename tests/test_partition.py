@@ -0,0 +1,60 @@
+import unittest
+
+from template.validator.partition import HashrateTracker, partition_nonce_range
+
+
+class PartitionNonceRangeTestCase(unittest.TestCase):
+    def assert_covers(self, assignments, start, end):
+        self.assertEqual(assignments[0][1], start)
+        self.assertEqual(assignments[-1][2], end)
+        for (_, _, last), (_, first, _) in zip(assignments, assignments[1:]):
+            self.assertEqual(first, last + 1)
+
+    def test_even_split_without_hashrates(self):
+        assignments = partition_nonce_range(0, 999, [1, 2, 3, 4])
+        self.assert_covers(assignments, 0, 999)
+        self.assertEqual(
+            [last - first + 1 for _, first, last in assignments],
+            [250] * 4,
+        )
+
+    def test_split_follows_hashrate(self):
+        assignments = partition_nonce_range(
+            10, 10009, [1, 2], hashrates=[3.0, 1.0], min_share=0.0
+        )
+        self.assert_covers(assignments, 10, 10009)
+        sizes = {uid: last - first + 1 for uid, first, last in assignments}
+        self.assertEqual(sizes, {1: 7500, 2: 2500})
+
+    def test_slow_miner_keeps_minimum_share(self):
+        assignments = partition_nonce_range(
+            0, 9999, [1, 2], hashrates=[1e9, 0.0], min_share=0.2
+        )
+        sizes = {uid: last - first + 1 for uid, first, last in assignments}
+        self.assertEqual(sizes[2], 1000)
+        self.assertEqual(sum(sizes.values()), 10000)
+
+    def test_empty(self):
+        self.assertEqual(partition_nonce_range(0, 100, []), [])
+
+
+class HashrateTrackerTestCase(unittest.TestCase):
+    def test_estimates_default_to_median(self):
+        tracker = HashrateTracker(alpha=0.5)
+        tracker.observe(1, 100, 1.0)
+        tracker.observe(1, 300, 1.0)
+        tracker.observe(2, 400, 2.0)
+        self.assertEqual(list(tracker.estimates([1, 2, 3])), [200, 200, 200])
+
+    def test_dead_after_consecutive_failures(self):
+        tracker = HashrateTracker(max_failures=2)
+        tracker.observe_failure(1)
+        self.assertFalse(tracker.is_dead(1))
+        tracker.observe_failure(1)
+        self.assertTrue(tracker.is_dead(1))
+        tracker.observe(1, 10, 1.0)
+        self.assertFalse(tracker.is_dead(1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+from template.miner.rate_limit import RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class RateLimiterTestCase(unittest.TestCase):
+    def test_burst_then_refill(self):
+        clock = FakeClock()
+        limiter = RateLimiter(rate=2.0, burst=3.0, clock=clock)
+        for _ in range(3):
+            self.assertEqual(limiter.acquire("a"), (True, 0.0))
+        admitted, retry_after = limiter.acquire("a")
+        self.assertFalse(admitted)
+        self.assertAlmostEqual(retry_after, 0.5)
+
+        # Other callers have their own bucket.
+        self.assertTrue(limiter.acquire("b")[0])
+
+        clock.now = 0.5
+        self.assertTrue(limiter.acquire("a")[0])
+        self.assertFalse(limiter.acquire("a")[0])
+        self.assertEqual(
+            limiter.metrics(),
+            {"admitted": 5, "rejected": 2, "tracked_hotkeys": 2},
+        )
+
+    def test_stake_scales_capacity(self):
+        limiter = RateLimiter(
+            rate=1.0, burst=2.0, max_stake_multiplier=5.0, clock=FakeClock()
+        )
+        admitted = sum(
+            limiter.acquire("whale", stake=100.0, max_stake=100.0)[0]
+            for _ in range(20)
+        )
+        self.assertEqual(admitted, 10)
+        admitted = sum(
+            limiter.acquire("minnow", stake=0.0, max_stake=100.0)[0]
+            for _ in range(20)
+        )
+        self.assertEqual(admitted, 2)
+
+    def test_disabled_and_bounded(self):
+        self.assertEqual(RateLimiter(rate=0).acquire("a"), (True, 0.0))
+        limiter = RateLimiter(max_buckets=2, clock=FakeClock())
+        for hotkey in "abc":
+            limiter.acquire(hotkey)
+        self.assertEqual(limiter.metrics()["tracked_hotkeys"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+import numpy as np
+
+from template.base.utils.scores import ScoreStore
+
+
+def reference_update(
+    scores: np.ndarray, uids: np.ndarray, rewards: np.ndarray, alpha: float
+) -> np.ndarray:
+    """The dense update the store has to match."""
+    scattered = np.zeros_like(scores)
+    scattered[uids] = rewards
+    return alpha * scattered + (1 - alpha) * scores
+
+
+class ScoreStoreTestCase(unittest.TestCase):
+    def test_matches_dense_moving_average(self):
+        rng = np.random.default_rng(0)
+        alpha = 0.1
+        store = ScoreStore(256, alpha=alpha)
+        expected = np.zeros(256, dtype=np.float32)
+        for step in range(500):
+            uids = rng.choice(256, size=16, replace=False)
+            rewards = rng.random(16).astype(np.float32)
+            store.update(uids, rewards)
+            expected = reference_update(expected, uids, rewards, alpha)
+            if step % 50 == 0:
+                np.testing.assert_allclose(
+                    store.scores(), expected, rtol=1e-4, atol=1e-7
+                )
+        np.testing.assert_allclose(
+            store.scores(), expected, rtol=1e-4, atol=1e-7
+        )
+
+    def test_scores_are_cached_and_read_only(self):
+        store = ScoreStore(4, alpha=0.5)
+        store.update([1], [1.0])
+        scores = store.scores()
+        self.assertIs(store.scores(), scores)
+        self.assertFalse(scores.flags.writeable)
+
+        store.update([2], [1.0])
+        self.assertIsNot(store.scores(), scores)
+        np.testing.assert_allclose(scores, [0, 0.5, 0, 0])
+        np.testing.assert_allclose(store.scores(), [0, 0.25, 0.5, 0])
+
+    def test_reset_resize_and_load(self):
+        store = ScoreStore(3, alpha=0.5)
+        store.update([0, 1, 2], [1.0, 1.0, 1.0])
+        store.reset([1])
+        store.update([2], [0.0])
+        np.testing.assert_allclose(store.scores(), [0.25, 0, 0.25])
+
+        store.resize(5)
+        store.update([4], [1.0])
+        np.testing.assert_allclose(store.scores(), [0.125, 0, 0.125, 0, 0.5])
+
+        store.load(np.ones(2))
+        store.update([0], [0.0])
+        np.testing.assert_allclose(store.scores(), [0.5, 0.5])
+
+
+if __name__ == "__main__":
+    unittest.main()
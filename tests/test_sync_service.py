@@ -0,0 +1,99 @@
+import threading
+import time
+import types
+import unittest
+
+from template.base.sync import SyncService
+
+
+class FakeNeuron:
+    def __init__(self, registered=True):
+        self.registered = registered
+        self.metagraph = "initial"
+        self.applied = []
+        self.weights_set = threading.Event()
+        self.snapshots = []
+        # Cleared to hold up setting weights.
+        self.release = threading.Event()
+        self.release.set()
+        self.should_exit = False
+        self.block = 100
+
+    def connect_subtensor(self):
+        return types.SimpleNamespace(get_current_block=lambda: 100)
+
+    def check_registered(self, subtensor=None):
+        if not self.registered:
+            exit()
+
+    def should_sync_metagraph(self, block=None):
+        return True
+
+    def should_set_weights(self, block=None):
+        return True
+
+    def fetch_metagraph(self, subtensor):
+        time.sleep(0.05)  # A slow RPC.
+        return f"metagraph@{subtensor.get_current_block()}"
+
+    def weights_snapshot(self):
+        return self.metagraph
+
+    def apply_metagraph(self, metagraph):
+        self.metagraph = metagraph
+        self.applied.append(metagraph)
+
+    def set_weights(self, subtensor=None, snapshot=None):
+        self.release.wait(2)
+        self.snapshots.append(snapshot)
+        self.weights_set.set()
+
+
+class SyncServiceTestCase(unittest.TestCase):
+    def test_poll_applies_fetched_metagraph(self):
+        neuron = FakeNeuron()
+        service = SyncService(neuron, interval=0.01)
+        self.assertFalse(service.poll())
+
+        service.start()
+        try:
+            deadline = time.time() + 2
+            while not service.poll() and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertTrue(neuron.weights_set.wait(2))
+        finally:
+            service.stop()
+        self.assertEqual(neuron.metagraph, "metagraph@100")
+        self.assertEqual(neuron.applied[0], "metagraph@100")
+
+    def test_weights_wait_for_a_metagraph_fetched_after_them(self):
+        neuron = FakeNeuron()
+        service = SyncService(neuron, subtensor=neuron.connect_subtensor())
+        neuron.release.clear()
+        service.step()
+        self.assertTrue(service.poll())
+        neuron.metagraph = "changed after the snapshot"
+
+        # Fetched while the weights are being set, it doesn't show them.
+        service.step()
+        neuron.release.set()
+        service._weights_thread.join(2)
+        self.assertTrue(service.poll())
+        self.assertEqual(neuron.snapshots, ["metagraph@100"])
+
+        service.step()
+        self.assertTrue(service.poll())
+        service._weights_thread.join(2)
+        self.assertEqual(len(neuron.snapshots), 2)
+
+    def test_deregistered_neuron_exits(self):
+        neuron = FakeNeuron(registered=False)
+        service = SyncService(neuron, interval=0.01)
+        service.start()
+        service._thread.join(2)
+        self.assertTrue(neuron.should_exit)
+        self.assertFalse(service.is_running)
+
+
+if __name__ == "__main__":
+    unittest.main()
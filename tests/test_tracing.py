@@ -0,0 +1,73 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+
+from template.utils.metrics import MetricsRegistry
+from template.validator.tracing import MinerCall, RoundTracer
+
+
+class RoundTracerTestCase(unittest.TestCase):
+    def test_round(self):
+        tracer = RoundTracer()
+        trace = tracer.start_round("request")
+        with tracer.span("dispatch", trace):
+            tracer.record_call(trace, MinerCall(1, 0.5, "200", 100, 300))
+            tracer.record_call(trace, MinerCall(2, 1.5, "408", 100, 0))
+            tracer.record_call(trace, MinerCall(1, 0.25, "200", 100, 300))
+        with tracer.span("submit", trace):
+            pass
+        summary = tracer.finish_round(trace)
+
+        self.assertIn("Round request: 3 calls", summary)
+        self.assertIn("sent 300B received 600B", summary)
+        self.assertEqual(list(trace.stages), ["dispatch", "submit"])
+        self.assertEqual(tracer.rounds, 1)
+        self.assertEqual(tracer.statuses, {"200": 2, "408": 1})
+        self.assertEqual(tracer.miners[1].count, 2)
+        self.assertEqual(tracer.dendrite.max, 1.5)
+        self.assertEqual(set(tracer.stages), {"dispatch", "submit", "round"})
+
+    def test_sampling(self):
+        trace = RoundTracer().start_round()
+        self.assertFalse(any(trace.is_sampled(uid) for uid in range(100)))
+
+        trace = RoundTracer(
+            sample_rate=0.5, rng=random.Random(0)
+        ).start_round()
+        sampled = [trace.is_sampled(uid) for uid in range(1000)]
+        self.assertTrue(400 < sum(sampled) < 600)
+        # Decided once per uid and round.
+        self.assertEqual(
+            sampled, [trace.is_sampled(uid) for uid in range(1000)]
+        )
+
+    def test_dump_and_register(self):
+        tracer = RoundTracer()
+        registry = MetricsRegistry()
+        tracer.register(registry)
+        trace = tracer.start_round()
+        tracer.record_call(trace, MinerCall(3, 0.1, "200", 10, 20))
+        tracer.finish_round(trace)
+
+        text = registry.render()
+        self.assertIn(
+            'validator_miner_dendrite_seconds_count{uid="3"} 1.0', text
+        )
+        self.assertIn(
+            'validator_dendrite_responses_total{status="200"} 1.0', text
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "traces.json")
+            tracer.dump(path)
+            with open(path) as f:
+                snapshot = json.load(f)
+        self.assertEqual(snapshot["rounds"], 1)
+        self.assertEqual(snapshot["miners"]["3"]["count"], 1)
+        self.assertEqual(snapshot["bytes_received"], 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import threading
+import unittest
+
+from template.utils.misc import TTLCache, ttl_cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TTLCacheTestCase(unittest.TestCase):
+    def test_per_entry_expiry(self):
+        clock = FakeClock()
+        cache = TTLCache(ttl=10, clock=clock)
+        cache.set("a", 1)
+        clock.now = 5
+        cache.set("b", 2)
+        clock.now = 12
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), 2)
+        self.assertEqual(
+            cache.stats(),
+            {
+                "hits": 1,
+                "misses": 1,
+                "evictions": 0,
+                "expirations": 1,
+                "size": 1,
+            },
+        )
+
+    def test_lru_eviction_and_invalidation(self):
+        cache = TTLCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.get("a"), cache.get("c")), (1, 3))
+        self.assertEqual(cache.evictions, 1)
+        cache.invalidate("a")
+        self.assertIsNone(cache.get("a"))
+        cache.invalidate()
+        self.assertEqual(len(cache), 0)
+
+    def test_decorator_is_thread_safe(self):
+        calls = []
+
+        @ttl_cache(maxsize=8, ttl=60)
+        def square(x):
+            calls.append(x)
+            return x * x
+
+        def work():
+            for x in range(8):
+                self.assertEqual(square(x), x * x)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(square.cache.stats()["size"], 8)
+        self.assertGreaterEqual(square.cache.hits, 64 - len(calls))
+
+    def test_decorator_keys(self):
+        @ttl_cache(typed=True)
+        def add(x, y=0, z=0):
+            return x + y + z
+
+        add(1, y=2, z=3)
+        add(1, z=3, y=2)
+        self.assertEqual(add.cache.stats()["size"], 1)
+        add(1.0, y=2, z=3)
+        self.assertEqual(add.cache.stats()["size"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
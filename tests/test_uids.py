@@ -0,0 +1,81 @@
+import types
+import unittest
+
+import bittensor as bt
+import numpy as np
+
+from template.utils.uids import check_uid_availability, get_random_uids
+
+
+def fake_neuron(n=8, limit=1024):
+    axons = [
+        bt.AxonInfo(
+            version=1,
+            # Every third uid is not serving.
+            ip="0.0.0.0" if uid % 3 == 2 else "1.2.3.4",
+            port=8091,
+            ip_type=4,
+            hotkey=f"hk{uid}",
+            coldkey="cold",
+        )
+        for uid in range(n)
+    ]
+    stake = np.ones(n, dtype=np.float32)
+    permit = np.zeros(n, dtype=bool)
+    # A validator above the permit limit is not queried.
+    stake[0], permit[0] = 2 * limit, True
+    metagraph = types.SimpleNamespace(
+        n=np.array(n),
+        hotkeys=[axon.hotkey for axon in axons],
+        axons=axons,
+        S=stake,
+        validator_permit=permit,
+    )
+    config = types.SimpleNamespace(
+        neuron=types.SimpleNamespace(vpermit_tao_limit=limit)
+    )
+    return types.SimpleNamespace(metagraph=metagraph, config=config)
+
+
+class GetRandomUidsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.neuron = fake_neuron()
+        self.available = {
+            uid
+            for uid in range(8)
+            if check_uid_availability(self.neuron.metagraph, uid, 1024)
+        }
+
+    def test_samples_available_uids(self):
+        rng = np.random.default_rng(0)
+        for k in range(1, 8):
+            uids = get_random_uids(self.neuron, k, rng=rng)
+            self.assertEqual(len(uids), min(k, len(self.available)))
+            self.assertEqual(len(set(uids.tolist())), len(uids))
+            self.assertTrue(set(uids.tolist()) <= self.available)
+
+    def test_exclude_falls_back_to_excluded_uids(self):
+        rng = np.random.default_rng(0)
+        uids = get_random_uids(self.neuron, 2, exclude=[1, 3, 4], rng=rng)
+        self.assertEqual(set(uids.tolist()), {6, 7})
+        uids = get_random_uids(self.neuron, 4, exclude=[1, 3, 4], rng=rng)
+        self.assertTrue({6, 7} <= set(uids.tolist()))
+        self.assertEqual(len(uids), 4)
+
+    def test_weights_bias_sampling(self):
+        rng = np.random.default_rng(0)
+        weights = np.zeros(8)
+        weights[7] = 1.0
+        picks = [
+            get_random_uids(self.neuron, 1, weights=weights, rng=rng)[0]
+            for _ in range(50)
+        ]
+        self.assertGreater(picks.count(7), 45)
+
+    def test_nothing_available(self):
+        neuron = fake_neuron(n=1)
+        self.assertEqual(len(get_random_uids(neuron, 3)), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
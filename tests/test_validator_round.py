@@ -0,0 +1,408 @@
+import asyncio
+import tempfile
+import types
+import unittest
+
+import numpy as np
+from aiohttp import web
+
+from neurons.validator import Validator
+from template.utils.http import HttpClient
+from template.utils.pow import (
+    BINARY_FORMAT,
+    STRING_FORMAT,
+    BlockHeader,
+    expand_target,
+)
+from template.validator.partition import HashrateTracker
+from template.validator.tracing import RoundTracer
+from template.validator.verify import ProofVerifier
+
+BLOCK = "00" * 76
+# Easy enough that a winning nonce turns up within a few hundred hashes.
+TARGET = "1800ffff"
+
+
+def make_work_data(request_id="request-1", end=999):
+    return {
+        "request_id": request_id,
+        "block": BLOCK,
+        "target": TARGET,
+        "nonce_range_start": 0,
+        "nonce_range_end": end,
+    }
+
+
+def find_nonce(header, start, end, wins=True):
+    """Returns the first nonce in [start, end] whose hash does (or doesn't) meet the target."""
+    for nonce in range(start, end + 1):
+        if header.meets_target(header.digest(nonce)) == wins:
+            return nonce
+    raise AssertionError("no such nonce in range")
+
+
+def solver(header_format=STRING_FORMAT, wins=True, partial=False):
+    """Returns a miner answering with the first (non) winning nonce of its range."""
+    header = BlockHeader(BLOCK, expand_target(TARGET), header_format)
+
+    def solve(work_data):
+        assert work_data["header_format"] == header_format
+        nonce = find_nonce(
+            header,
+            work_data["nonce_range_start"],
+            work_data["nonce_range_end"],
+            wins,
+        )
+        response = {"block_hash": header.hash_hex(nonce), "nonce": nonce}
+        if partial:
+            response["partial"] = True
+        return response
+
+    return solve
+
+
+def empty(work_data):
+    return None
+
+
+class FakeDendrite:
+    """
+    Answers every query with `behaviours[uid](work_data)`, the miner
+    response, reporting a search of the whole assigned range. Miners listed
+    in `statuses` answer with that status code and no response instead,
+    miners listed in `delays` take that many seconds to answer.
+    """
+
+    def __init__(self, behaviours, statuses=None, delays=None):
+        self.behaviours = behaviours
+        self.statuses = statuses or {}
+        self.delays = delays or {}
+        self.queried = []
+        self.answered = []
+        self.cancelled = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, axons, synapse, deserialize, timeout):
+        uid = axons[0].uid
+        self.queried.append(uid)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays.get(uid, 0.0))
+        except asyncio.CancelledError:
+            self.cancelled.append(uid)
+            raise
+        finally:
+            self.in_flight -= 1
+        response = synapse.model_copy()
+        response.dendrite.status_code = self.statuses.get(uid, 200)
+        if response.is_success:
+            work_data = synapse.work_data
+            response.miner_response = self.behaviours[uid](work_data)
+            response.hashes = (
+                work_data["nonce_range_end"]
+                - work_data["nonce_range_start"]
+                + 1
+            )
+        self.answered.append(uid)
+        return [response]
+
+
+def make_validator(dendrite, num_miners, header_format=STRING_FORMAT):
+    validator = Validator.__new__(Validator)
+    validator.config = types.SimpleNamespace(
+        neuron=types.SimpleNamespace(
+            header_format=header_format,
+            max_concurrent_queries=4,
+            min_nonce_share=0.1,
+            early_win=False,
+            trace_dump_interval=0,
+            work_poll_interval=0.01,
+            full_path=tempfile.gettempdir(),
+        )
+    )
+    validator.metagraph = types.SimpleNamespace(
+        axons=[types.SimpleNamespace(uid=uid) for uid in range(num_miners)]
+    )
+    validator.metagraph_index = types.SimpleNamespace(
+        serving=np.ones(num_miners, dtype=bool)
+    )
+    validator.wallet = types.SimpleNamespace(
+        hotkey=types.SimpleNamespace(ss58_address="validator-hotkey")
+    )
+    validator.dendrite = dendrite
+    validator.submit_work_url = "http://localhost/submit_work"
+    validator.hashrates = HashrateTracker()
+    validator.verifier = ProofVerifier(max_workers=2)
+    validator.tracer = RoundTracer()
+    validator.rewards = {}
+    validator.update_scores = lambda rewards, uids: validator.rewards.update(
+        zip(uids, rewards.tolist())
+    )
+    validator.submitted = []
+
+    async def submit(best_response):
+        # What the miners had answered by the time of the submission.
+        validator.submitted.append((best_response, list(dendrite.answered)))
+        return True
+
+    validator._submit_work = submit
+    validator.should_exit = False
+    validator.apply_background_sync = lambda: None
+    validator.save_state = lambda: None
+    return validator
+
+
+class ValidatorRoundTestCase(unittest.TestCase):
+    def run_round(self, validator, work_data=None):
+        try:
+            return asyncio.run(
+                validator.run_round(work_data or make_work_data())
+            )
+        finally:
+            validator.verifier.shutdown()
+
+    def test_round(self):
+        dendrite = FakeDendrite(
+            {0: solver(), 1: solver(), 2: empty}, statuses={1: 408}
+        )
+        validator = make_validator(dendrite, 3)
+        self.run_round(validator)
+
+        self.assertEqual(sorted(dendrite.queried), [0, 1, 2])
+        # Only the solution is scored, the timeout and the empty answer
+        # only feed the hashrate tracker.
+        self.assertEqual(validator.rewards, {0: 1.0})
+        self.assertEqual(validator.hashrates.failures, {1: 1})
+        self.assertEqual(sorted(validator.hashrates.hashrates), [0, 2])
+        [(best_response, _)] = validator.submitted
+        self.assertEqual(best_response["uid"], 0)
+        self.assertEqual(validator.tracer.statuses, {"200": 2, "408": 1})
+
+    def test_binary_round(self):
+        solve = solver(BINARY_FORMAT)
+        validator = make_validator(
+            FakeDendrite({0: solve, 1: solve}), 2, BINARY_FORMAT
+        )
+        self.run_round(validator)
+
+        self.assertEqual(validator.rewards, {0: 1.0, 1: 1.0})
+        self.assertEqual(len(validator.submitted), 1)
+
+    def test_concurrent_queries_are_bounded(self):
+        dendrite = FakeDendrite(
+            {uid: empty for uid in range(10)},
+            delays={uid: 0.02 for uid in range(10)},
+        )
+        validator = make_validator(dendrite, 10)
+        self.run_round(validator)
+
+        self.assertEqual(sorted(dendrite.answered), list(range(10)))
+        self.assertEqual(dendrite.max_in_flight, 4)
+
+    def test_early_win_does_not_wait_for_the_round(self):
+        dendrite = FakeDendrite(
+            {0: solver(), 1: solver(), 2: empty}, delays={1: 0.2, 2: 0.2}
+        )
+        validator = make_validator(dendrite, 3)
+        validator.config.neuron.early_win = True
+        self.run_round(validator)
+
+        [(best_response, answered)] = validator.submitted
+        self.assertEqual(best_response["uid"], 0)
+        self.assertEqual(answered, [0])
+        # The slower miners are still scored.
+        self.assertEqual(validator.rewards, {0: 1.0, 1: 1.0})
+
+    def test_abandoned_queries_are_cancelled(self):
+        dendrite = FakeDendrite(
+            {0: solver(), 1: empty, 2: empty}, delays={1: 5, 2: 5}
+        )
+        validator = make_validator(dendrite, 3)
+
+        async def first_response():
+            responses = validator.iter_miner_responses(make_work_data())
+            try:
+                return await responses.__anext__()
+            finally:
+                await responses.aclose()
+                # Let the cancelled queries run to their end.
+                await asyncio.sleep(0)
+
+        response = asyncio.run(first_response())
+
+        self.assertEqual(response["uid"], 0)
+        self.assertEqual(sorted(dendrite.cancelled), [1, 2])
+
+    def test_above_target_response_is_not_submitted(self):
+        validator = make_validator(FakeDendrite({0: solver(wins=False)}), 1)
+        self.run_round(validator)
+
+        self.assertEqual(validator.rewards, {0: 0.0})
+        self.assertEqual(validator.submitted, [])
+
+    def test_partial_response_is_not_submitted(self):
+        validator = make_validator(
+            FakeDendrite({0: solver(wins=False, partial=True)}), 1
+        )
+        self.run_round(validator)
+
+        self.assertEqual(validator.rewards, {0: 0.0})
+        self.assertEqual(validator.submitted, [])
+        self.assertIn(0, validator.hashrates.hashrates)
+        self.assertEqual(validator.verifier.rejected, 0)
+
+    def test_only_unreachable_miners_fail(self):
+        validator = make_validator(
+            FakeDendrite({0: empty, 1: empty}, statuses={1: 408}), 2
+        )
+
+        async def run_rounds():
+            for _ in range(validator.hashrates.max_failures):
+                await validator.run_round(make_work_data())
+
+        try:
+            asyncio.run(run_rounds())
+        finally:
+            validator.verifier.shutdown()
+
+        # An empty answer is a search that found nothing, not a failure.
+        self.assertFalse(validator.hashrates.is_dead(0))
+        self.assertIn(0, validator.hashrates.hashrates)
+        self.assertTrue(validator.hashrates.is_dead(1))
+        self.assertEqual(validator.get_serving_miner_uids(), [0])
+        self.assertEqual(validator.submitted, [])
+
+
+class WorkEndpoint:
+    """A local get/submit work endpoint handing out `work_items` in order."""
+
+    def __init__(self, work_items):
+        self.work_items = list(work_items)
+        self.submissions = []
+        self.peers = set()
+        app = web.Application()
+        app.router.add_get("/get_work", self.get_work)
+        app.router.add_post("/submit_work", self.submit_work)
+        self.runner = web.AppRunner(app)
+
+    async def start(self):
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    async def get_work(self, request):
+        self.peers.add(request.transport.get_extra_info("peername"))
+        if not self.work_items:
+            return web.Response(status=204)
+        return web.json_response(self.work_items.pop(0))
+
+    async def submit_work(self, request):
+        self.peers.add(request.transport.get_extra_info("peername"))
+        self.submissions.append(await request.json())
+        return web.json_response({"accepted": True})
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+class ValidatorEndpointTestCase(unittest.TestCase):
+    def test_forward_over_pooled_client(self):
+        dendrite = FakeDendrite({0: solver(), 1: empty}, statuses={1: 408})
+        validator = make_validator(dendrite, 2)
+        del validator._submit_work
+        validator.http = HttpClient(pool_size=2, timeout=5)
+        endpoint = WorkEndpoint(
+            [make_work_data("request-1"), make_work_data("request-2")]
+        )
+
+        async def run():
+            url = await endpoint.start()
+            validator.get_work_url = f"{url}/get_work"
+            validator.submit_work_url = f"{url}/submit_work"
+            try:
+                await validator.forward()
+                session = validator.http.session
+                await validator.forward()
+                # Both rounds went through the same session.
+                self.assertIs(validator.http.session, session)
+                await validator.http.close()
+                self.assertTrue(session.closed)
+            finally:
+                validator.verifier.shutdown()
+                await endpoint.stop()
+
+        asyncio.run(run())
+
+        self.assertEqual(len(endpoint.submissions), 2)
+        self.assertTrue(all(s["uid"] == 0 for s in endpoint.submissions))
+        # Keep-alive: the four requests shared one connection.
+        self.assertEqual(len(endpoint.peers), 1)
+        self.assertEqual(validator.rewards, {0: 1.0})
+
+
+class ValidatorPipelineTestCase(unittest.TestCase):
+    def make_validator(self, work_items, rounds=1):
+        dendrite = FakeDendrite({0: solver()})
+        validator = make_validator(dendrite, 1)
+        work_items = iter(work_items)
+
+        async def query_endpoint():
+            item = next(work_items, None)
+            if isinstance(item, Exception):
+                raise item
+            return item
+
+        validator.query_endpoint = query_endpoint
+        validator.rounds = 0
+
+        def stop_after_rounds():
+            validator.rounds += 1
+            validator.should_exit = validator.rounds >= rounds
+
+        validator.apply_background_sync = stop_after_rounds
+        return validator
+
+    def run_pipeline(self, validator):
+        try:
+            asyncio.run(asyncio.wait_for(validator.run_pipeline(), 5))
+        finally:
+            validator.verifier.shutdown()
+
+    def test_rounds_run_back_to_back(self):
+        items = [make_work_data(f"request-{i}") for i in range(3)]
+        # The endpoint handing out the same item again is skipped.
+        validator = self.make_validator(
+            [items[0], items[0], items[1], items[2]], rounds=3
+        )
+        self.run_pipeline(validator)
+
+        self.assertEqual(validator.rounds, 3)
+        self.assertEqual(len(validator.submitted), 3)
+        self.assertEqual(validator.tracer.rounds, 3)
+
+    def test_bad_work_item_does_not_stop_the_pipeline(self):
+        validator = self.make_validator(
+            [KeyError("block"), ["not", "a", "dict"], make_work_data()]
+        )
+        self.run_pipeline(validator)
+
+        [(best_response, _)] = validator.submitted
+        self.assertEqual(best_response["uid"], 0)
+
+    def test_stopped_producer_is_raised(self):
+        validator = self.make_validator([])
+
+        async def prefetch_work(queue):
+            raise RuntimeError("producer died")
+
+        validator.prefetch_work = prefetch_work
+        with self.assertRaisesRegex(RuntimeError, "producer died"):
+            self.run_pipeline(validator)
+
+
+if __name__ == "__main__":
+    unittest.main()
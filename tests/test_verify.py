@@ -0,0 +1,58 @@
+import asyncio
+import unittest
+
+from template.utils.pow import BINARY_FORMAT, BlockHeader, MAX_HASH
+from template.validator.verify import ProofVerifier, check_response
+
+
+class ProofVerifierTestCase(unittest.TestCase):
+    block = "00" * 76
+    target = MAX_HASH
+
+    def response(self, uid, nonce, block_hash=None):
+        header = BlockHeader(self.block, self.target, BINARY_FORMAT)
+        return {
+            "uid": uid,
+            "nonce": nonce,
+            "block_hash": block_hash or header.hash_hex(nonce),
+        }
+
+    def test_check_response(self):
+        header = BlockHeader(self.block, self.target, BINARY_FORMAT)
+        self.assertIsNone(check_response(header, self.response(0, 5), (0, 9)))
+        self.assertIn(
+            "outside", check_response(header, self.response(0, 10), (0, 9))
+        )
+        forged = self.response(0, 5, block_hash="00" * 32)
+        self.assertIn("does not match", check_response(header, forged))
+        self.assertEqual(
+            check_response(header, {"nonce": "x", "block_hash": "00"}),
+            "malformed response",
+        )
+
+    def test_check_response_target(self):
+        header = BlockHeader(self.block, 0, BINARY_FORMAT)
+        self.assertIn("target", check_response(header, self.response(0, 5)))
+        partial = dict(self.response(0, 5), partial=True)
+        self.assertIsNone(check_response(header, partial))
+
+    def test_verify_batch(self):
+        verifier = ProofVerifier(max_workers=4, min_batch_size=2)
+        responses = [self.response(uid, uid * 10) for uid in range(10)]
+        responses[3]["block_hash"] = "ff" * 32
+        assignments = {uid: (uid * 10, uid * 10 + 9) for uid in range(10)}
+        assignments[7] = (0, 9)
+        work_data = {"block": self.block, "header_format": BINARY_FORMAT}
+        try:
+            valid = asyncio.run(
+                verifier.verify(work_data, self.target, responses, assignments)
+            )
+        finally:
+            verifier.shutdown()
+        expected = [uid not in (3, 7) for uid in range(10)]
+        self.assertEqual(list(valid), expected)
+        self.assertEqual((verifier.verified, verifier.rejected), (8, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+import os
+import timeit
+import unittest
+
+import numpy as np
+
+from template.base.utils.weight_utils import (
+    convert_weights_and_uids_for_emit,
+    normalize_max_weight,
+    normalize_max_weight_,
+    U16_MAX,
+)
+
+
+def reference_normalize_max_weight(
+    x: np.ndarray, limit: float = 0.1
+) -> np.ndarray:
+    """The loop based implementation the vectorised one has to match."""
+    epsilon = 1e-7
+
+    weights = x.copy()
+    values = np.sort(weights)
+
+    if x.sum() == 0 or len(x) * limit <= 1:
+        return np.ones_like(x) / x.size
+    else:
+        estimation = values / values.sum()
+
+        if estimation.max() <= limit:
+            return weights / weights.sum()
+
+        cumsum = np.cumsum(estimation, 0)
+        estimation_sum = np.array(
+            [(len(values) - i - 1) * estimation[i] for i in range(len(values))]
+        )
+        n_values = (
+            estimation / (estimation_sum + cumsum + epsilon) < limit
+        ).sum()
+        cutoff_scale = (limit * cumsum[n_values - 1] - epsilon) / (
+            1 - (limit * (len(estimation) - n_values))
+        )
+        cutoff = cutoff_scale * values.sum()
+        weights[weights > cutoff] = cutoff
+        return weights / weights.sum()
+
+
+def random_weights(rng: np.random.Generator) -> np.ndarray:
+    size = int(rng.integers(1, 512))
+    dtype = rng.choice([np.float32, np.float64])
+    kind = rng.integers(4)
+    if kind == 0:
+        x = rng.random(size)
+    elif kind == 1:
+        # Heavy tailed, most draws need clipping.
+        x = rng.pareto(1.0, size)
+    elif kind == 2:
+        # Sparse with ties.
+        x = rng.integers(0, 4, size) * (rng.random(size) < 0.2)
+    else:
+        x = np.zeros(size)
+    return x.astype(dtype)
+
+
+class NormalizeMaxWeightTestCase(unittest.TestCase):
+    def test_matches_reference(self):
+        rng = np.random.default_rng(0)
+        for _ in range(2000):
+            x = random_weights(rng)
+            limit = float(rng.choice([0.01, 0.05, 0.1, 0.3, 0.5, 1.0]))
+            expected = reference_normalize_max_weight(x, limit)
+            np.testing.assert_array_equal(
+                normalize_max_weight(x, limit), expected
+            )
+            y = x.copy()
+            result = normalize_max_weight_(y, limit)
+            self.assertIs(result, y)
+            np.testing.assert_array_equal(y, expected)
+
+    def test_respects_limit(self):
+        x = np.array([100.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0])
+        y = normalize_max_weight(x, limit=0.2)
+        self.assertAlmostEqual(y.sum(), 1.0)
+        self.assertLessEqual(y.max(), 0.2 + 1e-6)
+
+    def test_inplace_rejects_integers(self):
+        with self.assertRaises(TypeError):
+            normalize_max_weight_(np.arange(10), limit=0.5)
+
+
+class ConvertWeightsForEmitTestCase(unittest.TestCase):
+    @staticmethod
+    def reference(uids, weights):
+        max_weight = float(np.max(weights))
+        weight_uids, weight_vals = [], []
+        for weight_i, uid_i in zip(weights, uids):
+            uint16_val = round(float(weight_i) / max_weight * int(U16_MAX))
+            if uint16_val != 0:
+                weight_vals.append(uint16_val)
+                weight_uids.append(int(uid_i))
+        return weight_uids, weight_vals
+
+    def test_matches_reference(self):
+        rng = np.random.default_rng(1)
+        for _ in range(200):
+            size = int(rng.integers(1, 1024))
+            weights = rng.pareto(1.0, size).astype(np.float32)
+            weights[rng.random(size) < 0.3] = 0
+            if not weights.any():
+                continue
+            uids = rng.permutation(size)
+            expected = self.reference(uids, weights)
+            self.assertEqual(
+                convert_weights_and_uids_for_emit(uids, weights), expected
+            )
+            np_uids, np_vals = convert_weights_and_uids_for_emit(
+                uids, weights, as_numpy=True
+            )
+            self.assertEqual(np_vals.dtype, np.uint16)
+            self.assertEqual((np_uids.tolist(), np_vals.tolist()), expected)
+
+    def test_rounds_half_to_even(self):
+        weights = np.array([1.0, 0.5 / U16_MAX, 1.5 / U16_MAX])
+        self.assertEqual(
+            convert_weights_and_uids_for_emit(np.arange(3), weights),
+            ([0, 2], [U16_MAX, 2]),
+        )
+
+    def test_nothing_to_set(self):
+        self.assertEqual(
+            convert_weights_and_uids_for_emit(np.arange(3), np.zeros(3)),
+            ([], []),
+        )
+
+    def test_rejects_negative_weights(self):
+        with self.assertRaises(ValueError):
+            convert_weights_and_uids_for_emit(
+                np.arange(2), np.array([1.0, -1.0])
+            )
+
+
+@unittest.skipUnless(
+    os.environ.get("RUN_BENCHMARKS"), "set RUN_BENCHMARKS=1 to run"
+)
+class NormalizeMaxWeightBenchmark(unittest.TestCase):
+    def test_benchmark(self):
+        rng = np.random.default_rng(0)
+        for size in (256, 4096, 65536):
+            x = rng.pareto(1.0, size).astype(np.float32)
+            number = max(1, 200000 // size)
+            timings = {
+                name: min(
+                    timeit.repeat(
+                        lambda: fn(x.copy(), 0.1), number=number, repeat=3
+                    )
+                )
+                / number
+                for name, fn in (
+                    ("reference", reference_normalize_max_weight),
+                    ("vectorised", normalize_max_weight),
+                    ("in-place", normalize_max_weight_),
+                )
+            }
+            with self.subTest(size=size):
+                self.assertLess(timings["vectorised"], timings["reference"])
+                self.assertLess(timings["in-place"], timings["reference"])
+
+
+if __name__ == "__main__":
+    unittest.main()